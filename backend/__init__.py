@@ -1,19 +1,77 @@
 import os
 from flask import Flask
 from .models import db
+from .database import configure_database, init_database
+from .security import hash_config
+from .templating import templating_config
 
 def create_app():
     app = Flask(__name__, template_folder="../templates", static_folder="../static")
-    app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
-        "DATABASE_URL",
-        "sqlite:///PLACEMENT_PORTAL.sqlite3"
-    )
+    configure_database(app)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "placement_secret_key")
-    app.debug = True
+    app.config.update(hash_config())
+    # Max SQL statements per request, only enforced when TESTING is on
+    app.config["SQL_QUERY_LIMIT"] = None
+    # Admin dashboard counters are rebuilt from the tables at most this often
+    app.config["STATS_RECONCILE_SECONDS"] = 300
+    # Debug and template auto-reload only in development
+    app.config.update(templating_config())
     db.init_app(app)
+    init_database(app)
     
     
     from .controllers import bp
     app.register_blueprint(bp)
+
+    from .instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    from .query_guard import init_query_guard
+    init_query_guard(app)
+
+    from .stats import init_stats
+    init_stats(app)
+
+    from .search import init_search
+    init_search(app)
+
+    from .migrations import init_migrations
+    init_migrations(app)
+
+    from .resume_storage import init_resume_storage
+    init_resume_storage(app)
+
+    from .resume_text import init_resume_text
+    init_resume_text(app)
+
+    from .notifications import init_notifications
+    init_notifications(app)
+
+    from .events import init_events
+    init_events(app)
+
+    from .cache import init_cache
+    init_cache(app)
+
+    from .dashboard import init_dashboard
+    init_dashboard(app)
+
+    from .matching import init_matching
+    init_matching(app)
+
+    from .bulk import init_bulk
+    init_bulk(app)
+
+    from .analytics import init_analytics
+    init_analytics(app)
+
+    from .applications import init_applications
+    init_applications(app)
+
+    from .templating import init_templating
+    init_templating(app)
+
+    from .startup import init_startup
+    init_startup(app)
     return app
@@ -0,0 +1,238 @@
+import os
+from collections import defaultdict
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import case, func, literal_column
+
+from .cache import cache, cached
+from .matching import skill_index
+from .models import db, CompanyProfile, StudentProfile, PlacementDrive, Application
+
+
+# -----------------------------
+# PLACEMENT ANALYTICS
+# -----------------------------
+# Admin reports (/admin/reports). Every figure is aggregated by the database
+# with GROUP BY, so each query returns at most one row per drive, company,
+# qualification or day however many applications there are; the funnel
+# query only reads the (drive_id, status) index. The finished report is
+# cached for ANALYTICS_TTL_SECONDS.
+#
+#   funnels           per drive and per company: applied -> shortlisted -> selected -> placed
+#   time to decision  days from applying to the last status change
+#   skill demand      drives / applications per required skill vs. students listing it
+#   placement rate    students with a SELECTED or PLACED application, per qualification
+#
+# Only the current status is stored, so a stage counts as reached when the
+# status is that stage or a later one; rejections are reported separately.
+
+FUNNEL_STAGES = ("shortlisted", "selected", "placed")
+
+STAGE_STATUSES = {
+    "shortlisted": ("SHORTLISTED", "SELECTED", "PLACED"),
+    "selected": ("SELECTED", "PLACED"),
+    "placed": ("PLACED",),
+}
+
+PLACED_STATUSES = ("SELECTED", "PLACED")
+
+REPORT_DRIVES = 50
+REPORT_SKILLS = 25
+
+
+def analytics_config():
+    return {
+        "ANALYTICS_TTL_SECONDS": float(os.getenv("ANALYTICS_TTL_SECONDS", 300)),
+    }
+
+
+def _count_where(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+
+def _add(total, counts):
+    for stage, count in counts.items():
+        total[stage] = total.get(stage, 0) + count
+
+
+# -----------------------------
+# FUNNELS
+# -----------------------------
+
+def drive_funnels():
+    """{drive_id: {"applied", "shortlisted", "selected", "placed", "rejected"}}."""
+    rows = db.session.query(
+        Application.drive_id,
+        func.count(Application.id),
+        *(_count_where(Application.status.in_(STAGE_STATUSES[stage])) for stage in FUNNEL_STAGES),
+        _count_where(Application.status == "REJECTED"),
+    ).group_by(Application.drive_id)
+
+    return {
+        drive_id: dict(zip(("applied",) + FUNNEL_STAGES + ("rejected",), counts))
+        for drive_id, *counts in rows
+    }
+
+
+def _funnel_report(funnels):
+    drives = db.session.query(
+        PlacementDrive.id, PlacementDrive.job_title, PlacementDrive.status,
+        CompanyProfile.id, CompanyProfile.company_name
+    ).join(CompanyProfile)
+
+    overall, companies, drive_rows = {}, {}, []
+    for drive_id, job_title, status, company_id, company_name in drives:
+        counts = funnels.get(drive_id)
+        if not counts:
+            continue
+        drive_rows.append(dict(
+            counts, id=drive_id, job_title=job_title, status=status, company_name=company_name
+        ))
+        company = companies.setdefault(company_id, {"id": company_id, "company_name": company_name})
+        _add(company, counts)
+        _add(overall, counts)
+
+    by_applications = lambda row: (-row["applied"], row["id"])
+    return {
+        "overall": overall,
+        "companies": sorted(companies.values(), key=by_applications),
+        "drives": sorted(drive_rows, key=by_applications)[:REPORT_DRIVES],
+    }
+
+
+# -----------------------------
+# TIME TO DECISION
+# -----------------------------
+
+def _days_between(start, end):
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        return func.julianday(end) - func.julianday(start)
+    if dialect == "postgresql":
+        return func.extract("epoch", end - start) / 86400.0
+    return func.timestampdiff(literal_column("SECOND"), start, end) / 86400.0
+
+
+def _percentile(histogram, total, fraction):
+    """Whole-day bucket that holds the ``fraction`` quantile."""
+    seen = 0
+    for day, count in sorted(histogram.items()):
+        seen += count
+        if seen >= fraction * total:
+            return day
+    return None
+
+
+def _decision_summary(histogram, total_days):
+    decided = sum(histogram.values())
+    return {
+        "decided": decided,
+        "average_days": round(total_days / decided, 1) if decided else None,
+        "median_days": _percentile(histogram, decided, 0.5),
+        "p90_days": _percentile(histogram, decided, 0.9),
+    }
+
+
+def decision_times():
+    """Days to decision, overall and per company (average, median, p90).
+
+    The database returns a histogram of whole days per company; quantiles
+    are read off the histogram.
+    """
+    days = _days_between(Application.application_date, Application.status_updated_at)
+    day = db.cast(days, db.Integer)
+    rows = db.session.query(
+        PlacementDrive.company_id, day, func.count(Application.id), func.sum(days)
+    ).join(PlacementDrive, PlacementDrive.id == Application.drive_id).filter(
+        Application.status_updated_at.isnot(None),
+        Application.status != "APPLIED"
+    ).group_by(PlacementDrive.company_id, day)
+
+    histograms = defaultdict(lambda: defaultdict(int))
+    totals = defaultdict(float)
+    for company_id, bucket, count, total in rows:
+        for key in (company_id, None):
+            histograms[key][max(bucket, 0)] += count
+            totals[key] += total or 0
+
+    overall = _decision_summary(histograms.pop(None, {}), totals.pop(None, 0))
+    return overall, {
+        company_id: _decision_summary(histogram, totals[company_id])
+        for company_id, histogram in histograms.items()
+    }
+
+
+# -----------------------------
+# SKILL DEMAND / PLACEMENT RATE
+# -----------------------------
+
+def skill_demand(funnels):
+    """Most requested skills: drives, applications and students offering them."""
+    index = skill_index()
+    rows = []
+    for term, drive_ids in list(index.postings["drive"].items()):
+        rows.append({
+            "skill": term,
+            "drives": len(drive_ids),
+            "applications": sum(funnels[drive_id]["applied"] for drive_id in drive_ids if drive_id in funnels),
+            "students": len(index.postings["student"].get(term, ())),
+        })
+    rows.sort(key=lambda row: (-row["drives"], -row["applications"], row["skill"]))
+    return rows[:REPORT_SKILLS]
+
+
+def placement_rates():
+    """Students and placed students per qualification (case-insensitive)."""
+    qualification = func.lower(func.trim(StudentProfile.qualification))
+    placed = db.exists().where(
+        Application.student_id == StudentProfile.user_id,
+        Application.status.in_(PLACED_STATUSES)
+    )
+    rows = db.session.query(
+        func.min(StudentProfile.qualification),
+        func.count(StudentProfile.id),
+        _count_where(placed),
+    ).group_by(qualification)
+
+    return sorted((
+        {
+            "qualification": label,
+            "students": students,
+            "placed": placed_count,
+            "rate": round(100.0 * placed_count / students, 1) if students else 0.0,
+        } for label, students, placed_count in rows
+    ), key=lambda row: (-row["students"], row["qualification"]))
+
+
+# -----------------------------
+# REPORT
+# -----------------------------
+
+def build_report():
+    funnels = drive_funnels()
+    report = _funnel_report(funnels)
+
+    overall_decisions, company_decisions = decision_times()
+    for company in report["companies"]:
+        company["decision"] = company_decisions.get(company["id"])
+
+    report.update(
+        decisions=overall_decisions,
+        skills=skill_demand(funnels),
+        qualifications=placement_rates(),
+        generated_at=datetime.utcnow(),
+    )
+    return report
+
+
+def placement_report(refresh=False):
+    """The cached report; ``refresh`` rebuilds it now."""
+    key = ("analytics", "placement_report")
+    if refresh:
+        cache().delete(key)
+    return cached(key, build_report, ttl=current_app.config["ANALYTICS_TTL_SECONDS"])
+
+
+def init_analytics(app):
+    app.config.update(analytics_config())
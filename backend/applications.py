@@ -0,0 +1,279 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import bindparam
+
+from .dashboard import invalidate_applications, open_drive_filter
+from .database import insert_ignore
+from .models import db, User, CompanyProfile, StudentProfile, PlacementDrive, Application
+from .stats import record_deltas
+
+
+# -----------------------------
+# APPLYING TO A DRIVE
+# -----------------------------
+# One statement both checks eligibility and writes the application:
+#
+#   INSERT INTO application (...)
+#   SELECT ... FROM placement_drive JOIN company_profile JOIN user
+#   WHERE <drive open> AND <company in good standing> AND <student eligible>
+#   ON CONFLICT DO NOTHING
+#
+# so a drive closing, a blacklisting or a concurrent double click can never
+# slip in between a check and the insert, and a duplicate is a no-op instead
+# of an IntegrityError. Only when nothing was inserted does a second query
+# work out why, for the message.
+#
+# APPLY_MODE=batched turns on group commit for deadline spikes: requests
+# hand their apply to a single writer thread, which gathers everything that
+# arrives within APPLY_BATCH_WINDOW_MS (at most APPLY_BATCH_SIZE applies)
+# and runs it as one transaction, then answers each request. On SQLite this
+# replaces a queue of writers contending for the file lock with one writer
+# and one commit per batch. The default, "direct", commits every apply in
+# the request. A request that gives up waiting (APPLY_TIMEOUT) cancels its
+# apply if the writer has not taken it yet, and the student is asked to try
+# again; once taken it will still be committed, so the student is told it
+# is being processed instead.
+
+APPLIED = "APPLIED"
+ALREADY_APPLIED = "ALREADY_APPLIED"
+DRIVE_CLOSED = "DRIVE_CLOSED"
+NOT_ELIGIBLE = "NOT_ELIGIBLE"
+NOT_FOUND = "NOT_FOUND"
+
+APPLY_MESSAGES = {
+    APPLIED: ("Application submitted successfully!", "success"),
+    ALREADY_APPLIED: ("You already applied to this drive.", "warning"),
+    DRIVE_CLOSED: ("This drive is no longer accepting applications.", "warning"),
+    NOT_ELIGIBLE: ("Your account cannot apply to drives. Please contact the placement cell.", "danger"),
+}
+
+
+def apply_config():
+    return {
+        "APPLY_MODE": os.getenv("APPLY_MODE", "direct"),
+        "APPLY_BATCH_WINDOW_MS": float(os.getenv("APPLY_BATCH_WINDOW_MS", 5)),
+        "APPLY_BATCH_SIZE": int(os.getenv("APPLY_BATCH_SIZE", 200)),
+        "APPLY_TIMEOUT": float(os.getenv("APPLY_TIMEOUT", 10)),
+    }
+
+
+class ApplyBusy(Exception):
+    """The apply was withdrawn before it ran; nothing was written."""
+
+
+class ApplyPending(Exception):
+    """The apply is running in a batch that has not finished yet."""
+
+
+STUDENT = bindparam("b_student")
+DRIVE = bindparam("b_drive")
+TODAY = bindparam("b_today")
+NOW = bindparam("b_now")
+
+# Built once per dialect: constructing and compiling this statement costs
+# more than executing it
+_statements = {}
+
+
+def _eligible_student():
+    blacklisted = db.exists().where(
+        StudentProfile.user_id == STUDENT,
+        StudentProfile.is_blacklisted.is_(True)
+    )
+    return db.and_(
+        User.id == STUDENT,
+        User.role == "STUDENT",
+        User.is_active.is_(True),
+        ~blacklisted,
+    )
+
+
+def _guarded_insert():
+    rows = db.select(
+        User.id, PlacementDrive.id, db.literal(APPLIED), NOW
+    ).select_from(PlacementDrive).join(CompanyProfile).join(User, _eligible_student()).where(
+        PlacementDrive.id == DRIVE,
+        open_drive_filter(TODAY),
+    )
+    return insert_ignore(Application.__table__).from_select(
+        ["student_id", "drive_id", "status", "application_date"], rows
+    )
+
+
+def _refusal_query():
+    already = db.exists().where(
+        Application.student_id == STUDENT, Application.drive_id == DRIVE
+    )
+    return db.select(already, open_drive_filter(TODAY)).select_from(
+        PlacementDrive
+    ).join(CompanyProfile).where(PlacementDrive.id == DRIVE)
+
+
+def _statement(name, build):
+    key = (db.session.get_bind().dialect.name, name)
+    if key not in _statements:
+        _statements[key] = build()
+    return _statements[key]
+
+
+def _refusal(params):
+    """Why nothing was inserted."""
+    row = db.session.execute(_statement("refusal", _refusal_query), params).first()
+    if row is None:
+        return NOT_FOUND
+    applied, is_open = row
+    if applied:
+        return ALREADY_APPLIED
+    if not is_open:
+        return DRIVE_CLOSED
+    return NOT_ELIGIBLE
+
+
+def _apply_all(requests):
+    """Apply every (student_id, drive_id) in one transaction; returns their results."""
+    now = datetime.utcnow()
+    insert = _statement("apply", _guarded_insert)
+    results, applied = [], []
+
+    for student_id, drive_id in requests:
+        params = {"b_student": student_id, "b_drive": drive_id, "b_today": now.date(), "b_now": now}
+        if db.session.execute(insert, params).rowcount:
+            results.append(APPLIED)
+            applied.append(student_id)
+        else:
+            results.append(_refusal(params))
+
+    if applied:
+        # The set-based insert bypasses the flush hooks
+        record_deltas(db.session, {f"applications:{APPLIED}": len(applied)})
+        invalidate_applications(applied)
+        db.session.commit()
+    else:
+        db.session.rollback()
+    return results
+
+
+def apply_to_drive(student_id, drive_id):
+    """Apply ``student_id`` to ``drive_id``; returns one of the results above.
+
+    Raises ApplyBusy or ApplyPending when the batch writer does not answer
+    within APPLY_TIMEOUT.
+    """
+    if current_app.config["APPLY_MODE"] != "batched":
+        return _apply_all([(student_id, drive_id)])[0]
+
+    future = current_app.extensions["apply_writer"].submit(student_id, drive_id)
+    try:
+        return future.result(timeout=current_app.config["APPLY_TIMEOUT"])
+    except TimeoutError:
+        # Only succeeds while the writer has not picked the apply up
+        if future.cancel():
+            raise ApplyBusy()
+        raise ApplyPending()
+
+
+# -----------------------------
+# GROUP COMMIT WRITER
+# -----------------------------
+
+_metrics_lock = threading.Lock()
+_metrics = {"batches": 0, "batched": 0, "batch_failures": 0}
+
+
+def _count(**increments):
+    with _metrics_lock:
+        for name, value in increments.items():
+            _metrics[name] += value
+
+
+def prometheus_lines():
+    with _metrics_lock:
+        stats = dict(_metrics)
+    lines = []
+    for name, key, help_text in (
+        ("portal_apply_batches_total", "batches", "Group-commit apply transactions."),
+        ("portal_apply_batched_total", "batched", "Applies handled by the group-commit writer."),
+        ("portal_apply_batch_failures_total", "batch_failures", "Group-commit batches retried one apply at a time."),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {stats[key]}")
+    return lines
+
+
+class ApplyWriter:
+    def __init__(self, app):
+        self.app = app
+        self.pending = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="apply-writer", daemon=True
+                )
+                self.thread.start()
+
+    def submit(self, student_id, drive_id):
+        future = Future()
+        self.pending.put((student_id, drive_id, future))
+        self.start()
+        return future
+
+    def _next_batch(self):
+        batch = [self.pending.get()]
+        window = self.app.config["APPLY_BATCH_WINDOW_MS"] / 1000
+        limit = self.app.config["APPLY_BATCH_SIZE"]
+        deadline = time.monotonic() + window
+        while len(batch) < limit:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.pending.get(timeout=remaining) if remaining > 0 else self.pending.get_nowait())
+            except queue.Empty:
+                break
+        # Drops applies whose request has given up waiting; the rest can no
+        # longer be cancelled
+        return [entry for entry in batch if entry[2].set_running_or_notify_cancel()]
+
+    def run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                try:
+                    results = _apply_all([(student_id, drive_id) for student_id, drive_id, _ in batch])
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("apply batch failed, retrying one at a time")
+                    _count(batch_failures=1)
+                    self._apply_one_by_one(batch)
+                else:
+                    for (_, _, future), result in zip(batch, results):
+                        future.set_result(result)
+                _count(batches=1, batched=len(batch))
+
+    def _apply_one_by_one(self, batch):
+        # A failing apply only fails its own request
+        for student_id, drive_id, future in batch:
+            try:
+                future.set_result(_apply_all([(student_id, drive_id)])[0])
+            except Exception as e:
+                db.session.rollback()
+                future.set_exception(e)
+
+
+def init_applications(app):
+    app.config.update(apply_config())
+    app.extensions["apply_writer"] = ApplyWriter(app)
+
+    from .instrumentation import register_metrics
+    register_metrics(prometheus_lines)
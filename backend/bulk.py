@@ -0,0 +1,298 @@
+import csv
+import io
+import os
+import re
+from functools import partial
+
+import click
+from flask import Response, current_app, stream_with_context
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+from .matching import record_skill_changes
+from .models import db, User, CompanyProfile, StudentProfile, PlacementDrive, Application
+from .pools import process_pool
+from .search import sync_students
+from .stats import record_deltas
+
+
+# -----------------------------
+# BULK CSV IMPORT / EXPORT
+# -----------------------------
+# Student import reads the upload as a stream and works in chunks of
+# IMPORT_CHUNK_SIZE rows. Each chunk is validated (one query for emails
+# already taken), its passwords are hashed across IMPORT_HASH_PROCESSES
+# processes (one long-lived pool per web worker, backend/pools.py), and its
+# users and profiles are written with two multi-row INSERTs in one
+# transaction. A bad row is reported with its line number and skipped; it
+# never fails the rest of the file.
+#
+# Exports stream straight from a server-side cursor (EXPORT_BATCH_SIZE rows
+# at a time) into the response, so memory stays flat however many rows
+# there are.
+
+STUDENT_COLUMNS = ("name", "email", "password", "qualification", "skills")
+REQUIRED_STUDENT_COLUMNS = ("name", "email", "password", "qualification")
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Cells starting with these are evaluated as formulas by spreadsheet apps
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def bulk_config():
+    return {
+        "IMPORT_CHUNK_SIZE": int(os.getenv("IMPORT_CHUNK_SIZE", 500)),
+        "IMPORT_HASH_PROCESSES": int(os.getenv("IMPORT_HASH_PROCESSES", os.cpu_count() or 1)),
+        "EXPORT_BATCH_SIZE": int(os.getenv("EXPORT_BATCH_SIZE", 1000)),
+    }
+
+
+class ImportFailed(Exception):
+    pass
+
+
+# -----------------------------
+# STUDENT IMPORT
+# -----------------------------
+
+def _hash_one(password, method):
+    # Module level so worker processes can unpickle it
+    return generate_password_hash(password, method=method)
+
+
+def _hash_passwords(pool, passwords, method):
+    if pool is None:
+        return [_hash_one(password, method) for password in passwords]
+    workers = current_app.config["IMPORT_HASH_PROCESSES"]
+    return list(pool.map(
+        partial(_hash_one, method=method), passwords,
+        chunksize=max(1, len(passwords) // (workers * 4))
+    ))
+
+
+def _read_rows(stream):
+    """(line number, row) pairs from a binary CSV stream, header checked."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = [name.strip().lower() for name in reader.fieldnames or ()]
+    missing = [name for name in REQUIRED_STUDENT_COLUMNS if name not in header]
+    if missing:
+        raise ImportFailed(f"Missing column(s): {', '.join(missing)}")
+    reader.fieldnames = header
+
+    for row in reader:
+        yield reader.line_num, {
+            name: (row.get(name) or "").strip() for name in STUDENT_COLUMNS
+        }
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validate(row):
+    for name in REQUIRED_STUDENT_COLUMNS:
+        if not row[name]:
+            return f"{name} is required"
+    if not EMAIL_PATTERN.match(row["email"]):
+        return "invalid email"
+    if len(row["name"]) > 100 or len(row["email"]) > 120:
+        return "name or email too long"
+    if len(row["qualification"]) > 100 or len(row["skills"]) > 250:
+        return "qualification or skills too long"
+    return None
+
+
+def import_students(stream):
+    """Create students from a CSV stream.
+
+    Returns a report: rows read, students created and per-row errors
+    (line, email, message).
+    """
+    config = current_app.config
+    method = config["PASSWORD_HASH_METHOD"]
+    report = {"rows": 0, "created": 0, "errors": []}
+    seen = set()
+
+    workers = config["IMPORT_HASH_PROCESSES"]
+    pool = process_pool("import_hash", workers) if workers > 1 else None
+    try:
+        for chunk in _chunks(_read_rows(stream), config["IMPORT_CHUNK_SIZE"]):
+            report["rows"] += len(chunk)
+            _import_chunk(chunk, pool, method, seen, report)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFailed(
+            f"Unreadable CSV after {report['rows']} rows ({report['created']} imported): {e}"
+        )
+
+    return report
+
+
+def _import_chunk(chunk, pool, method, seen, report):
+    def reject(line, row, message):
+        report["errors"].append({"line": line, "email": row["email"], "message": message})
+
+    valid = []
+    for line, row in chunk:
+        problem = _validate(row)
+        if problem:
+            reject(line, row, problem)
+        elif row["email"] in seen:
+            reject(line, row, "duplicate email in file")
+        else:
+            seen.add(row["email"])
+            valid.append((line, row))
+    if not valid:
+        return
+
+    taken = {email for email, in db.session.query(User.email).filter(
+        User.email.in_([row["email"] for _, row in valid])
+    )}
+    for line, row in valid:
+        if row["email"] in taken:
+            reject(line, row, "email already exists")
+    valid = [(line, row) for line, row in valid if row["email"] not in taken]
+    if not valid:
+        return
+
+    hashes = _hash_passwords(pool, [row["password"] for _, row in valid], method)
+
+    try:
+        user_ids = db.session.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [{
+                "full_name": row["name"],
+                "email": row["email"],
+                "password": password_hash,
+                "role": "STUDENT",
+            } for (_, row), password_hash in zip(valid, hashes)]
+        ).all()
+        db.session.execute(insert(StudentProfile), [{
+            "user_id": user_id,
+            "qualification": row["qualification"],
+            "skills": row["skills"] or None,
+        } for user_id, (_, row) in zip(user_ids, valid)])
+
+        # Set-based writes bypass the flush hooks that maintain derived data
+        record_deltas(db.session, {"students": len(user_ids)})
+        record_skill_changes(db.session, "student", {
+            user_id: row["skills"] for user_id, (_, row) in zip(user_ids, valid)
+        })
+        sync_students(db.session.connection(), user_ids)
+        db.session.commit()
+    except IntegrityError:
+        # An email registered while this chunk was being hashed
+        db.session.rollback()
+        for line, row in valid:
+            reject(line, row, "not imported: conflicting concurrent registration, re-run the import")
+        return
+
+    report["created"] += len(user_ids)
+
+
+# -----------------------------
+# EXPORT
+# -----------------------------
+
+def _students_query():
+    return db.select(
+        User.id, User.full_name, User.email, StudentProfile.qualification,
+        StudentProfile.skills, User.is_active, StudentProfile.is_blacklisted, User.created_at
+    ).outerjoin(StudentProfile, StudentProfile.user_id == User.id).where(
+        User.role == "STUDENT"
+    ).order_by(User.id)
+
+
+def _drives_query():
+    return db.select(
+        PlacementDrive.id, CompanyProfile.company_name, PlacementDrive.job_title,
+        PlacementDrive.status, PlacementDrive.application_deadline,
+        PlacementDrive.required_skills, PlacementDrive.experience_required,
+        PlacementDrive.salary_range, PlacementDrive.application_count,
+        PlacementDrive.created_at
+    ).join(CompanyProfile).order_by(PlacementDrive.id)
+
+
+def _applications_query():
+    return db.select(
+        Application.id, Application.status, Application.application_date,
+        User.id, User.full_name, User.email,
+        PlacementDrive.id, PlacementDrive.job_title, PlacementDrive.status,
+        CompanyProfile.company_name
+    ).join(User, User.id == Application.student_id).join(
+        PlacementDrive, PlacementDrive.id == Application.drive_id
+    ).join(CompanyProfile, CompanyProfile.id == PlacementDrive.company_id).order_by(Application.id)
+
+
+EXPORTS = {
+    "students": (
+        ("id", "name", "email", "qualification", "skills", "active", "blacklisted", "registered_at"),
+        _students_query,
+    ),
+    "drives": (
+        ("id", "company", "job_title", "status", "application_deadline", "required_skills",
+         "experience_required", "salary_range", "applications", "created_at"),
+        _drives_query,
+    ),
+    "applications": (
+        ("id", "status", "applied_at", "student_id", "student_name", "student_email",
+         "drive_id", "job_title", "drive_status", "company"),
+        _applications_query,
+    ),
+}
+
+
+def _cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_csv(kind):
+    """Streaming text/csv response for one of EXPORTS."""
+    header, build_query = EXPORTS[kind]
+    batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+
+    @stream_with_context
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+
+        result = db.session.execute(build_query().execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            writer.writerows([_cell(value) for value in row] for row in rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(generate(), mimetype="text/csv", headers={
+        "Content-Disposition": f"attachment; filename={kind}.csv",
+    })
+
+
+def init_bulk(app):
+    app.config.update(bulk_config())
+
+    @app.cli.command("students-import")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    def students_import_command(path):
+        """Create students from a CSV file (name, email, password, qualification, skills)."""
+        with open(path, "rb") as stream:
+            try:
+                report = import_students(stream)
+            except ImportFailed as e:
+                raise click.ClickException(str(e))
+
+        for error in report["errors"]:
+            print(f"line {error['line']}: {error['email']}: {error['message']}")
+        print(f"{report['created']} of {report['rows']} students imported.")
@@ -0,0 +1,323 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import event
+
+from .models import db
+
+
+# -----------------------------
+# CACHE
+# -----------------------------
+# A small key/value cache for derived page data. Entries are never updated
+# in place: keys embed the *version* of everything they were built from
+# (e.g. ("drives", version("drives"), ...)), and writers bump those versions
+# after their commit, so stale entries simply stop being looked up and age
+# out of the LRU. Versions are kept apart from the entries and are never
+# evicted.
+#
+# CACHE_MAX_ENTRIES bounds the LRU. CACHE_TTL_SECONDS additionally bounds
+# how long an entry can be served.
+#
+# CACHE_BACKEND selects where entries live:
+#
+#   memory  (default) one LRU per process. Versions are per process too, so
+#           another process's writes only show up once entries expire.
+#   sqlite  the LRU in front of a SQLite file (CACHE_PATH) shared by every
+#           worker process on the host. Versions live in the file, so a
+#           bump in one process invalidates the entries of all of them, and
+#           an entry built by one process is reused by the others.
+
+MISSING = object()
+
+
+def cache_config():
+    return {
+        "CACHE_MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", 5000)),
+        "CACHE_TTL_SECONDS": float(os.getenv("CACHE_TTL_SECONDS", 60)),
+        "CACHE_BACKEND": os.getenv("CACHE_BACKEND", "memory"),
+        "CACHE_PATH": os.getenv("CACHE_PATH"),
+    }
+
+
+class MemoryCache:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._versions = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def version(self, name):
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def bump(self, name):
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+# -----------------------------
+# SHARED BACKEND (SQLITE FILE)
+# -----------------------------
+
+class SQLiteStore:
+    """Pickled entries and versions in a SQLite file shared between processes."""
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path, max_entries, ttl):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._sets = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entry ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entry_expires ON cache_entry (expires)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_version ("
+                "name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+
+    def _connect(self):
+        # sqlite3 connections may not cross threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value, expires FROM cache_entry WHERE key = ?", (repr(key),)
+        ).fetchone()
+        if row is None or row[1] <= time.time():
+            return MISSING, 0
+        return pickle.loads(row[0]), row[1] - time.time()
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entry (key, value, expires) VALUES (?, ?, ?)",
+            (repr(key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+        )
+        self._sets += 1
+        if self._sets % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        """Drop expired entries, then the soonest-expiring ones over the bound."""
+        conn = self._connect()
+        conn.execute("DELETE FROM cache_entry WHERE expires <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM cache_entry WHERE key IN ("
+            "SELECT key FROM cache_entry ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM cache_entry WHERE key = ?", (repr(key),))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache_entry")
+
+    def version(self, name):
+        row = self._connect().execute(
+            "SELECT version FROM cache_version WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, name):
+        self._connect().execute(
+            "INSERT INTO cache_version (name, version) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET version = version + 1",
+            (name,)
+        )
+
+    def size(self):
+        return self._connect().execute("SELECT count(*) FROM cache_entry").fetchone()[0]
+
+
+class TieredCache:
+    """In-process LRU in front of a shared store; versions come from the store."""
+
+    def __init__(self, local, shared):
+        self.local = local
+        self.shared = shared
+        self.shared_hits = 0
+
+    @property
+    def hits(self):
+        return self.local.hits + self.shared_hits
+
+    @property
+    def misses(self):
+        return self.local.misses - self.shared_hits
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not MISSING:
+            return value
+        value, remaining = self.shared.get(key)
+        if value is not MISSING:
+            self.shared_hits += 1
+            # Never keep it locally for longer than the shared copy lives
+            self.local.set(key, value, remaining)
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.local.set(key, value, ttl)
+        self.shared.set(key, value, ttl)
+
+    def delete(self, key):
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def version(self, name):
+        return self.shared.version(name)
+
+    def bump(self, name):
+        self.shared.bump(name)
+
+    def size(self):
+        return self.local.size()
+
+
+def _sqlite_cache(app):
+    path = app.config["CACHE_PATH"] or os.path.join(app.instance_path, "portal_cache.sqlite3")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    max_entries, ttl = app.config["CACHE_MAX_ENTRIES"], app.config["CACHE_TTL_SECONDS"]
+    return TieredCache(MemoryCache(max_entries, ttl), SQLiteStore(path, max_entries, ttl))
+
+
+BACKENDS = {
+    "memory": lambda app: MemoryCache(
+        app.config["CACHE_MAX_ENTRIES"], app.config["CACHE_TTL_SECONDS"]
+    ),
+    "sqlite": _sqlite_cache,
+}
+
+
+def cache():
+    return current_app.extensions["cache"]
+
+
+def version(name):
+    return cache().version(name)
+
+
+def shared_versions():
+    """Whether a version bump in one process is seen by every other process."""
+    return current_app.config["CACHE_BACKEND"] != "memory"
+
+
+def cached(key, build, ttl=None):
+    """Return the cached value for ``key``, building and storing it on a miss."""
+    value = cache().get(key)
+    if value is MISSING:
+        value = build()
+        cache().set(key, value, ttl)
+    return value
+
+
+# -----------------------------
+# INVALIDATION
+# -----------------------------
+# Versions are bumped only after the writing transaction commits, so an
+# entry stored under the new version was always built from committed data.
+
+def invalidate(*names):
+    for name in names:
+        cache().bump(name)
+
+
+def invalidate_after_commit(*names, session=None):
+    session = session or db.session
+    session.info.setdefault("cache_invalidations", set()).update(names)
+
+
+def _apply_invalidations(session):
+    names = session.info.pop("cache_invalidations", None)
+    if names:
+        invalidate(*names)
+
+
+def _discard_invalidations(session):
+    session.info.pop("cache_invalidations", None)
+
+
+def prometheus_lines():
+    store = cache()
+    return [
+        "# HELP portal_cache_hits_total Cache lookups served from the cache.",
+        "# TYPE portal_cache_hits_total counter",
+        f"portal_cache_hits_total {store.hits}",
+        "# HELP portal_cache_misses_total Cache lookups that had to rebuild.",
+        "# TYPE portal_cache_misses_total counter",
+        f"portal_cache_misses_total {store.misses}",
+        "# HELP portal_cache_entries Entries currently cached.",
+        "# TYPE portal_cache_entries gauge",
+        f"portal_cache_entries {store.size()}",
+    ]
+
+
+def init_cache(app):
+    app.config.update(cache_config())
+    app.extensions["cache"] = BACKENDS[app.config["CACHE_BACKEND"]](app)
+
+    if not event.contains(db.session, "after_commit", _apply_invalidations):
+        event.listen(db.session, "after_commit", _apply_invalidations)
+        event.listen(db.session, "after_rollback", _discard_invalidations)
+
+    from .instrumentation import register_metrics
+    register_metrics(prometheus_lines)
@@ -1,16 +1,29 @@
-from flask import render_template, request, redirect, url_for, session, flash, Blueprint
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import render_template, request, redirect, url_for, session, flash, Blueprint, abort, jsonify
 from datetime import datetime
-import os
-import uuid
-from werkzeug.utils import secure_filename
-from flask import current_app
-from .models import Notification
 
 
-from .models import db, User, CompanyProfile, StudentProfile, PlacementDrive, Application
+from .models import db, User, CompanyProfile, StudentProfile, PlacementDrive, Application, APPLICATION_STATUSES
+from .pagination import keyset_paginate, page_url
+from .loading import load_profile
+from .stats import get_stats, record_deltas
+from .notifications import (
+    notify_students, notify_drive_applicants, notification_feed, notifications_since,
+    feed_item, encode_cursor, unread_count, mark_all_read, FEED_PAGE_SIZE
+)
+from .events import application_event, event_stream, publish_after_commit
+from .dashboard import (
+    FRAGMENTS, fragment_context, invalidate_applications, invalidate_open_drives, render_fragment
+)
+from .analytics import placement_report
+from .applications import APPLY_MESSAGES, NOT_FOUND, ApplyBusy, ApplyPending, apply_to_drive
+from .bulk import EXPORTS, ImportFailed, export_csv, import_students
+from .matching import rank_candidates, recommend_candidates
+from .search import resume_search_filter, student_search_filter
+from .security import HashingBusy, hash_password, needs_rehash, rehash_password, verify_password
+from .resume_storage import ResumeRejected, attach_resume, send_resume, store_resume
 
 bp = Blueprint("main", __name__)
+bp.add_app_template_global(page_url)
 
 # HOME
 
@@ -25,17 +38,37 @@ def login():
         email = request.form.get("email")
         password = request.form.get("password")
 
-        user = User.query.filter_by(email=email, is_active=True).first()
-
-        if user and check_password_hash(user.password, password):
+        # User + company approval in one round trip
+        row = db.session.query(
+            User, CompanyProfile.approval_status
+        ).outerjoin(
+            CompanyProfile, CompanyProfile.user_id == User.id
+        ).filter(
+            User.email == email,
+            User.is_active.is_(True)
+        ).first()
+        user, approval_status = row if row else (None, None)
+
+        try:
+            valid = bool(user) and verify_password(user.password, password)
+        except HashingBusy:
+            flash("Too many sign-ins right now, please try again in a moment.", "warning")
+            return render_template("login.html"), 503
+
+        if valid:
 
             # COMPANY APPROVAL CHECK (MANDATORY FIX)
-            if user.role == "COMPANY":
-                company = CompanyProfile.query.filter_by(user_id=user.id).first()
-
-                if not company or company.approval_status != "APPROVED":
-                    flash("Your company account is not approved by admin yet.", "warning")
-                    return redirect(url_for("main.login"))
+            if user.role == "COMPANY" and approval_status != "APPROVED":
+                flash("Your company account is not approved by admin yet.", "warning")
+                return redirect(url_for("main.login"))
+
+            # Upgrade hashes made under an older hashing policy
+            if needs_rehash(user.password):
+                try:
+                    user.password = rehash_password(password)
+                    db.session.commit()
+                except HashingBusy:
+                    pass
 
             session["user_id"] = user.id
             session["role"] = user.role
@@ -68,47 +101,35 @@ def student_register():
             flash("Email already exists", "warning")
             return redirect(url_for("main.student_register"))
 
+        # Handle Resume Upload (before creating the account) =================
+        resume = request.files.get("resume")
+        resume_path = None
+
+        if resume and resume.filename != "":
+            try:
+                resume_path = store_resume(resume)
+            except ResumeRejected as e:
+                flash(str(e), "danger")
+                return redirect(url_for("main.student_register"))
+
         # Create User 
         user = User(
             full_name=request.form["name"],
             email=request.form["email"],
-            password=generate_password_hash(
-                request.form["password"],
-                method="pbkdf2:sha256"
-            ),
+            password=hash_password(request.form["password"]),
             role="STUDENT"
         )
         db.session.add(user)
         db.session.commit()
 
-        # Handle Resume Upload =================
-        resume = request.files.get("resume")
-        resume_path = None
-
-        if resume and resume.filename != "":
-
-            # Create folder if not exists
-            upload_folder = os.path.join("static", "resumes")
-            os.makedirs(upload_folder, exist_ok=True)
-
-            # Secure filename
-            from werkzeug.utils import secure_filename
-            filename = secure_filename(resume.filename)
-
-            # Save file
-            filepath = os.path.join(upload_folder, filename)
-            resume.save(filepath)
-
-            # Store relative path in DB
-            resume_path = f"resumes/{filename}"
-
         #  Create Student Profile =================
         profile = StudentProfile(
             qualification=request.form["qualification"],
             skills=request.form["skills"],
-            resume_path=resume_path,
             user_id=user.id
         )
+        if resume_path:
+            attach_resume(profile, resume_path)
 
         db.session.add(profile)
         db.session.commit()
@@ -130,10 +151,7 @@ def company_register():
         user = User(
             full_name=request.form["hr_name"],
             email=request.form["email"],
-            password=generate_password_hash(
-                request.form["password"],
-                method="pbkdf2:sha256"
-            ),
+            password=hash_password(request.form["password"]),
             role="COMPANY"
         )
         db.session.add(user)
@@ -161,45 +179,50 @@ def admin_dashboard():
         return redirect(url_for("main.login"))
 
     #  Stats =================
-    stats = {
-        "total_students": User.query.filter_by(role="STUDENT").count(),
-        "total_companies": CompanyProfile.query.count(),
-        "total_drives": PlacementDrive.query.count(),
-        "total_applications": Application.query.count()
-    }
+    # Served from the incrementally maintained counters in stats.py
+    stats = get_stats()
 
     # Search inputs =================
     company_search = request.args.get("company_search", "").strip()
     student_search = request.args.get("student_search", "").strip()
 
     #  Company Search =================
+    # Every table is paged independently with its own keyset cursor
     companies = CompanyProfile.query
     if company_search:
         companies = companies.filter(
             CompanyProfile.company_name.ilike(f"%{company_search}%")
         )
-    companies = companies.all()
+    companies = keyset_paginate(companies, CompanyProfile.id, "companies")
 
     # Student Search =================
     students = User.query.filter_by(role="STUDENT")
     if student_search:
-        students = students.filter(
-            (User.full_name.ilike(f"%{student_search}%")) |
-            (User.email.ilike(f"%{student_search}%")) |
-            (User.id.cast(db.String).ilike(f"%{student_search}%"))
-        )
-    students = students.all()
+        students = students.filter(student_search_filter(student_search))
+    students = keyset_paginate(students, User.id, "students")
 
     # Other Data =================
-    drives = PlacementDrive.query.all()
-    applications = Application.query.all()
+    # Eager load what the template walks so a page is a fixed number of queries.
+    # The drive table is a cached fragment, so its page is only loaded on a miss
+    def drive_page():
+        return keyset_paginate(
+            PlacementDrive.query.options(*load_profile("admin_drives")),
+            PlacementDrive.id,
+            "drives"
+        )
+
+    applications = keyset_paginate(
+        Application.query.options(*load_profile("admin_applications")),
+        Application.id,
+        "applications"
+    )
 
     return render_template(
         "admin_dashboard.html",
         stats=stats,
         companies=companies,
         students=students,
-        drives=drives,
+        drive_page=drive_page,
         applications=applications
     )
 
@@ -211,6 +234,7 @@ def approve_company(id):
 
     company = CompanyProfile.query.get_or_404(id)
     company.approval_status = "APPROVED"
+    invalidate_open_drives()
     db.session.commit()
 
     flash("Company approved", "success")
@@ -224,6 +248,7 @@ def approve_drive(id):
 
     drive = PlacementDrive.query.get_or_404(id)
     drive.status = "APPROVED"
+    invalidate_open_drives()
     db.session.commit()
 
     flash("Drive approved", "success")
@@ -257,7 +282,9 @@ def admin_view_student(id):
 
     student = User.query.get_or_404(id)
     profile = StudentProfile.query.filter_by(user_id=id).first()
-    applications = Application.query.filter_by(student_id=id).all()
+    applications = Application.query.options(
+        *load_profile("student_applications")
+    ).filter_by(student_id=id).all()
 
     return render_template(
         "admin_view_student.html",
@@ -266,6 +293,14 @@ def admin_view_student(id):
         applications=applications
     )
 
+@bp.route("/admin/student/<int:id>/resume/<filename>")
+def admin_student_resume(id, filename):
+    if session.get("role") != "ADMIN":
+        return redirect(url_for("main.login"))
+
+    profile = StudentProfile.query.filter_by(user_id=id).first_or_404()
+    return send_resume(profile.resume_path, filename)
+
 @bp.route("/admin/company/<int:id>/reject")
 def reject_company(id):
     if session.get("role") != "ADMIN":
@@ -273,6 +308,7 @@ def reject_company(id):
 
     company = CompanyProfile.query.get_or_404(id)
     company.approval_status = "REJECTED"
+    invalidate_open_drives()
     db.session.commit()
 
     flash("Company rejected", "warning")
@@ -300,6 +336,7 @@ def blacklist_company(id):
     if user:
         user.is_active = False
 
+    invalidate_open_drives()
     db.session.commit()
     flash(message, "danger")
 
@@ -313,12 +350,62 @@ def reject_drive(id):
 
     drive = PlacementDrive.query.get_or_404(id)
     drive.status = "REJECTED"
+    invalidate_open_drives()
     db.session.commit()
 
     flash("Drive rejected successfully", "warning")
     return redirect(url_for("main.admin_dashboard"))
 
 
+# PLACEMENT REPORTS
+
+@bp.route("/admin/reports")
+def admin_reports():
+    if session.get("role") != "ADMIN":
+        return redirect(url_for("main.login"))
+
+    report = placement_report(refresh=request.args.get("refresh") == "1")
+    return render_template("admin_reports.html", report=report)
+
+
+# BULK STUDENT IMPORT / CSV EXPORT
+
+@bp.route("/admin/students/import", methods=["GET", "POST"])
+def import_students_csv():
+    if session.get("role") != "ADMIN":
+        return redirect(url_for("main.login"))
+
+    report = None
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if not upload or upload.filename == "":
+            flash("Choose a CSV file to import", "danger")
+            return redirect(url_for("main.import_students_csv"))
+
+        try:
+            report = import_students(upload.stream)
+        except ImportFailed as e:
+            flash(f"Import failed: {e}", "danger")
+            return redirect(url_for("main.import_students_csv"))
+
+        flash(
+            f"{report['created']} of {report['rows']} students imported",
+            "success" if not report["errors"] else "warning"
+        )
+
+    return render_template("admin_import.html", report=report)
+
+
+@bp.route("/admin/export/<kind>.csv")
+def export_csv_file(kind):
+    if session.get("role") != "ADMIN":
+        return redirect(url_for("main.login"))
+    if kind not in EXPORTS:
+        abort(404)
+
+    return export_csv(kind)
+
+
 # COMPANY DASHBOARD
 
 @bp.route("/company")
@@ -330,7 +417,9 @@ def company_dashboard():
         user_id=session["user_id"]
     ).first_or_404()
 
-    drives = PlacementDrive.query.filter_by(
+    drives = PlacementDrive.query.options(
+        *load_profile("company_drives")
+    ).filter_by(
         company_id=company.id
     ).order_by(PlacementDrive.created_at.desc()).all()
 
@@ -379,6 +468,7 @@ def create_drive():
         )
 
         db.session.add(drive)
+        invalidate_open_drives()
         db.session.commit()
 
         flash("Placement drive created successfully", "success")
@@ -401,7 +491,12 @@ def close_drive(id):
         flash("Unauthorized action", "danger")
         return redirect(url_for("main.company_dashboard"))
 
-    drive.status = "CLOSED"
+    if drive.status != "CLOSED":
+        drive.status = "CLOSED"
+        notify_drive_applicants(
+            drive.id, f"The drive '{drive.job_title}' has been closed by {company.company_name}."
+        )
+        invalidate_open_drives()
     db.session.commit()
 
     flash("Drive marked as complete", "success")
@@ -422,12 +517,39 @@ def view_applications(id):
         flash("Unauthorized access", "danger")
         return redirect(url_for("main.company_dashboard"))
 
-    applications = Application.query.filter_by(drive_id=id).all()
+    query = Application.query.options(
+        *load_profile("company_applications")
+    ).filter_by(drive_id=id)
+
+    # Resume keyword filter (text extracted in the background) =================
+    resume_term = request.args.get("resume", "").strip()
+    if resume_term:
+        query = query.filter(resume_search_filter(resume_term))
+    applications = query.all()
+
+    # Skill match of every applicant, and students worth inviting =================
+    if resume_term:
+        applicant_ids = {student_id for student_id, in db.session.query(
+            Application.student_id
+        ).filter_by(drive_id=id)}
+    else:
+        applicant_ids = {app.student_id for app in applications}
+    matches = {
+        match["id"]: match for match in rank_candidates(drive.id, applicant_ids)
+    }
+    sort = request.args.get("sort")
+    if sort == "match":
+        applications.sort(key=lambda app: -matches.get(app.student_id, {}).get("score", 0))
 
     return render_template(
         "company_applications.html",
         drive=drive,
-        applications=applications
+        applications=applications,
+        statuses=APPLICATION_STATUSES,
+        matches=matches,
+        sort=sort,
+        resume_term=resume_term,
+        recommended_candidates=recommend_candidates(drive.id, exclude=applicant_ids)
     )
 @bp.route("/company/drive/<int:id>")
 def view_drive(id):
@@ -451,7 +573,9 @@ def view_application(id):
     if session.get("role") != "COMPANY":
         return redirect(url_for("main.login"))
 
-    application = Application.query.get_or_404(id)
+    application = Application.query.options(
+        *load_profile("company_application")
+    ).get_or_404(id)
     company = CompanyProfile.query.filter_by(user_id=session["user_id"]).first()
 
     if application.placement_drive.company_id != company.id:
@@ -462,6 +586,24 @@ def view_application(id):
         "company_view_application.html",
         application=application
     )
+# RESUME OF AN APPLICANT (OWNING COMPANY ONLY)
+
+@bp.route("/company/application/<int:id>/resume/<filename>")
+def company_resume(id, filename):
+    if session.get("role") != "COMPANY":
+        return redirect(url_for("main.login"))
+
+    application = Application.query.options(
+        *load_profile("company_application")
+    ).get_or_404(id)
+    company = CompanyProfile.query.filter_by(user_id=session["user_id"]).first()
+
+    if not company or application.placement_drive.company_id != company.id:
+        abort(403)
+
+    profile = application.student.student_profile
+    return send_resume(profile.resume_path if profile else None, filename)
+
 @bp.route("/company/drive/edit/<int:id>", methods=["GET", "POST"])
 def edit_drive(id):
 
@@ -491,10 +633,15 @@ def edit_drive(id):
         drive.salary_range = request.form.get("salary_range")
 
         deadline_str = request.form.get("application_deadline")
-        drive.application_deadline = datetime.strptime(
-            deadline_str, "%Y-%m-%d"
-        ).date()
-
+        deadline = datetime.strptime(deadline_str, "%Y-%m-%d").date()
+        if deadline != drive.application_deadline:
+            drive.application_deadline = deadline
+            notify_drive_applicants(
+                drive.id,
+                f"The application deadline for '{drive.job_title}' is now {deadline.strftime('%d-%m-%Y')}."
+            )
+
+        invalidate_open_drives()
         db.session.commit()
 
         flash("Drive updated successfully!", "success")
@@ -522,6 +669,7 @@ def delete_drive(id):
         return redirect(url_for("main.company_dashboard"))
 
     db.session.delete(drive)
+    invalidate_open_drives()
     db.session.commit()
 
     flash("Drive deleted successfully!", "success")
@@ -535,24 +683,26 @@ def update_application_status(id, status):
     if session.get("role") != "COMPANY":
         return redirect(url_for("main.login"))
 
-    application = Application.query.get_or_404(id)
+    application = Application.query.options(
+        *load_profile("application_drive")
+    ).get_or_404(id)
     company = CompanyProfile.query.filter_by(user_id=session["user_id"]).first()
 
     if application.placement_drive.company_id != company.id:
         flash("Unauthorized action", "danger")
         return redirect(url_for("main.company_dashboard"))
 
-    # Update status
-    application.status = status.upper()
-    db.session.commit()
+    if status.upper() not in APPLICATION_STATUSES:
+        flash("Invalid application status", "danger")
+        return redirect(url_for("main.view_applications", id=application.drive_id))
 
-    # CREATE NOTIFICATION FOR STUDENT
-    notification = Notification(
-        student_id=application.student_id,
-        message=f"Your application for '{application.placement_drive.job_title}' has been {application.status}."
+    # Update status and queue the student's notification in one commit
+    application.status = status.upper()
+    notify_students(
+        [application.student_id],
+        f"Your application for '{application.placement_drive.job_title}' has been {application.status}."
     )
-
-    db.session.add(notification)
+    publish_after_commit(application.student_id, application_event(application.id, application.status))
     db.session.commit()
 
     flash("Application status updated", "success")
@@ -562,6 +712,75 @@ def update_application_status(id, status):
                 id=application.drive_id)
     )
 
+# BULK UPDATE APPLICATION STATUS
+# =========================================================
+@bp.route("/company/drive/<int:id>/applications/status", methods=["POST"])
+def bulk_update_application_status(id):
+
+    if session.get("role") != "COMPANY":
+        return redirect(url_for("main.login"))
+
+    drive = PlacementDrive.query.get_or_404(id)
+    company = CompanyProfile.query.filter_by(user_id=session["user_id"]).first()
+
+    # 🔒 Ownership checked once for the whole batch
+    if not company or drive.company_id != company.id:
+        flash("Unauthorized action", "danger")
+        return redirect(url_for("main.company_dashboard"))
+
+    status = request.form.get("status", "").upper()
+    application_ids = request.form.getlist("application_ids", type=int)
+
+    if status not in APPLICATION_STATUSES:
+        flash("Invalid application status", "danger")
+        return redirect(url_for("main.view_applications", id=id))
+
+    if not application_ids:
+        flash("Select at least one application", "warning")
+        return redirect(url_for("main.view_applications", id=id))
+
+    # One guarded UPDATE per previous status: the WHERE clause re-checks the
+    # old status, so a concurrent change is never counted or notified twice,
+    # and RETURNING yields exactly the rows this request changed
+    changed = []
+    deltas = {}
+    for old_status in APPLICATION_STATUSES:
+        if old_status == status:
+            continue
+        rows = db.session.execute(
+            db.update(Application)
+            .where(
+                Application.drive_id == id,
+                Application.id.in_(application_ids),
+                Application.status == old_status
+            )
+            .values(status=status)
+            .returning(Application.id, Application.student_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if rows:
+            changed.extend(rows)
+            deltas[f"applications:{old_status}"] = -len(rows)
+
+    if changed:
+        # One queued notification event for all the students ...
+        notify_students(
+            [row.student_id for row in changed],
+            f"Your application for '{drive.job_title}' has been {status}."
+        )
+        for row in changed:
+            publish_after_commit(row.student_id, application_event(row.id, status))
+        invalidate_applications(row.student_id for row in changed)
+
+        deltas[f"applications:{status}"] = len(changed)
+        record_deltas(db.session, deltas)
+
+        # ... and a single commit
+        db.session.commit()
+
+    flash(f"{len(changed)} application(s) marked as {status}", "success")
+    return redirect(url_for("main.view_applications", id=id))
+
 ###-----Student Dashboard & Application Routes-----###
 
 @bp.route("/student")
@@ -577,75 +796,31 @@ def student_dashboard():
     if not student_id:
         return redirect(url_for("main.login"))
 
-    today = datetime.utcnow().date()
     search = request.args.get("search", "").strip()
 
-    from sqlalchemy.orm import joinedload
-
-    # =====================================================
-    # Available Drives (Approved + Not Expired)
-    # =====================================================
-    drives_query = PlacementDrive.query.options(
-        joinedload(PlacementDrive.company)
-    ).join(CompanyProfile).filter(
-        PlacementDrive.status != None,
-        PlacementDrive.application_deadline >= today,
-        CompanyProfile.approval_status == "APPROVED",
-        CompanyProfile.is_blacklisted.is_(False)
-    )
-
-    # 🔍 Search Filter
-    if search:
-        drives_query = drives_query.filter(
-            (PlacementDrive.job_title.ilike(f"%{search}%")) |
-            (PlacementDrive.required_skills.ilike(f"%{search}%")) |
-            (CompanyProfile.company_name.ilike(f"%{search}%"))
-        )
-
-    drives = drives_query.order_by(
-        PlacementDrive.application_deadline.asc()
-    ).all()
-
     # =====================================================
-    # My Applications (All)
+    # Fragments: available drives (shared), my applications
+    # and notifications (per student), each served from cache
     # =====================================================
-    my_applications = Application.query.options(
-        joinedload(Application.placement_drive).joinedload(PlacementDrive.company)
-    ).filter_by(
-        student_id=student_id
-    ).all()
+    context = {}
+    for name in FRAGMENTS:
+        context.update(fragment_context(name, student_id, search))
 
     # =====================================================
-    # Placement History (Only Selected)
+    # Render Template
     # =====================================================
-    placement_history = [
-    app for app in my_applications if app.status in ["SELECTED", "PLACED"]
-]
+    return render_template("student_dashboard.html", **context)
 
-    # =====================================================
-    # Notifications
-    # =====================================================
-    notifications = Notification.query.filter_by(
-        student_id=student_id
-    ).order_by(
-        Notification.created_at.desc()
-    ).all()
 
-    unread_count = Notification.query.filter_by(
-        student_id=student_id,
-        is_read=False
-    ).count()
+@bp.route("/student/fragments/<name>")
+def student_fragment(name):
+    if session.get("role") != "STUDENT":
+        abort(401)
+    if name not in FRAGMENTS:
+        abort(404)
 
-    # =====================================================
-    # Render Template
-    # =====================================================
-    return render_template(
-        "student_dashboard.html",
-        drives=drives,
-        my_applications=my_applications,
-        placement_history=placement_history,
-        notifications=notifications,
-        unread_count=unread_count
+    return render_fragment(
+        name, session["user_id"], request.args.get("search", "")
     )
 
 
@@ -655,29 +830,20 @@ def apply_drive(drive_id):
     if session.get("role") != "STUDENT":
         return redirect(url_for("main.login"))
 
-    drive = PlacementDrive.query.get_or_404(drive_id)
-
-    # Check if already applied
-    existing = Application.query.filter_by(
-        drive_id=drive_id,
-        student_id=session["user_id"]
-    ).first()
-
-    if existing:
-        flash("You already applied to this drive.", "warning")
+    # Eligibility check and insert in one statement =================
+    try:
+        result = apply_to_drive(session["user_id"], drive_id)
+    except ApplyBusy:
+        flash("Too many applications right now, please try again in a moment.", "warning")
         return redirect(url_for("main.student_dashboard"))
+    except ApplyPending:
+        flash("Your application is still being processed. It will appear under your applications shortly.", "info")
+        return redirect(url_for("main.student_dashboard"))
+    if result == NOT_FOUND:
+        abort(404)
 
-    # Create new application
-    new_application = Application(
-        drive_id=drive_id,
-        student_id=session["user_id"],
-        status="APPLIED"
-    )
-
-    db.session.add(new_application)
-    db.session.commit()
-
-    flash("Application submitted successfully!", "success")
+    message, category = APPLY_MESSAGES[result]
+    flash(message, category)
     return redirect(url_for("main.student_dashboard"))
 
 
@@ -705,18 +871,13 @@ def student_profile():
         file = request.files.get("resume")
 
         if file and file.filename != "":
-            # Make filename unique (prevents overwrite)
-            unique_filename = f"{uuid.uuid4().hex}_{secure_filename(file.filename)}"
-
-            # IMPORTANT: Use absolute path from app root
-            upload_folder = os.path.join(current_app.root_path, "static", "resumes")
-            os.makedirs(upload_folder, exist_ok=True)
-
-            filepath = os.path.join(upload_folder, unique_filename)
-            file.save(filepath)
-
-            # Store only relative path in DB
-            profile.resume_path = f"resumes/{unique_filename}"
+            # Stored once per distinct content, named by its hash
+            try:
+                attach_resume(profile, store_resume(file))
+            except ResumeRejected as e:
+                db.session.rollback()
+                flash(str(e), "danger")
+                return redirect(url_for("main.student_profile"))
 
         db.session.commit()
         flash("Profile updated successfully!", "success")
@@ -728,16 +889,71 @@ def student_profile():
         profile=profile
     )
 
+@bp.route("/student/resume/<filename>")
+def student_resume(filename):
+    if session.get("role") != "STUDENT":
+        return redirect(url_for("main.login"))
+
+    profile = StudentProfile.query.filter_by(user_id=session["user_id"]).first_or_404()
+    return send_resume(profile.resume_path, filename)
+
 @bp.route("/student/notifications/read")
 def mark_notifications_read():
-    student_id = session.get("user_id")
-
-    Notification.query.filter_by(
-        student_id=student_id,
-        is_read=False
-    ).update({"is_read": True})
+    if session.get("role") != "STUDENT":
+        return redirect(url_for("main.login"))
 
+    mark_all_read(session["user_id"])
     db.session.commit()
 
     return redirect(url_for("main.student_dashboard"))
 
+
+# LIVE EVENTS (SERVER-SENT EVENTS)
+# =========================================================
+@bp.route("/student/events")
+def student_events():
+    if session.get("role") != "STUDENT":
+        abort(401)
+
+    # EventSource resends the last id on reconnect; the first connection
+    # passes the feed cursor the dashboard was rendered with
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("after")
+    return event_stream(session["user_id"], last_event_id)
+
+
+# NOTIFICATION FEED (JSON)
+# =========================================================
+@bp.route("/student/notifications")
+def notification_feed_api():
+    if session.get("role") != "STUDENT":
+        abort(401)
+
+    student_id = session["user_id"]
+    limit = min(request.args.get("limit", FEED_PAGE_SIZE, type=int), 100)
+    items, next_cursor = notification_feed(
+        student_id, before=request.args.get("before"), limit=max(limit, 1)
+    )
+
+    return jsonify(
+        items=[feed_item(note) for note in items],
+        next_cursor=next_cursor,
+        unread_count=unread_count(student_id)
+    )
+
+
+@bp.route("/student/notifications/poll")
+def notification_poll():
+    """Only what is newer than ``after``; an empty poll is two indexed reads."""
+    if session.get("role") != "STUDENT":
+        abort(401)
+
+    student_id = session["user_id"]
+    after = request.args.get("after", "")
+    items = notifications_since(student_id, after)
+
+    return jsonify(
+        items=[feed_item(note) for note in items],
+        cursor=encode_cursor(items[-1]) if items else after,
+        unread_count=unread_count(student_id)
+    )
+
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+from datetime import datetime, time, timedelta
+
+from flask import current_app, make_response, render_template, request
+from sqlalchemy import event
+
+from .cache import MISSING, cache, cached, invalidate_after_commit, shared_versions, version
+from .loading import load_profile
+from .matching import recommend_drives
+from .models import db, CompanyProfile, PlacementDrive, Application, Notification
+from .notifications import head_cursor, notification_feed, unread_count
+from .search import drive_search_filter, search_drive_ids
+
+
+# -----------------------------
+# STUDENT DASHBOARD FRAGMENTS
+# -----------------------------
+# The dashboard is three independent fragments, each built from plain
+# cached data and each also served on its own (/student/fragments/<name>):
+#
+#   drives         open drives (shared by every student) and  version "drives" + "skills:<id>"
+#                  the student's skill-matched recommendations
+#   applications   the student's applications / placements   "applications:<id>" + "drives"
+#   notifications  first feed page and unread count          "notifications:<id>"
+#
+# Versions are bumped after commit: "drives" by the routes that change the
+# listing (invalidate_open_drives), the per-student ones by the ORM hook
+# below and explicitly by code that writes with set-based SQL (bulk status
+# updates, the notification worker, mark-all-read).
+#
+# With CACHE_BACKEND=memory versions are per process: a student whose apply
+# went through another worker would be shown this worker's old entry. So
+# per-student data is then read fresh on every request, and fragment ETags
+# are computed from the data instead of from versions.
+
+FRAGMENTS = ("drives", "applications", "notifications")
+
+
+def _today():
+    return datetime.utcnow().date()
+
+
+# -----------------------------
+# OPEN DRIVES SNAPSHOT
+# -----------------------------
+# Every student sees the same list of open drives, so it is built once per
+# version of "drives" and shared (across processes with CACHE_BACKEND=sqlite).
+# Writes that change the list call invalidate_open_drives(). The only other
+# thing that changes it is time: a drive drops out the day after its
+# deadline, so the snapshot is stored until the earliest deadline among its
+# drives has passed, and at most OPEN_DRIVES_MAX_AGE_SECONDS. With the memory
+# backend another process's invalidations are never seen here, so the
+# snapshot then lives no longer than CACHE_TTL_SECONDS.
+
+def open_drives_snapshot():
+    """Every open drive, soonest deadline first, as plain dicts."""
+    key = ("open_drives", version("drives"))
+    snapshot = cache().get(key)
+    if snapshot is MISSING or snapshot["today"] != _today():
+        snapshot = _load_open_drives()
+        cache().set(key, snapshot, _seconds_until_stale(snapshot["drives"]))
+    return snapshot
+
+
+def open_drive_filter(today=None):
+    """Drives that are listed and accept applications (joined with CompanyProfile)."""
+    if today is None:
+        today = _today()
+    return db.and_(
+        PlacementDrive.status == "APPROVED",
+        PlacementDrive.application_deadline >= today,
+        CompanyProfile.approval_status == "APPROVED",
+        CompanyProfile.is_blacklisted.is_(False)
+    )
+
+
+def _load_open_drives():
+    today = _today()
+    drives = PlacementDrive.query.options(
+        *load_profile("student_drives")
+    ).join(CompanyProfile).filter(
+        open_drive_filter(today)
+    ).order_by(PlacementDrive.application_deadline.asc()).all()
+
+    return {
+        "today": today,
+        "drives": [{
+            "id": drive.id,
+            "company_name": drive.company.company_name,
+            "job_title": drive.job_title,
+            "application_deadline": drive.application_deadline,
+        } for drive in drives],
+    }
+
+
+def _seconds_until_stale(drives):
+    max_age = current_app.config["OPEN_DRIVES_MAX_AGE_SECONDS"]
+    if not shared_versions():
+        max_age = min(max_age, current_app.config["CACHE_TTL_SECONDS"])
+    if not drives:
+        return max_age
+    # Drives are sorted by deadline; the first one expires first
+    expires = datetime.combine(drives[0]["application_deadline"] + timedelta(days=1), time.min)
+    return max(0, min(max_age, (expires - datetime.utcnow()).total_seconds()))
+
+
+def open_drives(search=""):
+    """Open drives, optionally narrowed to a search (best match first)."""
+    drives = open_drives_snapshot()["drives"]
+    search = search.strip()
+    if not search:
+        return drives
+
+    matches = cached(
+        ("drive_search", version("drives"), search.lower()), lambda: _search_drive_ids(search)
+    )
+    by_id = {drive["id"]: drive for drive in drives}
+    return [by_id[drive_id] for drive_id in matches if drive_id in by_id]
+
+
+def _search_drive_ids(search):
+    # 🔍 Search Filter (full-text index, ILIKE when FTS is unavailable)
+    # Only open drives are matched, in SQL, so closed ones never crowd them out
+    ranked_ids = search_drive_ids(search, open_drive_filter())
+    if ranked_ids is not None:
+        return ranked_ids
+    return [drive_id for drive_id, in db.session.query(PlacementDrive.id).join(
+        CompanyProfile
+    ).filter(
+        drive_search_filter(search), open_drive_filter()
+    ).order_by(PlacementDrive.application_deadline.asc())]
+
+
+def invalidate_open_drives():
+    """Rebuild the open drives snapshot once the current transaction commits."""
+    invalidate_after_commit("drives")
+
+
+def _student_cached(key, build):
+    """cached() for one student's data, only when every process sees its versions."""
+    if not shared_versions():
+        return build()
+    return cached(key, build)
+
+
+def student_applications(student_id):
+    """The student's applications with their drive and company names."""
+    key = ("applications", student_id, version(f"applications:{student_id}"), version("drives"))
+    return _student_cached(key, lambda: [{
+        "id": application.id,
+        "drive_id": application.drive_id,
+        "status": application.status,
+        "company_name": application.placement_drive.company.company_name,
+        "job_title": application.placement_drive.job_title,
+    } for application in Application.query.options(
+        *load_profile("student_applications")
+    ).filter_by(student_id=student_id)])
+
+
+def student_notifications(student_id):
+    """First feed page, its paging cursors and the unread count."""
+    key = ("notifications", student_id, version(f"notifications:{student_id}"))
+
+    def build():
+        items, next_cursor = notification_feed(student_id)
+        return {
+            "items": [{
+                "id": note.id,
+                "message": note.message,
+                "is_read": note.is_read,
+                "created_at": note.created_at,
+            } for note in items],
+            "next_cursor": next_cursor,
+            "latest_cursor": head_cursor(items),
+            "unread_count": unread_count(student_id),
+        }
+
+    return _student_cached(key, build)
+
+
+def fragment_context(name, student_id, search=""):
+    """Template context for one fragment (drives also needs the applications)."""
+    if name == "notifications":
+        notifications = student_notifications(student_id)
+        return {
+            "notifications": notifications["items"],
+            "notifications_cursor": notifications["next_cursor"],
+            "latest_cursor": notifications["latest_cursor"],
+            "unread_count": notifications["unread_count"],
+        }
+
+    my_applications = student_applications(student_id)
+    if name == "applications":
+        return {
+            "my_applications": my_applications,
+            "placement_history": [
+                app for app in my_applications if app["status"] in ("SELECTED", "PLACED")
+            ],
+        }
+
+    applied_drive_ids = {app["drive_id"] for app in my_applications}
+    return {
+        "drives": open_drives(search),
+        "applied_drive_ids": applied_drive_ids,
+        "recommended": [] if search.strip() else recommended_drives(student_id, applied_drive_ids),
+    }
+
+
+def recommended_drives(student_id, applied_drive_ids):
+    """Open drives the student has not applied to, best skill match first."""
+    drives = {drive["id"]: drive for drive in open_drives_snapshot()["drives"]}
+    candidates = drives.keys() - applied_drive_ids
+    return [
+        dict(drives[match["id"]], score=match["score"], matched_skills=match["skills"])
+        for match in recommend_drives(student_id, candidates)
+    ]
+
+
+def fragment_etag(name, student_id, search=""):
+    """ETag from the versions a fragment depends on; needs no query."""
+    if name == "notifications":
+        parts = (name, student_id, version(f"notifications:{student_id}"))
+    else:
+        parts = (
+            name, student_id, version(f"applications:{student_id}"), version("drives"),
+            version(f"skills:{student_id}"), _today(), search.strip().lower()
+        )
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _data_etag(name, context):
+    """ETag from the fragment's data, for when versions are per process."""
+    data = json.dumps(
+        [name, context], sort_keys=True,
+        default=lambda value: sorted(value) if isinstance(value, set) else str(value)
+    )
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+def render_fragment(name, student_id, search=""):
+    context = None
+    if shared_versions():
+        etag = fragment_etag(name, student_id, search)
+    else:
+        context = fragment_context(name, student_id, search)
+        etag = _data_etag(name, context)
+
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        response = make_response(render_template(
+            f"_student_{name}.html", **(context or fragment_context(name, student_id, search))
+        ))
+    response.set_etag(etag)
+    # Revalidate every time; a 304 costs no rendering (and with shared
+    # versions no query either)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+# -----------------------------
+# INVALIDATION (SESSION EVENTS)
+# -----------------------------
+
+def _collect_invalidations(session, flush_context):
+    names = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Application):
+            names.add(f"applications:{obj.student_id}")
+        elif isinstance(obj, Notification):
+            names.add(f"notifications:{obj.student_id}")
+
+    if names:
+        invalidate_after_commit(*names, session=session)
+
+
+def invalidate_applications(student_ids):
+    invalidate_after_commit(*(f"applications:{student_id}" for student_id in student_ids))
+
+
+def init_dashboard(app):
+    app.config["OPEN_DRIVES_MAX_AGE_SECONDS"] = float(
+        os.getenv("OPEN_DRIVES_MAX_AGE_SECONDS", 3600)
+    )
+
+    if not event.contains(db.session, "after_flush", _collect_invalidations):
+        event.listen(db.session, "after_flush", _collect_invalidations)
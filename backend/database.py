@@ -0,0 +1,104 @@
+import os
+
+from sqlalchemy import event, insert
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import make_url
+
+from .models import db
+
+
+# -----------------------------
+# DATABASE CONFIGURATION
+# -----------------------------
+# Everything is read from the environment (or .env) so deployments can tune
+# the engine without code changes.
+#
+# SQLite (default) - applied to every new connection through PRAGMAs:
+#   SQLITE_JOURNAL_MODE     WAL      readers no longer block on the writer
+#   SQLITE_SYNCHRONOUS      NORMAL   safe with WAL, far fewer fsyncs
+#   SQLITE_BUSY_TIMEOUT_MS  5000     wait for the write lock instead of failing
+#   SQLITE_MMAP_SIZE        268435456
+#   SQLITE_CACHE_SIZE_KB    65536
+#
+# Server databases (PostgreSQL, MySQL, ...) - connection pool:
+#   DB_POOL_SIZE 10, DB_MAX_OVERFLOW 20, DB_POOL_TIMEOUT 30,
+#   DB_POOL_RECYCLE 1800, DB_POOL_PRE_PING true
+
+DEFAULT_DATABASE_URL = "sqlite:///PLACEMENT_PORTAL.sqlite3"
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+def sqlite_pragmas():
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+        "mmap_size": _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+        # negative cache_size is in KiB rather than pages
+        "cache_size": -_env_int("SQLITE_CACHE_SIZE_KB", 64 * 1024),
+        "temp_store": "MEMORY",
+    }
+
+
+def engine_options(database_url):
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {
+            # the driver-level timeout covers the window before PRAGMAs run
+            "connect_args": {
+                "timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000
+            },
+        }
+
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+def configure_database(app):
+    """Set the database URI, engine options and SQLite PRAGMAs on ``app``."""
+    database_url = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(database_url)
+    app.config["SQLITE_PRAGMAS"] = sqlite_pragmas()
+
+
+def _apply_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return on_connect
+
+
+def init_database(app):
+    """Install the connect-time PRAGMAs once the engine exists."""
+    with app.app_context():
+        engine = db.engine
+
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _apply_pragmas(app.config["SQLITE_PRAGMAS"]))
+
+
+def insert_ignore(model):
+    """INSERT that silently skips rows violating a unique constraint."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        # Imported here: the PostgreSQL dialect adds ~50 ms to every SQLite worker's startup
+        from sqlalchemy.dialects import postgresql
+        return postgresql.insert(model).on_conflict_do_nothing()
+    return insert(model).prefix_with("IGNORE")
@@ -0,0 +1,325 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, current_app, stream_with_context
+from sqlalchemy import event
+
+from .models import db, Application
+from .notifications import (
+    decode_cursor, encode_cursor, feed_item, head_cursor, notification_feed,
+    notifications_since
+)
+
+
+# -----------------------------
+# PUSH EVENTS (SERVER-SENT EVENTS)
+# -----------------------------
+# /student/events keeps one text/event-stream response open per dashboard
+# and pushes two kinds of events to it:
+#
+#   notification   a Notification row was delivered (data: feed item)
+#   application    an Application changed status (data: id, status)
+#
+# Events reach the stream through a broker chosen by EVENT_BROKER:
+#
+#   memory    (default) in-process pub/sub. The notification worker and the
+#             routes publish after their commit; subscribers get a bounded
+#             queue each. Only reaches streams served by the same process.
+#   database  no publishing at all; each stream polls the notification and
+#             application tables for its student every EVENT_POLL_SECONDS.
+#             Works across processes, costs two indexed reads per poll.
+#
+# Every notification event carries its feed cursor as the SSE id, so a
+# reconnecting EventSource (Last-Event-ID) first receives what it missed.
+#
+# An open stream occupies a worker thread (or greenlet) for up to
+# EVENT_STREAM_MAX_SECONDS. At most EVENT_STREAM_MAX_OPEN streams are served
+# per process; beyond that the request gets a 204, which tells EventSource
+# not to reconnect, and the dashboard polls instead. On sync or threaded
+# workers keep the limit well below the thread count, or serve the app with
+# an async worker (gevent) so streams do not take threads from other routes.
+
+HEARTBEAT_SECONDS = 15
+RECONNECT_MS = 3000
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def events_config():
+    return {
+        "EVENT_BROKER": os.getenv("EVENT_BROKER", "memory"),
+        "EVENT_POLL_SECONDS": float(os.getenv("EVENT_POLL_SECONDS", 2)),
+        # Streams are closed after this long; the browser reconnects on its own
+        "EVENT_STREAM_MAX_SECONDS": float(os.getenv("EVENT_STREAM_MAX_SECONDS", 300)),
+        "EVENT_STREAM_MAX_OPEN": int(os.getenv("EVENT_STREAM_MAX_OPEN", 16)),
+    }
+
+
+def notification_event(notification):
+    item = feed_item(notification)
+    return {"type": "notification", "id": item["cursor"], "data": item}
+
+
+def application_event(application_id, status):
+    return {"type": "application", "data": {"id": application_id, "status": status}}
+
+
+# -----------------------------
+# IN-PROCESS BROKER
+# -----------------------------
+
+class Subscription:
+    def __init__(self, student_id):
+        self.student_id = student_id
+        self.cursor = None
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def put(self, item):
+        # A stalled client loses its oldest events rather than blocking publishers
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        """Events ready within ``timeout`` seconds (possibly none)."""
+        try:
+            items = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                return items
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, student_id):
+        subscription = Subscription(student_id)
+        with self._lock:
+            self._subscribers[student_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.student_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.student_id]
+
+    def publish(self, student_id, item):
+        with self._lock:
+            subscribers = list(self._subscribers.get(student_id, ()))
+        for subscription in subscribers:
+            subscription.put(item)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+# -----------------------------
+# DATABASE POLLING BROKER
+# -----------------------------
+
+class PollingSubscription:
+    def __init__(self, student_id, poll_seconds):
+        self.student_id = student_id
+        # Feed cursor, set by event_stream once it knows where the client is
+        self.cursor = None
+        self.poll_seconds = poll_seconds
+        self.statuses = self._statuses()
+
+    def _statuses(self):
+        return dict(db.session.query(Application.id, Application.status).filter(
+            Application.student_id == self.student_id
+        ))
+
+    def get(self, timeout):
+        time.sleep(min(timeout, self.poll_seconds))
+        items = [
+            notification_event(notification)
+            for notification in notifications_since(self.student_id, self.cursor)
+        ]
+
+        statuses = self._statuses()
+        items.extend(
+            application_event(application_id, status)
+            for application_id, status in statuses.items()
+            if self.statuses.get(application_id) != status
+        )
+        self.statuses = statuses
+
+        # Release the connection between polls
+        db.session.close()
+        return items
+
+
+class DatabaseBroker:
+    def __init__(self, poll_seconds):
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def subscribe(self, student_id):
+        with self._lock:
+            self._count += 1
+        return PollingSubscription(student_id, self.poll_seconds)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._count -= 1
+
+    def publish(self, student_id, item):
+        pass
+
+    def subscriber_count(self):
+        return self._count
+
+
+BROKERS = {
+    "memory": lambda app: InProcessBroker(),
+    "database": lambda app: DatabaseBroker(app.config["EVENT_POLL_SECONDS"]),
+}
+
+
+def broker():
+    return current_app.extensions["event_broker"]
+
+
+# -----------------------------
+# PUBLISHING
+# -----------------------------
+
+def publish(student_id, item):
+    broker().publish(student_id, item)
+
+
+def publish_after_commit(student_id, item):
+    """Publish ``item`` once the current transaction commits."""
+    db.session.info.setdefault("pending_events", []).append((student_id, item))
+
+
+def _publish_pending(session):
+    pending = session.info.pop("pending_events", None)
+    if pending:
+        for student_id, item in pending:
+            publish(student_id, item)
+
+
+def _drop_pending(session):
+    session.info.pop("pending_events", None)
+
+
+# -----------------------------
+# STREAM
+# -----------------------------
+
+def _format(item):
+    lines = [f"event: {item['type']}"]
+    if item.get("id"):
+        lines.append(f"id: {item['id']}")
+    lines.append(f"data: {json.dumps(item['data'])}")
+    return "\n".join(lines) + "\n\n"
+
+
+def event_stream(student_id, last_event_id=None):
+    """text/event-stream response for one student's dashboard.
+
+    ``last_event_id`` is the feed cursor the client has already seen; newer
+    notifications are replayed before live events.
+    """
+    max_seconds = current_app.config["EVENT_STREAM_MAX_SECONDS"]
+    slots = current_app.extensions["event_stream_slots"]
+    if not slots.acquire(blocking=False):
+        return Response(status=204)
+
+    # Subscribe before the catch-up read so nothing falls in between
+    stream_broker = broker()
+    subscription = stream_broker.subscribe(student_id)
+
+    def close():
+        # Runs when the server closes the response, even if it was never iterated
+        stream_broker.unsubscribe(subscription)
+        slots.release()
+
+    try:
+        if decode_cursor(last_event_id):
+            missed = notifications_since(student_id, last_event_id)
+            subscription.cursor = encode_cursor(missed[-1]) if missed else last_event_id
+        else:
+            missed = []
+            subscription.cursor = head_cursor(notification_feed(student_id, limit=1)[0])
+    except Exception:
+        close()
+        raise
+    # Live events may repeat what the catch-up read already returned
+    replayed = {notification.id for notification in missed}
+    db.session.close()
+
+    @stream_with_context
+    def generate():
+        started = time.monotonic()
+        yield f"retry: {RECONNECT_MS}\n\n"
+        for notification in missed:
+            yield _format(notification_event(notification))
+
+        last_sent = time.monotonic()
+        while time.monotonic() - started < max_seconds:
+            items = subscription.get(timeout=HEARTBEAT_SECONDS)
+            if not items:
+                # Comment line: keeps proxies from closing an idle stream
+                if time.monotonic() - last_sent >= HEARTBEAT_SECONDS:
+                    last_sent = time.monotonic()
+                    yield ": keepalive\n\n"
+                continue
+            last_sent = time.monotonic()
+            for item in items:
+                if item["type"] == "notification":
+                    if item["data"]["id"] in replayed:
+                        continue
+                    subscription.cursor = item["id"]
+                yield _format(item)
+
+    response = Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Stop reverse proxies from buffering the stream
+        "X-Accel-Buffering": "no",
+    })
+    response.call_on_close(close)
+    return response
+
+
+def prometheus_lines():
+    return [
+        "# HELP portal_event_streams Open server-sent event streams.",
+        "# TYPE portal_event_streams gauge",
+        f"portal_event_streams {broker().subscriber_count()}",
+    ]
+
+
+def init_events(app):
+    app.config.update(events_config())
+    app.extensions["event_broker"] = BROKERS[app.config["EVENT_BROKER"]](app)
+    app.extensions["event_stream_slots"] = threading.BoundedSemaphore(app.config["EVENT_STREAM_MAX_OPEN"])
+
+    if not event.contains(db.session, "after_commit", _publish_pending):
+        event.listen(db.session, "after_commit", _publish_pending)
+        event.listen(db.session, "after_rollback", _drop_pending)
+
+    from .instrumentation import register_metrics
+    register_metrics(prometheus_lines)
@@ -0,0 +1,274 @@
+import heapq
+import os
+import threading
+import time
+from collections import deque
+
+from flask import (
+    Blueprint, Response, before_render_template, current_app, g,
+    has_request_context, redirect, render_template, request, session,
+    template_rendered, url_for
+)
+from sqlalchemy import event
+
+from .models import db
+
+
+# -----------------------------
+# REQUEST INSTRUMENTATION
+# -----------------------------
+# Every request records its wall time, template render time, SQL statement
+# count, total SQL time and its slowest statements. The numbers are sent
+# back in a Server-Timing header (visible in the browser dev tools) and fed
+# into per-endpoint rolling histograms, which are served at /admin/metrics
+# (admin session) and /metrics (Prometheus text; admin session or
+# "Authorization: Bearer $METRICS_TOKEN").
+
+# Prometheus histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WINDOW_SIZE = 1000
+SLOW_STATEMENTS_PER_REQUEST = 3
+SLOW_STATEMENTS_PER_ENDPOINT = 10
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.render_started = None
+        self.slow_statements = []
+
+    def add_statement(self, statement, elapsed):
+        self.sql_count += 1
+        self.sql_time += elapsed
+
+        entry = (elapsed, statement)
+        if len(self.slow_statements) < SLOW_STATEMENTS_PER_REQUEST:
+            heapq.heappush(self.slow_statements, entry)
+        elif elapsed > self.slow_statements[0][0]:
+            heapq.heapreplace(self.slow_statements, entry)
+
+
+class EndpointHistogram:
+    def __init__(self):
+        self.window = deque(maxlen=WINDOW_SIZE)
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.duration_sum = 0.0
+        self.sql_count_sum = 0
+        self.sql_time_sum = 0.0
+        self.render_time_sum = 0.0
+        self.slow_statements = []
+
+    def observe(self, duration, timings):
+        self.window.append(duration)
+        self.count += 1
+        self.duration_sum += duration
+        self.sql_count_sum += timings.sql_count
+        self.sql_time_sum += timings.sql_time
+        self.render_time_sum += timings.render_time
+
+        for i, bound in enumerate(BUCKETS):
+            if duration <= bound:
+                self.bucket_counts[i] += 1
+
+        for entry in timings.slow_statements:
+            if len(self.slow_statements) < SLOW_STATEMENTS_PER_ENDPOINT:
+                heapq.heappush(self.slow_statements, entry)
+            elif entry[0] > self.slow_statements[0][0]:
+                heapq.heapreplace(self.slow_statements, entry)
+
+    def percentile(self, pct):
+        if not self.window:
+            return 0.0
+        ordered = sorted(self.window)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        count = self.count or 1
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "avg_sql": self.sql_count_sum / count,
+            "avg_sql_ms": self.sql_time_sum / count * 1000,
+            "avg_render_ms": self.render_time_sum / count * 1000,
+            "slow_statements": [
+                (elapsed * 1000, statement)
+                for elapsed, statement in sorted(self.slow_statements, reverse=True)
+            ],
+        }
+
+
+_lock = threading.Lock()
+_histograms = {}
+# Other subsystems' Prometheus lines, see register_metrics()
+_collectors = []
+
+
+def current_timings():
+    """Timings of the request being handled, or None outside a request."""
+    if not has_request_context():
+        return None
+    return g.get("timings")
+
+
+def endpoint_summaries():
+    with _lock:
+        return {
+            endpoint: histogram.summary()
+            for endpoint, histogram in sorted(_histograms.items())
+        }
+
+
+def register_metrics(collector):
+    """Append the lines returned by ``collector()`` to the /metrics output."""
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+def reset_metrics():
+    with _lock:
+        _histograms.clear()
+
+
+# -----------------------------
+# HOOKS
+# -----------------------------
+
+# The start time lives on the execution context, which is discarded with the
+# statement, so a statement that fails leaves nothing behind on the connection
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = context._query_started
+    timings = current_timings()
+    if timings is not None:
+        timings.add_statement(statement, time.perf_counter() - started)
+
+
+def _before_render(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None:
+        timings.render_started = time.perf_counter()
+
+
+def _after_render(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None and timings.render_started is not None:
+        timings.render_time += time.perf_counter() - timings.render_started
+        timings.render_started = None
+
+
+def _start_request():
+    g.timings = RequestTimings()
+
+
+def _finish_request(response):
+    timings = g.get("timings")
+    if timings is None:
+        return response
+
+    duration = time.perf_counter() - timings.started
+    response.headers["Server-Timing"] = (
+        f"app;dur={duration * 1000:.1f}, "
+        f'db;dur={timings.sql_time * 1000:.1f};desc="{timings.sql_count} queries", '
+        f"render;dur={timings.render_time * 1000:.1f}"
+    )
+
+    endpoint = request.endpoint or "<unmatched>"
+    with _lock:
+        histogram = _histograms.get(endpoint)
+        if histogram is None:
+            histogram = _histograms[endpoint] = EndpointHistogram()
+        histogram.observe(duration, timings)
+
+    return response
+
+
+# -----------------------------
+# METRICS ENDPOINTS
+# -----------------------------
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+def _metrics_authorized():
+    if session.get("role") == "ADMIN":
+        return True
+    token = current_app.config.get("METRICS_TOKEN")
+    return bool(token) and request.headers.get("Authorization") == f"Bearer {token}"
+
+
+@metrics_bp.route("/admin/metrics")
+def admin_metrics():
+    if session.get("role") != "ADMIN":
+        return redirect(url_for("main.login"))
+
+    return render_template("admin_metrics.html", endpoints=endpoint_summaries())
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text():
+    with _lock:
+        histograms = sorted(_histograms.items())
+        lines = [
+            "# HELP portal_request_duration_seconds Request wall time.",
+            "# TYPE portal_request_duration_seconds histogram",
+        ]
+        for endpoint, histogram in histograms:
+            label = f'endpoint="{_label(endpoint)}"'
+            for bound, total in zip(BUCKETS, histogram.bucket_counts):
+                lines.append(f'portal_request_duration_seconds_bucket{{{label},le="{bound}"}} {total}')
+            lines.append(f'portal_request_duration_seconds_bucket{{{label},le="+Inf"}} {histogram.count}')
+            lines.append(f"portal_request_duration_seconds_sum{{{label}}} {histogram.duration_sum}")
+            lines.append(f"portal_request_duration_seconds_count{{{label}}} {histogram.count}")
+
+        for name, attr, help_text in (
+            ("portal_sql_statements_total", "sql_count_sum", "SQL statements issued."),
+            ("portal_sql_seconds_total", "sql_time_sum", "Time spent executing SQL."),
+            ("portal_render_seconds_total", "render_time_sum", "Time spent rendering templates."),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for endpoint, histogram in histograms:
+                lines.append(f'{name}{{endpoint="{_label(endpoint)}"}} {getattr(histogram, attr)}')
+
+    for collector in _collectors:
+        lines.extend(collector())
+
+    return "\n".join(lines) + "\n"
+
+
+@metrics_bp.route("/metrics")
+def prometheus_metrics():
+    if not _metrics_authorized():
+        return Response("Forbidden\n", status=403, mimetype="text/plain")
+
+    return Response(prometheus_text(), mimetype="text/plain; version=0.0.4")
+
+
+def init_instrumentation(app):
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN")
+
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.register_blueprint(metrics_bp)
@@ -0,0 +1,59 @@
+from sqlalchemy.orm import configure_mappers, joinedload, selectinload, undefer
+
+from .models import User, PlacementDrive, Application
+
+# backref attributes (Application.student, PlacementDrive.company, ...) only
+# exist once the mappers are configured
+configure_mappers()
+
+
+# -----------------------------
+# RELATIONSHIP LOADING PROFILES
+# -----------------------------
+# One entry per page, listing exactly the relationships its template walks.
+# Many-to-one hops use joinedload (same SELECT), the one-to-one profile hop
+# on User uses selectinload so wide pages stay a single extra IN query.
+
+LOAD_PROFILES = {
+    # admin_dashboard.html
+    "admin_drives": (
+        joinedload(PlacementDrive.company),
+    ),
+    "admin_applications": (
+        joinedload(Application.student),
+        joinedload(Application.placement_drive).joinedload(PlacementDrive.company),
+    ),
+
+    # admin_view_student.html / student_dashboard.html
+    "student_applications": (
+        joinedload(Application.placement_drive).joinedload(PlacementDrive.company),
+    ),
+    "student_drives": (
+        joinedload(PlacementDrive.company),
+    ),
+
+    # company_dashboard.html - counts come from a subquery, not the collection
+    "company_drives": (
+        undefer(PlacementDrive.application_count),
+    ),
+
+    # company_applications.html
+    "company_applications": (
+        joinedload(Application.student).selectinload(User.student_profile),
+    ),
+
+    # update_application_status
+    "application_drive": (
+        joinedload(Application.placement_drive),
+    ),
+
+    # company_view_application.html
+    "company_application": (
+        joinedload(Application.placement_drive),
+        joinedload(Application.student).selectinload(User.student_profile),
+    ),
+}
+
+
+def load_profile(name):
+    return LOAD_PROFILES[name]
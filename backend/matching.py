@@ -0,0 +1,385 @@
+import heapq
+import math
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import event, inspect
+
+from .cache import invalidate
+from .models import db, User, StudentProfile, PlacementDrive
+
+
+# -----------------------------
+# SKILL MATCHING
+# -----------------------------
+# StudentProfile.skills and PlacementDrive.required_skills are free text
+# ("Python, Flask & SQL"). They are split into normalized skill terms, and
+# every student and drive becomes a sparse vector over those terms, weighted
+# by inverse document frequency (a skill everybody lists says little about a
+# match). An inverted index per side (term -> ids) turns a query into a
+# sparse dot product that only visits documents sharing a term with it:
+#
+#   recommend_drives(student_id, candidates)   drives for a student
+#   rank_candidates(drive_id, candidates)      students for a drive
+#
+# Scores are cosine similarities in [0, 1]. The index lives in process
+# memory: built on first use, updated in place from the ORM changes of every
+# committed transaction, and rebuilt every MATCHING_REBUILD_SECONDS so that
+# writes from other workers (or raw SQL) show up. That rebuild runs in a
+# background thread while the old index keeps serving; updates committed in
+# the meantime are journaled and replayed onto the new index, and the old one
+# forwards any late update to it once it has been replaced.
+#
+# Term weights and document norms are cached, so a query only pays for the
+# documents it touches. The updates of a commit are applied as one batch,
+# which drops only the weights of terms whose document frequency changed and
+# the norms of the documents containing them; a batch that adds or removes
+# documents shifts every weight and drops the whole cache, once.
+
+SKILL_SEPARATORS = re.compile(r"[,;/|\n]+|\s+(?:and|&)\s+")
+
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+}
+
+
+def matching_config():
+    return {
+        "MATCHING_REBUILD_SECONDS": float(os.getenv("MATCHING_REBUILD_SECONDS", 600)),
+        "RECOMMENDATION_LIMIT": int(os.getenv("RECOMMENDATION_LIMIT", 5)),
+    }
+
+
+def normalize_skill(raw):
+    """Lower-case, strip punctuation (keeping c++, c#, .net) and apply aliases."""
+    term = re.sub(r"[^a-z0-9+#. ]+", " ", raw.lower())
+    term = " ".join(term.split()).strip(". ")
+    return SKILL_ALIASES.get(term, term)
+
+
+def skill_terms(text):
+    if not text:
+        return frozenset()
+    return frozenset(filter(None, (normalize_skill(part) for part in SKILL_SEPARATORS.split(text))))
+
+
+# -----------------------------
+# INVERTED INDEX
+# -----------------------------
+
+class SkillIndex:
+    """Skill terms and postings for drives and students (kind "drive" / "student")."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.terms = {"drive": {}, "student": {}}
+        self.postings = {"drive": {}, "student": {}}
+        self.built_at = time.monotonic()
+        self._idf = {}
+        self._norms = {"drive": {}, "student": {}}
+        # Set while a replacement is being built / once it has replaced this index
+        self.journal = None
+        self.successor = None
+
+    def update(self, kind, doc_id, terms):
+        self.apply([(kind, doc_id, terms)])
+
+    def remove(self, kind, doc_id):
+        self.update(kind, doc_id, None)
+
+    def apply(self, updates):
+        """Apply (kind, doc_id, terms) updates as one batch; None terms remove the document."""
+        updates = list(updates)
+        with self._lock:
+            self._apply(updates)
+            if self.journal is not None:
+                self.journal.extend(updates)
+            successor = self.successor
+        if successor is not None:
+            successor.apply(updates)
+
+    def _documents(self):
+        return len(self.terms["drive"]) + len(self.terms["student"])
+
+    def _apply(self, updates):
+        documents = self._documents()
+        changed = set()
+        for kind, doc_id, terms in updates:
+            old = self.terms[kind].pop(doc_id, frozenset())
+            terms = terms or frozenset()
+            for term in old - terms:
+                posting = self.postings[kind][term]
+                posting.discard(doc_id)
+                if not posting:
+                    del self.postings[kind][term]
+            for term in terms - old:
+                self.postings[kind].setdefault(term, set()).add(doc_id)
+            if terms:
+                self.terms[kind][doc_id] = terms
+            changed |= old ^ terms
+            self._norms[kind].pop(doc_id, None)
+
+        if self._documents() != documents:
+            self._idf.clear()
+            self._norms["drive"].clear()
+            self._norms["student"].clear()
+            return
+        # Same document count: only the changed terms' weights moved
+        for term in changed:
+            if self._idf.pop(term, None) is not None:
+                for kind, norms in self._norms.items():
+                    for doc_id in self.postings[kind].get(term, ()):
+                        norms.pop(doc_id, None)
+
+    def replace_with(self, successor):
+        """Replay what was journaled onto ``successor`` and forward later updates to it."""
+        with self._lock:
+            successor.apply(self.journal or ())
+            self.journal = None
+            self.successor = successor
+
+    def _weight(self, term):
+        weight = self._idf.get(term)
+        if weight is None:
+            documents = len(self.terms["drive"]) + len(self.terms["student"])
+            weight = self._idf[term] = math.log((documents + 1) / (
+                len(self.postings["drive"].get(term, ())) +
+                len(self.postings["student"].get(term, ())) + 1
+            )) + 1
+        return weight
+
+    def _weights(self, terms):
+        return {term: self._weight(term) for term in terms}
+
+    def _norm(self, kind, doc_id):
+        norm = self._norms[kind].get(doc_id)
+        if norm is None:
+            norm = self._norms[kind][doc_id] = math.sqrt(sum(
+                self._weight(term) ** 2 for term in self.terms[kind][doc_id]
+            ))
+        return norm
+
+    def similar(self, kind, query, candidates=None, limit=None):
+        """Best ``kind`` documents for the ``query`` terms, best first.
+
+        Returns dicts with the document id, its cosine score and the shared
+        skills. ``candidates`` restricts the result to a set of ids.
+        """
+        with self._lock:
+            if not query:
+                return []
+
+            # Sparse dot products: only documents sharing a term get a score
+            weights = self._weights(query)
+            dots = defaultdict(float)
+            for term, weight in weights.items():
+                for doc_id in self.postings[kind].get(term, ()):
+                    if candidates is None or doc_id in candidates:
+                        dots[doc_id] += weight * weight
+
+            query_norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            scored = []
+            for doc_id, dot in dots.items():
+                scored.append((-dot / (query_norm * self._norm(kind, doc_id)), doc_id))
+
+            ranked = heapq.nsmallest(limit, scored) if limit else sorted(scored)
+            return [{
+                "id": doc_id,
+                "score": round(-negative_score, 4),
+                "skills": sorted(query & self.terms[kind][doc_id]),
+            } for negative_score, doc_id in ranked]
+
+    def size(self, kind):
+        with self._lock:
+            return len(self.terms[kind])
+
+
+def build_index():
+    index = SkillIndex()
+    index.apply(
+        ("drive", drive_id, skill_terms(skills))
+        for drive_id, skills in db.session.query(PlacementDrive.id, PlacementDrive.required_skills)
+    )
+    index.apply(
+        ("student", student_id, skill_terms(skills))
+        for student_id, skills in db.session.query(StudentProfile.user_id, StudentProfile.skills)
+    )
+    return index
+
+
+def skill_index():
+    index = current_app.extensions.get("skill_index")
+    if index is None:
+        # Concurrent first requests build it once
+        with current_app.extensions["skill_index_lock"]:
+            index = current_app.extensions.get("skill_index")
+            if index is None:
+                index = current_app.extensions["skill_index"] = build_index()
+    elif time.monotonic() - index.built_at > current_app.config["MATCHING_REBUILD_SECONDS"]:
+        _start_rebuild(current_app._get_current_object(), index)
+    return index
+
+
+def _start_rebuild(app, index):
+    lock = app.extensions["skill_index_lock"]
+    if not lock.acquire(blocking=False):
+        return  # already rebuilding
+    # Updates committed from here on are replayed onto the new index
+    with index._lock:
+        index.journal = []
+    threading.Thread(
+        target=_rebuild, args=(app, index, lock), name="skill-index-rebuild", daemon=True
+    ).start()
+
+
+def _rebuild(app, index, lock):
+    try:
+        with app.app_context():
+            try:
+                fresh = build_index()
+            except Exception:
+                app.logger.exception("skill index rebuild failed")
+                with index._lock:
+                    index.journal = None
+                    # Try again after another MATCHING_REBUILD_SECONDS
+                    index.built_at = time.monotonic()
+                return
+            finally:
+                db.session.remove()
+            index.replace_with(fresh)
+            app.extensions["skill_index"] = fresh
+    finally:
+        lock.release()
+
+
+# -----------------------------
+# QUERIES
+# -----------------------------
+
+def recommend_drives(student_id, candidates, limit=None):
+    """Drives among ``candidates`` that best match the student's skills."""
+    index = skill_index()
+    query = index.terms["student"].get(student_id)
+    limit = limit or current_app.config["RECOMMENDATION_LIMIT"]
+    return index.similar("drive", query, candidates, limit)
+
+
+def rank_candidates(drive_id, candidates=None, limit=None):
+    """Students (by user id) that best match the drive's required skills."""
+    index = skill_index()
+    return index.similar("student", index.terms["drive"].get(drive_id), candidates, limit)
+
+
+def recommend_candidates(drive_id, exclude=(), limit=None):
+    """Active, non-blacklisted students to invite, best match first.
+
+    Returns (User, StudentProfile, match) tuples.
+    """
+    limit = limit or current_app.config["RECOMMENDATION_LIMIT"]
+    exclude = set(exclude)
+    # Over-fetch: some of the best matches may be inactive or blacklisted
+    matches = [
+        match for match in rank_candidates(drive_id, limit=limit * 4 + len(exclude))
+        if match["id"] not in exclude
+    ]
+    if not matches:
+        return []
+
+    rows = db.session.query(User, StudentProfile).join(
+        StudentProfile, StudentProfile.user_id == User.id
+    ).filter(
+        User.id.in_([match["id"] for match in matches]),
+        User.is_active.is_(True),
+        StudentProfile.is_blacklisted.isnot(True)
+    )
+    found = {user.id: (user, profile) for user, profile in rows}
+    return [
+        found[match["id"]] + (match,) for match in matches if match["id"] in found
+    ][:limit]
+
+
+# -----------------------------
+# INCREMENTAL UPDATES (SESSION EVENTS)
+# -----------------------------
+# Changes are collected per flush as (kind, id) -> skills text, or None for
+# a deleted row, and applied to the index only after the commit.
+
+def _skills_changed(obj, attribute):
+    return inspect(obj).attrs[attribute].history.has_changes()
+
+
+def _collect_changes(session, flush_context):
+    changes = session.info.setdefault("skill_changes", {})
+
+    for obj in session.new:
+        if isinstance(obj, PlacementDrive):
+            changes[("drive", obj.id)] = obj.required_skills
+        elif isinstance(obj, StudentProfile):
+            changes[("student", obj.user_id)] = obj.skills
+
+    for obj in session.dirty:
+        if isinstance(obj, PlacementDrive) and _skills_changed(obj, "required_skills"):
+            changes[("drive", obj.id)] = obj.required_skills
+        elif isinstance(obj, StudentProfile) and _skills_changed(obj, "skills"):
+            changes[("student", obj.user_id)] = obj.skills
+
+    for obj in session.deleted:
+        if isinstance(obj, PlacementDrive):
+            changes[("drive", obj.id)] = None
+        elif isinstance(obj, StudentProfile):
+            changes[("student", obj.user_id)] = None
+
+
+def record_skill_changes(session, kind, skills_by_id):
+    """Queue index updates for set-based writes; applied when ``session`` commits."""
+    changes = session.info.setdefault("skill_changes", {})
+    for doc_id, skills in skills_by_id.items():
+        changes[(kind, doc_id)] = skills
+
+
+def _apply_changes(session):
+    changes = session.info.pop("skill_changes", None)
+    if not changes:
+        return
+
+    index = current_app.extensions.get("skill_index")
+    if index is not None:
+        index.apply(
+            (kind, doc_id, None if skills is None else skill_terms(skills))
+            for (kind, doc_id), skills in changes.items()
+        )
+
+    # Only once the index has them, so pages rebuilt under the new version
+    # show the new recommendations
+    invalidate(*(f"skills:{doc_id}" for kind, doc_id in changes if kind == "student"))
+
+
+def _discard_changes(session):
+    session.info.pop("skill_changes", None)
+
+
+def init_matching(app):
+    app.config.update(matching_config())
+    app.extensions["skill_index_lock"] = threading.Lock()
+
+    if not event.contains(db.session, "after_flush", _collect_changes):
+        event.listen(db.session, "after_flush", _collect_changes)
+        event.listen(db.session, "after_commit", _apply_changes)
+        event.listen(db.session, "after_rollback", _discard_changes)
@@ -0,0 +1,153 @@
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+from .models import db, Application, StudentProfile
+
+
+# -----------------------------
+# SCHEMA MIGRATIONS
+# -----------------------------
+# db.create_all() only creates missing tables, so databases created by an
+# older version never receive new indexes or columns. Each migration below
+# runs once per database, in order, inside its own transaction, and is
+# recorded in the schema_migrations table. Migrations must be idempotent:
+# on a fresh database create_all() has already built the current schema.
+
+MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    id VARCHAR(100) PRIMARY KEY,
+    applied_at DATETIME NOT NULL
+)
+"""
+
+
+def _create_model_indexes(conn):
+    """Create every index declared in models.py that the database lacks."""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _add_column(conn, model, name):
+    """ALTER TABLE ADD COLUMN for ``model.<name>`` unless it already exists."""
+    table = model.__table__
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    if name in existing:
+        return False
+
+    column = table.c[name]
+    ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}"
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    conn.exec_driver_sql(ddl)
+    return True
+
+
+def _add_unread_notifications(conn):
+    """StudentProfile.unread_notifications, backfilled from the notifications."""
+    from .notifications import recount_unread
+
+    _add_column(conn, StudentProfile, "unread_notifications")
+    recount_unread(conn)
+
+
+def _add_status_updated_at(conn):
+    """Application.status_updated_at; earlier decisions stay unknown (NULL)."""
+    _add_column(conn, Application, "status_updated_at")
+
+
+def _queue_resume_text(conn):
+    """resume_text rows for stored resumes, extracted by the worker or `flask resumes-extract`."""
+    from .resume_text import queue_missing
+
+    _create_model_indexes(conn)
+    queue_missing(conn)
+
+
+def _move_resumes_out_of_static(conn):
+    """Resume files move to RESUME_STORAGE_DIR; old uploads get content-addressed names."""
+    from .resume_storage import move_legacy_resumes
+    from .resume_text import queue_missing
+
+    move_legacy_resumes(conn)
+    queue_missing(conn)
+
+
+def _add_resume_search_index(conn):
+    """resume_fts, which 0004 never created, filled from the text extracted so far."""
+    from .search import create_resume_index
+
+    create_resume_index(conn)
+
+
+MIGRATIONS = [
+    ("0001_hot_query_indexes", _create_model_indexes),
+    ("0002_student_unread_notifications", _add_unread_notifications),
+    ("0003_application_status_updated_at", _add_status_updated_at),
+    ("0004_resume_text_queue", _queue_resume_text),
+    ("0005_resumes_out_of_static", _move_resumes_out_of_static),
+    ("0006_resume_search_index", _add_resume_search_index),
+]
+
+
+def applied_migrations(conn):
+    conn.exec_driver_sql(MIGRATIONS_DDL)
+    return {
+        row[0] for row in conn.exec_driver_sql("SELECT id FROM schema_migrations")
+    }
+
+
+def apply_migrations():
+    """Run pending migrations and return the ids that were applied."""
+    with db.engine.begin() as conn:
+        done = applied_migrations(conn)
+
+    applied = []
+    for migration_id, migrate in MIGRATIONS:
+        if migration_id in done:
+            continue
+
+        with db.engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                db.text(
+                    "INSERT INTO schema_migrations (id, applied_at) "
+                    "VALUES (:id, :applied_at)"
+                ),
+                {"id": migration_id, "applied_at": datetime.utcnow()}
+            )
+        applied.append(migration_id)
+
+    return applied
+
+
+def init_migrations(app):
+
+    @app.cli.command("db-upgrade")
+    def db_upgrade_command():
+        """Create missing tables and apply pending migrations."""
+        db.create_all()
+        applied = apply_migrations()
+        if applied:
+            for migration_id in applied:
+                print(f"Applied {migration_id}")
+        else:
+            print("Database is up to date.")
+
+    @app.cli.command("db-check-indexes")
+    def db_check_indexes_command():
+        """EXPLAIN every hot query and fail if one scans a table or sorts in memory."""
+        from .query_plans import check_hot_queries, uses_index
+
+        failures = 0
+        for name, ok, plan in check_hot_queries():
+            failures += not ok
+            print(f"[{'OK' if ok else 'SCAN' if not uses_index(plan) else 'SORT'}] {name}")
+            for line in plan:
+                print(f"       {line}")
+
+        if failures:
+            raise SystemExit(f"{failures} hot queries do not use an index properly")
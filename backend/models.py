@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import column_property
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -31,6 +32,13 @@ class User(db.Model):
         "Application", backref="student", cascade="all, delete", lazy=True
     )
 
+    __table_args__ = (
+        # admin student list: role filter + keyset on id
+        db.Index("ix_user_role_id", "role", "id"),
+        # login lookup
+        db.Index("ix_user_email_active", "email", "is_active"),
+    )
+
     def __repr__(self):
         return f"<User {self.email} ({self.role})>"
 
@@ -61,6 +69,12 @@ class CompanyProfile(db.Model):
         "PlacementDrive", backref="company", cascade="all, delete", lazy=True
     )
 
+    __table_args__ = (
+        db.Index("ix_company_profile_user", "user_id"),
+        # student dashboard: approved, non-blacklisted companies
+        db.Index("ix_company_profile_approval", "approval_status", "is_blacklisted"),
+    )
+
     def __repr__(self):
         return f"<Company {self.company_name}>"
 
@@ -78,10 +92,19 @@ class StudentProfile(db.Model):
 
     is_blacklisted = db.Column(db.Boolean, default=False)
 
+    # Denormalized unread Notification count, kept by notifications.py
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     user_id = db.Column(
         db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), nullable=False
     )
 
+    __table_args__ = (
+        db.Index("ix_student_profile_user", "user_id"),
+        # resume keyword filter: resume file -> profiles using it
+        db.Index("ix_student_profile_resume", "resume_path"),
+    )
+
     def __repr__(self):
         return f"<StudentProfile user_id={self.user_id}>"
 
@@ -117,6 +140,13 @@ class PlacementDrive(db.Model):
         "Application", backref="placement_drive", cascade="all, delete", lazy=True
     )
 
+    __table_args__ = (
+        # student dashboard: open drives by deadline
+        db.Index("ix_drive_status_deadline", "status", "application_deadline"),
+        # company dashboard: a company's drives, newest first
+        db.Index("ix_drive_company_created", "company_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Drive {self.job_title} ({self.status})>"
 
@@ -124,6 +154,9 @@ class PlacementDrive(db.Model):
 # -----------------------------
 # APPLICATION (Student ↔ Drive)
 # -----------------------------
+APPLICATION_STATUSES = ("APPLIED", "SHORTLISTED", "SELECTED", "REJECTED", "PLACED")
+
+
 class Application(db.Model):
     __tablename__ = "application"
 
@@ -134,6 +167,10 @@ class Application(db.Model):
         db.String(20), default="APPLIED"
     )  # APPLIED / SHORTLISTED / SELECTED / REJECTED / PLACED
 
+    # Last status change (the only UPDATE applications receive); NULL while
+    # the application is untouched. Time-to-decision in analytics.py.
+    status_updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+
     student_id = db.Column(
         db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), nullable=False
     )
@@ -143,6 +180,8 @@ class Application(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint("student_id", "drive_id", name="unique_application"),
+        # company applications page / applicant counts
+        db.Index("ix_application_drive_status", "drive_id", "status"),
     )
 
     def __repr__(self):
@@ -169,5 +208,110 @@ class Notification(db.Model):
 
     student = db.relationship("User", backref="notifications")
 
+    __table_args__ = (
+        # unread badge count
+        db.Index("ix_notification_student_read_created", "student_id", "is_read", "created_at"),
+        # notification list, newest first
+        db.Index("ix_notification_student_created", "student_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Notification {self.id} to {self.student_id}>"
+
+
+# -----------------------------
+# NOTIFICATION OUTBOX
+# -----------------------------
+# Queued fan-out events. Written in the producer's own transaction and
+# turned into Notification rows by the background worker (notifications.py).
+class NotificationOutbox(db.Model):
+    __tablename__ = "notification_outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    message = db.Column(db.String(255), nullable=False)
+
+    # Recipients: an explicit JSON list of student ids, or every applicant
+    # of a drive (resolved at delivery time)
+    student_ids = db.Column(db.Text)
+    drive_id = db.Column(db.Integer)
+
+    status = db.Column(db.String(20), nullable=False, default="PENDING")  # PENDING / FAILED
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(255))
+
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # worker: next due events
+        db.Index("ix_outbox_status_available", "status", "available_at"),
+    )
+
+    def __repr__(self):
+        return f"<NotificationOutbox {self.id} ({self.status})>"
+
+
+# -----------------------------
+# RESUME FILES (CONTENT ADDRESSED)
+# -----------------------------
+class ResumeFile(db.Model):
+    __tablename__ = "resume_file"
+
+    # sha256 of the file content; the file lives at resumes/<digest><extension>
+    digest = db.Column(db.String(64), primary_key=True)
+    path = db.Column(db.String(250), unique=True, nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+
+    # Number of StudentProfile.resume_path values pointing at this file
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ResumeFile {self.path} refs={self.ref_count}>"
+
+
+# -----------------------------
+# RESUME TEXT (EXTRACTED IN THE BACKGROUND)
+# -----------------------------
+# One row per distinct resume file, queued when the file is stored and
+# filled by the extraction worker (resume_text.py). The text is indexed in
+# resume_fts for the company resume keyword filter.
+class ResumeText(db.Model):
+    __tablename__ = "resume_text"
+
+    id = db.Column(db.Integer, primary_key=True)
+    digest = db.Column(db.String(64), unique=True, nullable=False)  # ResumeFile.digest
+
+    status = db.Column(db.String(20), nullable=False, default="PENDING")  # PENDING / PROCESSING / DONE / FAILED
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(255))
+
+    # Whitespace-normalized, at most RESUME_TEXT_MAX_CHARS
+    text = db.Column(db.Text)
+
+    claimed_at = db.Column(db.DateTime)
+    extracted_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # extraction worker: next queued files
+        db.Index("ix_resume_text_status", "status", "id"),
+    )
+
+    def __repr__(self):
+        return f"<ResumeText {self.digest[:12]} ({self.status})>"
+
+
+# -----------------------------
+# DERIVED COLUMNS
+# -----------------------------
+# Applicant count as a correlated subquery. Deferred, so it is only computed
+# when a query asks for it with undefer() instead of loading every Application.
+PlacementDrive.application_count = column_property(
+    db.select(db.func.count(Application.id))
+    .where(Application.drive_id == PlacementDrive.id)
+    .correlate_except(Application)
+    .scalar_subquery(),
+    deferred=True
+)
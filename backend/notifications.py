@@ -0,0 +1,523 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import Boolean, DateTime, String, and_, bindparam, event, literal, or_
+
+from .cache import invalidate, invalidate_after_commit
+from .models import db, Application, Notification, NotificationOutbox, StudentProfile
+
+
+# -----------------------------
+# NOTIFICATION PIPELINE
+# -----------------------------
+# Producers call notify_students() / notify_drive_applicants(), which only
+# add one NotificationOutbox row to the current transaction - the request
+# commits once and the event is durable from that moment. After the commit
+# a background worker thread is woken; it claims due events in batches,
+# turns them into Notification rows (a drive fan-out is one INSERT ... SELECT
+# over the applications) and deletes them from the outbox in the same
+# transaction, so an event is delivered exactly once even with several
+# workers. Delivered rows are then pushed to open event streams (events.py).
+#
+# A failing batch is retried event by event; an event that keeps failing is
+# retried with exponential backoff and parked as FAILED after
+# NOTIFICATION_MAX_ATTEMPTS.
+#
+# NOTIFICATION_WORKER: "thread" (default), "inline" (deliver right after the
+# commit, for tests) or "off" (only `flask notifications-deliver`).
+
+OUTBOX = NotificationOutbox.__table__
+PROFILES = StudentProfile.__table__
+RETRY_BASE_SECONDS = 2
+
+
+def notification_config():
+    return {
+        "NOTIFICATION_WORKER": os.getenv("NOTIFICATION_WORKER", "thread"),
+        "NOTIFICATION_BATCH_SIZE": int(os.getenv("NOTIFICATION_BATCH_SIZE", 200)),
+        "NOTIFICATION_MAX_ATTEMPTS": int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", 5)),
+        "NOTIFICATION_POLL_SECONDS": float(os.getenv("NOTIFICATION_POLL_SECONDS", 5)),
+        # Backlog size above which the pipeline reports itself saturated
+        "NOTIFICATION_BACKLOG_HIGH_WATER": int(os.getenv("NOTIFICATION_BACKLOG_HIGH_WATER", 1000)),
+    }
+
+
+# -----------------------------
+# PRODUCERS
+# -----------------------------
+
+def _enqueue(**fields):
+    db.session.add(NotificationOutbox(**fields))
+    db.session.info["notifications_enqueued"] = (
+        db.session.info.get("notifications_enqueued", 0) + 1
+    )
+
+
+def notify_students(student_ids, message):
+    """Queue ``message`` for each of ``student_ids``; sent after the commit."""
+    student_ids = sorted(set(student_ids))
+    if student_ids:
+        _enqueue(message=message, student_ids=json.dumps(student_ids))
+
+
+def notify_drive_applicants(drive_id, message):
+    """Queue ``message`` for everyone who applied to the drive."""
+    _enqueue(message=message, drive_id=drive_id)
+
+
+# -----------------------------
+# METRICS
+# -----------------------------
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "enqueued": 0,
+    "delivered": 0,
+    "events_delivered": 0,
+    "batches": 0,
+    "retries": 0,
+    "failed": 0,
+    "backlog": 0,
+    "oldest_pending_seconds": 0.0,
+    "last_batch_seconds": 0.0,
+}
+
+
+def _count(**increments):
+    with _metrics_lock:
+        for name, value in increments.items():
+            _metrics[name] += value
+
+
+def pipeline_stats():
+    with _metrics_lock:
+        stats = dict(_metrics)
+    stats["saturated"] = stats["backlog"] > current_app.config["NOTIFICATION_BACKLOG_HIGH_WATER"]
+    return stats
+
+
+def _sample_backlog(conn):
+    backlog, oldest = conn.execute(
+        db.select(db.func.count(OUTBOX.c.id), db.func.min(OUTBOX.c.created_at))
+        .where(OUTBOX.c.status == "PENDING")
+    ).one()
+    with _metrics_lock:
+        _metrics["backlog"] = backlog
+        _metrics["oldest_pending_seconds"] = (
+            (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+        )
+
+
+def prometheus_lines():
+    stats = pipeline_stats()
+    lines = []
+    for name, key, kind, help_text in (
+        ("portal_notifications_enqueued_total", "enqueued", "counter", "Notification events committed to the outbox."),
+        ("portal_notifications_delivered_total", "delivered", "counter", "Notification rows written."),
+        ("portal_notification_batches_total", "batches", "counter", "Outbox batches delivered."),
+        ("portal_notification_retries_total", "retries", "counter", "Outbox events scheduled for retry."),
+        ("portal_notification_failures_total", "failed", "counter", "Outbox events parked as FAILED."),
+        ("portal_notification_backlog", "backlog", "gauge", "Pending outbox events."),
+        ("portal_notification_oldest_pending_seconds", "oldest_pending_seconds", "gauge", "Age of the oldest pending event."),
+        ("portal_notification_saturated", "saturated", "gauge", "1 while the backlog is above its high-water mark."),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {int(stats[key]) if key == 'saturated' else stats[key]}")
+    return lines
+
+
+# -----------------------------
+# DELIVERY
+# -----------------------------
+
+def _claim(conn, limit, event_id=None):
+    # Deleting with RETURNING claims the events; a rollback puts them back
+    due = db.select(OUTBOX.c.id).where(
+        OUTBOX.c.status == "PENDING",
+        OUTBOX.c.available_at <= datetime.utcnow()
+    ).order_by(OUTBOX.c.id).limit(limit)
+    if event_id is not None:
+        due = due.where(OUTBOX.c.id == event_id)
+
+    return conn.execute(
+        OUTBOX.delete().where(OUTBOX.c.id.in_(due.scalar_subquery())).returning(
+            OUTBOX.c.id, OUTBOX.c.message, OUTBOX.c.student_ids, OUTBOX.c.drive_id
+        )
+    ).fetchall()
+
+
+def _fan_out(conn, events):
+    """Write the Notification rows for ``events`` and return them."""
+    now = datetime.utcnow()
+    table = Notification.__table__
+    returning = (table.c.id, table.c.student_id, table.c.message, table.c.is_read, table.c.created_at)
+    rows = []
+    delivered = []
+
+    for item in events:
+        if item.student_ids:
+            rows.extend(
+                {"student_id": student_id, "message": item.message,
+                 "is_read": False, "created_at": now}
+                for student_id in json.loads(item.student_ids)
+            )
+        if item.drive_id is not None:
+            delivered += conn.execute(
+                table.insert().returning(*returning).from_select(
+                    ["student_id", "message", "is_read", "created_at"],
+                    db.select(
+                        Application.student_id,
+                        literal(item.message, String()),
+                        literal(False, Boolean()),
+                        literal(now, DateTime())
+                    ).where(Application.drive_id == item.drive_id)
+                )
+            ).fetchall()
+            _increment_unread_for_drive(conn, item.drive_id)
+
+    if rows:
+        delivered += conn.execute(table.insert().returning(*returning), rows).fetchall()
+        _increment_unread(conn, Counter(row["student_id"] for row in rows))
+    return delivered
+
+
+def _push(delivered):
+    from .events import notification_event, publish
+
+    invalidate(*{f"notifications:{notification.student_id}" for notification in delivered})
+    for notification in delivered:
+        publish(notification.student_id, notification_event(notification))
+
+
+def _schedule_retry(event_id, error):
+    max_attempts = current_app.config["NOTIFICATION_MAX_ATTEMPTS"]
+    with db.engine.begin() as conn:
+        attempts = conn.execute(
+            db.select(OUTBOX.c.attempts).where(OUTBOX.c.id == event_id)
+        ).scalar()
+        if attempts is None:
+            return
+        attempts += 1
+        failed = attempts >= max_attempts
+        conn.execute(OUTBOX.update().where(OUTBOX.c.id == event_id).values(
+            attempts=attempts,
+            status="FAILED" if failed else "PENDING",
+            available_at=datetime.utcnow() + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** attempts),
+            last_error=str(error)[:255],
+        ))
+    if failed:
+        _count(failed=1)
+    else:
+        _count(retries=1)
+
+
+def _deliver_individually(limit):
+    with db.engine.connect() as conn:
+        event_ids = conn.execute(
+            db.select(OUTBOX.c.id).where(
+                OUTBOX.c.status == "PENDING",
+                OUTBOX.c.available_at <= datetime.utcnow()
+            ).order_by(OUTBOX.c.id).limit(limit)
+        ).scalars().all()
+
+    handled = 0
+    for event_id in event_ids:
+        try:
+            with db.engine.begin() as conn:
+                events = _claim(conn, 1, event_id)
+                delivered = _fan_out(conn, events)
+        except Exception as exc:
+            current_app.logger.warning("notification event %s failed: %s", event_id, exc)
+            _schedule_retry(event_id, exc)
+        else:
+            _count(delivered=len(delivered), events_delivered=len(events))
+            _push(delivered)
+        handled += 1
+    return handled
+
+
+def deliver_pending(limit=None):
+    """Deliver one batch of due outbox events. Returns how many were handled."""
+    limit = limit or current_app.config["NOTIFICATION_BATCH_SIZE"]
+    started = time.perf_counter()
+    try:
+        with db.engine.begin() as conn:
+            events = _claim(conn, limit)
+            delivered = _fan_out(conn, events)
+    except Exception:
+        # Isolate the bad event(s) so the rest of the batch still goes out
+        return _deliver_individually(limit)
+
+    if events:
+        _count(delivered=len(delivered), events_delivered=len(events), batches=1)
+        with _metrics_lock:
+            _metrics["last_batch_seconds"] = time.perf_counter() - started
+        _push(delivered)
+    return len(events)
+
+
+def drain():
+    """Deliver batches until nothing is due, then refresh the backlog gauges."""
+    handled = 0
+    while True:
+        batch = deliver_pending()
+        handled += batch
+        if not batch:
+            break
+    with db.engine.connect() as conn:
+        _sample_backlog(conn)
+    return handled
+
+
+# -----------------------------
+# UNREAD COUNTERS
+# -----------------------------
+# StudentProfile.unread_notifications is moved in the same transaction as
+# the Notification rows it counts, so the dashboard badge is a primary-key
+# read instead of a COUNT over the student's notifications.
+
+def _increment_unread(conn, counts):
+    conn.execute(
+        PROFILES.update()
+        .where(PROFILES.c.user_id == bindparam("b_student"))
+        .values(unread_notifications=PROFILES.c.unread_notifications + bindparam("b_count")),
+        [{"b_student": student_id, "b_count": count} for student_id, count in counts.items()]
+    )
+
+
+def _increment_unread_for_drive(conn, drive_id):
+    conn.execute(
+        PROFILES.update()
+        .where(PROFILES.c.user_id.in_(
+            db.select(Application.student_id).where(Application.drive_id == drive_id)
+        ))
+        .values(unread_notifications=PROFILES.c.unread_notifications + 1)
+    )
+
+
+def recount_unread(conn):
+    """Rebuild every unread counter from the notification table."""
+    conn.execute(
+        PROFILES.update().values(unread_notifications=(
+            db.select(db.func.count(Notification.id))
+            .where(
+                Notification.student_id == PROFILES.c.user_id,
+                Notification.is_read.is_(False)
+            )
+            .scalar_subquery()
+        ))
+    )
+
+
+def _count_new_notifications(session, flush_context):
+    # Notifications added through the ORM rather than the outbox
+    counts = Counter(
+        obj.student_id for obj in session.new
+        if isinstance(obj, Notification) and not obj.is_read
+    )
+    if counts:
+        _increment_unread(session.connection(), counts)
+
+
+def unread_count(student_id):
+    return db.session.query(StudentProfile.unread_notifications).filter_by(
+        user_id=student_id
+    ).scalar() or 0
+
+
+def mark_all_read(student_id):
+    """Mark the student's notifications read; the caller commits."""
+    marked = Notification.query.filter_by(
+        student_id=student_id, is_read=False
+    ).update({"is_read": True}, synchronize_session=False)
+
+    if marked:
+        invalidate_after_commit(f"notifications:{student_id}")
+        unread = StudentProfile.unread_notifications
+        StudentProfile.query.filter_by(user_id=student_id).update(
+            {"unread_notifications": db.case((unread > marked, unread - marked), else_=0)},
+            synchronize_session=False
+        )
+    return marked
+
+
+# -----------------------------
+# FEED
+# -----------------------------
+# Newest first, paged on (created_at, id) so a page is one index range read
+# whatever the student's history. Cursors are "<created_at ISO>|<id>".
+
+FEED_PAGE_SIZE = 20
+POLL_LIMIT = 50
+
+
+def encode_cursor(notification):
+    return f"{notification.created_at.isoformat()}|{notification.id}"
+
+
+def head_cursor(items):
+    """Poll cursor just past the newest of ``items`` (newest first), or now."""
+    if items:
+        return encode_cursor(items[0])
+    return f"{datetime.utcnow().isoformat()}|0"
+
+
+def decode_cursor(value):
+    try:
+        created_at, notification_id = (value or "").split("|")
+        return datetime.fromisoformat(created_at), int(notification_id)
+    except ValueError:
+        return None
+
+
+def feed_item(notification):
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "is_read": bool(notification.is_read),
+        "created_at": notification.created_at.isoformat(),
+        "cursor": encode_cursor(notification),
+    }
+
+
+def notification_feed(student_id, before=None, limit=FEED_PAGE_SIZE):
+    """One page older than the ``before`` cursor: (items, next cursor or None)."""
+    query = Notification.query.filter_by(student_id=student_id)
+
+    cursor = decode_cursor(before)
+    if cursor:
+        created_at, notification_id = cursor
+        query = query.filter(or_(
+            Notification.created_at < created_at,
+            and_(Notification.created_at == created_at, Notification.id < notification_id)
+        ))
+
+    rows = query.order_by(
+        Notification.created_at.desc(), Notification.id.desc()
+    ).limit(limit + 1).all()
+
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def notifications_since(student_id, after, limit=POLL_LIMIT):
+    """Notifications newer than the ``after`` cursor, oldest first."""
+    cursor = decode_cursor(after)
+    if not cursor:
+        return []
+
+    created_at, notification_id = cursor
+    return Notification.query.filter(
+        Notification.student_id == student_id,
+        or_(
+            Notification.created_at > created_at,
+            and_(Notification.created_at == created_at, Notification.id > notification_id)
+        )
+    ).order_by(
+        Notification.created_at.asc(), Notification.id.asc()
+    ).limit(limit).all()
+
+
+# -----------------------------
+# WORKER
+# -----------------------------
+
+class NotificationWorker:
+    def __init__(self, app):
+        self.app = app
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="notification-worker", daemon=True
+                )
+                self.thread.start()
+
+    def wake(self):
+        self.start()
+        self.wakeup.set()
+
+    def run(self):
+        with self.app.app_context():
+            poll = self.app.config["NOTIFICATION_POLL_SECONDS"]
+            while True:
+                self.wakeup.clear()
+                try:
+                    drain()
+                except Exception:
+                    self.app.logger.exception("notification worker failed")
+                # The poll picks up retries and events committed by other processes
+                self.wakeup.wait(poll)
+
+
+def _after_commit(session):
+    enqueued = session.info.pop("notifications_enqueued", 0)
+    if not enqueued:
+        return
+    _count(enqueued=enqueued)
+
+    mode = current_app.config["NOTIFICATION_WORKER"]
+    if mode == "thread":
+        current_app.extensions["notification_worker"].wake()
+    elif mode == "inline":
+        drain()
+
+
+def _after_rollback(session):
+    session.info.pop("notifications_enqueued", None)
+
+
+def _start_worker():
+    # Deliver whatever an earlier process left queued
+    current_app.extensions["notification_worker"].start()
+
+
+def init_notifications(app):
+    app.config.update(notification_config())
+    app.extensions["notification_worker"] = NotificationWorker(app)
+
+    if app.config["NOTIFICATION_WORKER"] == "thread":
+        app.before_request(_start_worker)
+
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "after_flush", _count_new_notifications)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
+
+    from .instrumentation import register_metrics
+    register_metrics(prometheus_lines)
+
+    @app.cli.command("notifications-deliver")
+    def notifications_deliver_command():
+        """Deliver every due notification event now."""
+        print(f"Delivered {drain()} notification events.")
+
+    @app.cli.command("notifications-recount")
+    def notifications_recount_command():
+        """Rebuild the students' unread notification counters."""
+        with db.engine.begin() as conn:
+            recount_unread(conn)
+        print("Unread counters rebuilt.")
+
+    @app.cli.command("notifications-status")
+    def notifications_status_command():
+        """Show the outbox backlog and parked events."""
+        with db.engine.connect() as conn:
+            _sample_backlog(conn)
+            failed = conn.execute(
+                db.select(db.func.count(OUTBOX.c.id)).where(OUTBOX.c.status == "FAILED")
+            ).scalar()
+        stats = pipeline_stats()
+        print(f"Pending: {stats['backlog']} (oldest {stats['oldest_pending_seconds']:.0f}s)")
+        print(f"Failed:  {failed}")
@@ -0,0 +1,81 @@
+from flask import request, url_for
+
+
+# -----------------------------
+# KEYSET (CURSOR) PAGINATION
+# -----------------------------
+# Pages are addressed by the last / first primary key seen instead of an
+# OFFSET, so fetching page 500 costs the same index seek as page 1.
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+class KeysetPage:
+    def __init__(self, items, has_next, has_prev, key):
+        self.items = items
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.key = key
+
+    @property
+    def next_cursor(self):
+        return getattr(self.items[-1], self.key) if self.items else None
+
+    @property
+    def prev_cursor(self):
+        return getattr(self.items[0], self.key) if self.items else None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _cursor_arg(name):
+    value = request.args.get(name, "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def page_size_arg(name="per_page"):
+    size = _cursor_arg(name) or DEFAULT_PAGE_SIZE
+    return min(size, MAX_PAGE_SIZE)
+
+
+def keyset_paginate(query, column, prefix, per_page=None):
+    """Paginate ``query`` on the unique, indexed ``column``.
+
+    Reads ``<prefix>_after`` / ``<prefix>_before`` from the request args
+    and fetches one extra row to know whether another page exists.
+    """
+    per_page = per_page or page_size_arg()
+    after = _cursor_arg(f"{prefix}_after")
+    before = _cursor_arg(f"{prefix}_before")
+
+    if before is not None:
+        rows = query.filter(column < before).order_by(
+            column.desc()
+        ).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        return KeysetPage(items, True, has_prev, column.key)
+
+    if after is not None:
+        query = query.filter(column > after)
+
+    rows = query.order_by(column.asc()).limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    return KeysetPage(rows[:per_page], has_next, after is not None, column.key)
+
+
+def page_url(prefix, after=None, before=None):
+    """Current URL with only the cursor for ``prefix`` replaced."""
+    args = request.args.to_dict()
+    args.pop(f"{prefix}_after", None)
+    args.pop(f"{prefix}_before", None)
+    if after is not None:
+        args[f"{prefix}_after"] = after
+    if before is not None:
+        args[f"{prefix}_before"] = before
+    return url_for(request.endpoint, **request.view_args, **args)
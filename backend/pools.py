@@ -0,0 +1,36 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+
+
+# -----------------------------
+# PROCESS POOLS
+# -----------------------------
+# CPU-bound work (password hashing for imports, resume parsing) runs in
+# process pools that live as long as the web worker: one pool per name and
+# per app, created on first use and reused by every request and thread.
+#
+# Workers are started with "spawn", never "fork": a forked child of a
+# threaded web worker inherits copies of locks other threads were holding
+# (logging, the connection pool, the cache) and can deadlock on them. Spawned
+# workers start a fresh interpreter and import only what they run.
+# They are started on demand and exit with the pool at interpreter shutdown.
+
+_lock = threading.Lock()
+
+
+def process_pool(name, workers):
+    """The app's long-lived ``name`` pool of ``workers`` spawned processes."""
+    pools = current_app.extensions.setdefault("process_pools", {})
+    pool = pools.get(name)
+    # A worker that died (killed, out of memory) breaks its whole pool
+    if pool is None or pool._broken:
+        with _lock:
+            pool = pools.get(name)
+            if pool is None or pool._broken:
+                pool = pools[name] = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+    return pool
@@ -0,0 +1,40 @@
+from flask import current_app, request
+
+from .instrumentation import current_timings
+
+
+# -----------------------------
+# SQL STATEMENT BUDGET (TEST MODE)
+# -----------------------------
+# When the app runs with TESTING=True and SQL_QUERY_LIMIT is set, any request
+# that issues more statements than allowed fails loudly, which is how an N+1
+# regression in a template shows up in the test suite instead of production.
+# SQL_QUERY_LIMITS can override the budget for individual endpoints.
+# Statements are counted by the request instrumentation (instrumentation.py).
+
+class TooManyQueries(AssertionError):
+    pass
+
+
+def _query_limit():
+    limits = current_app.config.get("SQL_QUERY_LIMITS") or {}
+    return limits.get(request.endpoint, current_app.config.get("SQL_QUERY_LIMIT"))
+
+
+def _check_budget(response):
+    if not current_app.testing:
+        return response
+
+    limit = _query_limit()
+    timings = current_timings()
+    issued = timings.sql_count if timings else 0
+    if limit is not None and issued > limit:
+        raise TooManyQueries(
+            f"{request.method} {request.path} issued {issued} SQL statements "
+            f"(limit {limit})"
+        )
+    return response
+
+
+def init_query_guard(app):
+    app.after_request(_check_budget)
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from .models import db, User, CompanyProfile, StudentProfile, PlacementDrive, Application, Notification
+
+
+# -----------------------------
+# HOT QUERY PLAN CHECK
+# -----------------------------
+# The query shapes issued on every request by controllers.py, with sample
+# parameters. check_hot_queries() runs EXPLAIN QUERY PLAN on each one and
+# flags any plan step that scans a whole table instead of using an index,
+# and, for the ORDERED_QUERIES whose index should deliver the rows in order,
+# a temporary B-tree built to sort them.
+
+ORDERED_QUERIES = {"admin students page", "company drives", "open drives", "notification feed page"}
+
+def _hot_queries():
+    from .dashboard import open_drive_filter
+
+    today = datetime.utcnow().date()
+
+    return {
+        "login": User.query.filter_by(
+            email="student@example.com", is_active=True
+        ),
+        "admin students page": User.query.filter_by(
+            role="STUDENT"
+        ).filter(User.id > 0).order_by(User.id).limit(26),
+        "company by user": CompanyProfile.query.filter_by(user_id=1),
+        "student profile by user": StudentProfile.query.filter_by(user_id=1),
+        "company drives": PlacementDrive.query.filter_by(
+            company_id=1
+        ).order_by(PlacementDrive.created_at.desc()),
+        "open drives": PlacementDrive.query.join(CompanyProfile).filter(
+            open_drive_filter(today)
+        ).order_by(PlacementDrive.application_deadline.asc()),
+        "drive applications": Application.query.filter_by(drive_id=1),
+        "student applications": Application.query.filter_by(student_id=1),
+        "existing application": Application.query.filter_by(
+            drive_id=1, student_id=1
+        ),
+        "notification feed page": Notification.query.filter(
+            Notification.student_id == 1,
+            db.or_(
+                Notification.created_at < datetime(2000, 1, 1),
+                db.and_(Notification.created_at == datetime(2000, 1, 1), Notification.id < 1)
+            )
+        ).order_by(Notification.created_at.desc(), Notification.id.desc()).limit(21),
+        "unread notifications": Notification.query.filter_by(
+            student_id=1, is_read=False
+        ),
+    }
+
+
+def explain(query):
+    """EXPLAIN QUERY PLAN lines for an ORM query (SQLite only)."""
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+        return [row[-1] for row in rows]
+
+
+def uses_index(plan):
+    return not any(
+        step.startswith("SCAN ") and " USING " not in step for step in plan
+    )
+
+
+def sorts_in_memory(plan):
+    return any(step.startswith("USE TEMP B-TREE") for step in plan)
+
+
+def check_hot_queries():
+    """Yield (name, ok, plan) for every hot query."""
+    if db.engine.dialect.name != "sqlite":
+        raise RuntimeError("The query plan check only supports SQLite")
+
+    for name, query in _hot_queries().items():
+        plan = explain(query)
+        ok = uses_index(plan) and not (name in ORDERED_QUERIES and sorts_in_memory(plan))
+        yield name, ok, plan
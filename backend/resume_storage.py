@@ -0,0 +1,357 @@
+import hashlib
+import os
+import posixpath
+import shutil
+import tempfile
+
+from flask import abort, current_app, send_file
+from sqlalchemy import event
+
+from .database import insert_ignore
+from .models import db, StudentProfile, ResumeFile, ResumeText
+from .search import unindex_resumes
+
+
+# -----------------------------
+# RESUME STORAGE
+# -----------------------------
+# Uploads are streamed to disk in fixed-size chunks while being hashed, so
+# memory use does not depend on the file size and oversized files are cut
+# off as soon as they cross RESUME_MAX_BYTES. Each distinct file is stored
+# once as resumes/<sha256><ext>; ResumeFile.ref_count tracks how many
+# StudentProfile.resume_path values point at it, and the file is removed
+# after the commit that drops its last reference. A file written by a
+# transaction that rolls back is removed again, unless another transaction
+# has recorded the same content meanwhile.
+#
+# Files live in RESUME_STORAGE_DIR (default instance/resumes), outside the
+# static folder, so whatever serves /static can never hand them out. The
+# stored "resumes/..." paths name a file in that directory. Uploads from
+# before content addressing (static/resumes/<name>.pdf) are moved and
+# renamed by migration 0005 (move_legacy_resumes below).
+#
+# Every new file is also queued for text extraction (resume_text.py).
+
+CHUNK_SIZE = 64 * 1024
+ALLOWED_EXTENSIONS = {".pdf", ".doc", ".docx"}
+
+
+class ResumeRejected(Exception):
+    pass
+
+
+def resume_config():
+    max_bytes = int(os.getenv("RESUME_MAX_BYTES", 5 * 1024 * 1024))
+    return {
+        "RESUME_MAX_BYTES": max_bytes,
+        # Let werkzeug refuse absurd bodies before they are parsed;
+        # the slack covers the other form fields.
+        "MAX_CONTENT_LENGTH": max_bytes + 1024 * 1024,
+        "RESUME_STORAGE_DIR": os.getenv("RESUME_STORAGE_DIR"),
+    }
+
+
+def resume_folder():
+    return current_app.config["RESUME_STORAGE_DIR"] or os.path.join(current_app.instance_path, "resumes")
+
+
+def resume_file_path(relative_path):
+    """Absolute path on disk of a ``resumes/...`` path stored in the database."""
+    return os.path.join(resume_folder(), posixpath.basename(relative_path))
+
+
+def _extension(filename):
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in ALLOWED_EXTENSIONS:
+        raise ResumeRejected("Resume must be a PDF, DOC or DOCX file.")
+    return extension
+
+
+def store_resume(upload):
+    """Stream a werkzeug FileStorage to disk and return its ``resumes/...`` path."""
+    extension = _extension(upload.filename)
+    max_bytes = current_app.config["RESUME_MAX_BYTES"]
+
+    folder = resume_folder()
+    os.makedirs(folder, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = upload.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ResumeRejected(
+                        f"Resume is larger than {max_bytes // (1024 * 1024)} MB."
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+
+        if size == 0:
+            raise ResumeRejected("Uploaded resume is empty.")
+
+        relative_path = f"resumes/{digest.hexdigest()}{extension}"
+        final_path = resume_file_path(relative_path)
+        if os.path.exists(final_path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, final_path)
+            db.session.info.setdefault("created_resumes", {})[digest.hexdigest()] = final_path
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    _ensure_record(digest.hexdigest(), relative_path, size)
+    return relative_path
+
+
+def _ensure_record(digest, relative_path, size):
+    # Concurrent uploads of the same content may race to create the row
+    db.session.execute(
+        insert_ignore(ResumeFile).values(
+            digest=digest, path=relative_path, size=size, ref_count=0
+        )
+    )
+    db.session.execute(
+        insert_ignore(ResumeText).values(digest=digest, status="PENDING", attempts=0)
+    )
+    db.session.info["resumes_queued"] = True
+
+
+def _digest_of(relative_path):
+    if not relative_path:
+        return None
+    name = os.path.splitext(os.path.basename(relative_path))[0]
+    if len(name) == 64 and all(c in "0123456789abcdef" for c in name):
+        return name
+    return None
+
+
+def attach_resume(profile, relative_path):
+    """Point ``profile`` at a stored resume, moving the reference counts."""
+    old_path = profile.resume_path
+    if old_path == relative_path:
+        return
+
+    new_digest = _digest_of(relative_path)
+    if new_digest:
+        db.session.query(ResumeFile).filter_by(digest=new_digest).update(
+            {"ref_count": ResumeFile.ref_count + 1}, synchronize_session=False
+        )
+
+    old_digest = _digest_of(old_path)
+    if old_digest:
+        db.session.query(ResumeFile).filter_by(digest=old_digest).update(
+            {"ref_count": ResumeFile.ref_count - 1}, synchronize_session=False
+        )
+        db.session.info.setdefault("released_resumes", set()).add(old_digest)
+
+    profile.resume_path = relative_path
+
+
+# -----------------------------
+# SERVING
+# -----------------------------
+# Resumes are only served through access-checked routes. Their URLs end in
+# the stored file name, so a content-addressed file never changes behind a
+# URL and can be cached by the browser for a year ("immutable"); repeat
+# views then cost nothing or, at most, a 304. Range requests are answered
+# with 206 by send_file, which also hands the file to the server's sendfile
+# support (or X-Sendfile with USE_X_SENDFILE) instead of copying it.
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+LEGACY_MAX_AGE = 3600
+
+
+def resume_filename(relative_path):
+    return os.path.basename(relative_path or "")
+
+
+def send_resume(relative_path, filename):
+    """Send the resume at ``relative_path`` if ``filename`` still names it."""
+    if not relative_path or resume_filename(relative_path) != filename:
+        abort(404)
+
+    path = resume_file_path(relative_path)
+    if not os.path.isfile(path):
+        abort(404)
+
+    digest = _digest_of(relative_path)
+    if digest:
+        response = send_file(
+            path, conditional=True, etag=digest, max_age=IMMUTABLE_MAX_AGE
+        )
+        response.cache_control.immutable = True
+    else:
+        response = send_file(path, conditional=True, max_age=LEGACY_MAX_AGE)
+
+    # Only the viewer that passed the access check may cache it
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+
+# -----------------------------
+# ORPHAN CLEANUP
+# -----------------------------
+
+def purge_orphans(digests=None):
+    """Delete unreferenced resume files (only ``digests`` when given)."""
+    query = ResumeFile.__table__.select().where(ResumeFile.ref_count <= 0)
+    if digests is not None:
+        query = query.where(ResumeFile.digest.in_(list(digests)))
+
+    with db.engine.begin() as conn:
+        orphans = conn.execute(query).fetchall()
+        digests = []
+        for orphan in orphans:
+            deleted = conn.execute(
+                ResumeFile.__table__.delete().where(
+                    ResumeFile.digest == orphan.digest,
+                    ResumeFile.ref_count <= 0
+                )
+            )
+            if deleted.rowcount:
+                digests.append(orphan.digest)
+
+        # ... and their extracted text
+        if digests:
+            texts = ResumeText.__table__
+            unindex_resumes(conn, conn.execute(
+                texts.delete().where(texts.c.digest.in_(digests)).returning(texts.c.id)
+            ).scalars().all())
+
+    # Only files whose row this call deleted: a resume referenced again
+    # between the SELECT and the guarded DELETE keeps its file
+    paths = {orphan.digest: orphan.path for orphan in orphans}
+    for digest in digests:
+        path = resume_file_path(paths[digest])
+        if os.path.exists(path):
+            os.remove(path)
+    return len(digests)
+
+
+# -----------------------------
+# MOVING OUT OF THE STATIC FOLDER
+# -----------------------------
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def move_legacy_resumes(conn):
+    """Move static/resumes into RESUME_STORAGE_DIR; returns the number of files moved.
+
+    Only files a profile of this database points at are moved: the static
+    folder may be shared with other databases (a fresh test or benchmark
+    database must not carry off the files of the real one). Uploads from
+    before content addressing are renamed to <sha256><ext> and their
+    profiles repointed and counted, so no stored name is guessable.
+    """
+    old_folder = os.path.join(current_app.static_folder, "resumes")
+    if not os.path.isdir(old_folder):
+        return 0
+    os.makedirs(resume_folder(), exist_ok=True)
+
+    profiles = StudentProfile.__table__
+    files = ResumeFile.__table__
+    moved, unreferenced = [], 0
+    for name in sorted(os.listdir(old_folder)):
+        source = os.path.join(old_folder, name)
+        # Skips .DS_Store and interrupted .upload- temp files
+        if name.startswith(".") or not os.path.isfile(source):
+            continue
+
+        relative_path = f"resumes/{name}"
+        if not conn.execute(
+            db.select(profiles.c.id).where(profiles.c.resume_path == relative_path).limit(1)
+        ).first():
+            unreferenced += 1
+            continue
+
+        if _digest_of(relative_path) is None:
+            digest = _file_digest(source)
+            new_path = f"resumes/{digest}{os.path.splitext(name)[1].lower()}"
+            references = conn.execute(
+                profiles.update().where(profiles.c.resume_path == relative_path)
+                .values(resume_path=new_path)
+            ).rowcount
+            conn.execute(insert_ignore(files).values(
+                digest=digest, path=new_path, size=os.path.getsize(source), ref_count=0
+            ))
+            conn.execute(
+                files.update().where(files.c.digest == digest)
+                .values(ref_count=files.c.ref_count + references)
+            )
+            relative_path = new_path
+
+        target = resume_file_path(relative_path)
+        if not os.path.exists(target):
+            shutil.copy2(source, target)
+        moved.append(source)
+
+    # Originals go last, once every copy is in place
+    for source in moved:
+        os.remove(source)
+    if unreferenced:
+        current_app.logger.warning(
+            "%d file(s) in %s belong to no profile of this database and were left "
+            "in place; delete them if no other database uses them.", unreferenced, old_folder
+        )
+    return len(moved)
+
+
+def _purge_released(session):
+    session.info.pop("created_resumes", None)
+    released = session.info.pop("released_resumes", None)
+    if released:
+        purge_orphans(released)
+
+
+def _forget_released(session):
+    session.info.pop("released_resumes", None)
+
+
+def _remove_uncommitted(session, transaction):
+    # Also runs when the session is closed without a commit; after_commit
+    # has already taken the files of a committed transaction
+    if transaction.parent is not None:
+        return
+    created = session.info.pop("created_resumes", None)
+    if not created:
+        return
+
+    # Files this transaction wrote; keep those another one has recorded since
+    with db.engine.connect() as conn:
+        recorded = set(conn.execute(
+            db.select(ResumeFile.digest).where(ResumeFile.digest.in_(list(created)))
+        ).scalars())
+    for digest, path in created.items():
+        if digest not in recorded and os.path.exists(path):
+            os.remove(path)
+
+
+def init_resume_storage(app):
+    app.config.update(resume_config())
+    app.config["USE_X_SENDFILE"] = os.getenv("USE_X_SENDFILE", "").lower() in ("1", "true", "yes")
+    app.add_template_filter(resume_filename)
+
+    if not event.contains(db.session, "after_commit", _purge_released):
+        event.listen(db.session, "after_commit", _purge_released)
+        event.listen(db.session, "after_rollback", _forget_released)
+        event.listen(db.session, "after_transaction_end", _remove_uncommitted)
+
+    @app.cli.command("resumes-purge")
+    def resumes_purge_command():
+        """Delete stored resumes that no profile references."""
+        print(f"Removed {purge_orphans()} unreferenced resumes.")
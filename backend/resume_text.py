@@ -0,0 +1,318 @@
+import html
+import io
+import os
+import re
+import threading
+import zipfile
+import zlib
+from concurrent.futures import TimeoutError
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event
+
+from .models import db, ResumeFile, ResumeText
+from .pools import process_pool
+from .resume_storage import resume_file_path
+from .search import index_resume
+
+
+# -----------------------------
+# RESUME TEXT EXTRACTION
+# -----------------------------
+# Resume text is extracted in the background, never on the request path:
+#
+#   1. store_resume() queues a resume_text row (PENDING) for every new file,
+#      in the upload's own transaction
+#   2. after that commit the extraction worker thread claims queued rows and
+#      hands the files to a process pool (RESUME_EXTRACT_PROCESSES), since
+#      parsing is CPU bound and must not hold the GIL of a web worker. The
+#      pool is spawned once per process and kept (backend/pools.py)
+#   3. the whitespace-normalized text (at most RESUME_TEXT_MAX_CHARS) is
+#      stored once per distinct file and added to resume_fts, which backs the
+#      resume keyword filter on a drive's applications page
+#
+# RESUME_EXTRACTOR selects "thread" (default), "inline" (extract right after
+# the commit, for tests) or "off". A file that fails RESUME_EXTRACT_MAX_ATTEMPTS
+# times is parked as FAILED.
+#
+# PDFs are read with pypdf when it is installed. Without it a minimal
+# built-in reader handles the common case: text drawn with Tj/TJ in plain or
+# Flate-compressed content streams. DOCX is read with zipfile; for DOC only
+# runs of printable characters are kept.
+
+def resume_text_config():
+    return {
+        "RESUME_EXTRACTOR": os.getenv("RESUME_EXTRACTOR", "thread"),
+        "RESUME_EXTRACT_PROCESSES": int(os.getenv("RESUME_EXTRACT_PROCESSES", 2)),
+        "RESUME_EXTRACT_BATCH_SIZE": int(os.getenv("RESUME_EXTRACT_BATCH_SIZE", 20)),
+        "RESUME_EXTRACT_TIMEOUT": float(os.getenv("RESUME_EXTRACT_TIMEOUT", 60)),
+        "RESUME_EXTRACT_MAX_ATTEMPTS": int(os.getenv("RESUME_EXTRACT_MAX_ATTEMPTS", 3)),
+        "RESUME_EXTRACT_POLL_SECONDS": float(os.getenv("RESUME_EXTRACT_POLL_SECONDS", 30)),
+        "RESUME_TEXT_MAX_CHARS": int(os.getenv("RESUME_TEXT_MAX_CHARS", 100_000)),
+    }
+
+
+# -----------------------------
+# EXTRACTORS (RUN IN WORKER PROCESSES)
+# -----------------------------
+
+PDF_STREAM = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+PDF_TEXT_OPERATOR = re.compile(rb"\[((?:[^\]\\]|\\.)*)\]\s*TJ|\(((?:[^)\\]|\\.)*)\)\s*(?:Tj|'|\")", re.S)
+PDF_STRING = re.compile(rb"\(((?:[^)\\]|\\.)*)\)", re.S)
+PDF_ESCAPE = re.compile(rb"\\([0-7]{1,3}|.)", re.S)
+PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+
+
+def _pdf_unescape(raw):
+    def replace(match):
+        code = match.group(1)
+        if code[:1].isdigit():
+            return bytes([int(code, 8) & 0xFF])
+        return PDF_ESCAPES.get(code, code)
+    return PDF_ESCAPE.sub(replace, raw)
+
+
+def _pdf_text_builtin(data):
+    parts = []
+    for match in PDF_STREAM.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        for array, string in PDF_TEXT_OPERATOR.findall(stream):
+            if array:
+                parts.append(b"".join(PDF_STRING.findall(array)))
+            else:
+                parts.append(string)
+    return " ".join(_pdf_unescape(part).decode("latin-1") for part in parts)
+
+
+def _pdf_text(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return _pdf_text_builtin(data)
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _docx_text(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        xml = archive.read("word/document.xml").decode("utf-8", "replace")
+    xml = re.sub(r"</w:p>|<w:tab/>|<w:br/>", " ", xml)
+    return html.unescape(re.sub(r"<[^>]+>", "", xml))
+
+
+def _printable_text(data):
+    return " ".join(run.decode("ascii") for run in re.findall(rb"[\x20-\x7e]{4,}", data))
+
+
+EXTRACTORS = {
+    ".pdf": _pdf_text,
+    ".docx": _docx_text,
+}
+
+
+def extract_text(path, max_chars):
+    """Normalized text of the resume at ``path`` (module level: runs in a pool)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    extractor = EXTRACTORS.get(os.path.splitext(path)[1].lower(), _printable_text)
+    return " ".join(extractor(data).split())[:max_chars]
+
+
+# -----------------------------
+# QUEUE
+# -----------------------------
+
+RESUME_TEXT = ResumeText.__table__
+
+
+def _claim(conn, limit):
+    """Mark up to ``limit`` queued rows PROCESSING and return them.
+
+    Rows left PROCESSING by a crashed worker are taken over once they are
+    older than twice the extraction timeout.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=2 * current_app.config["RESUME_EXTRACT_TIMEOUT"])
+    due = db.select(RESUME_TEXT.c.id).where(
+        (RESUME_TEXT.c.status == "PENDING") |
+        ((RESUME_TEXT.c.status == "PROCESSING") & (RESUME_TEXT.c.claimed_at < stale))
+    ).order_by(RESUME_TEXT.c.id).limit(limit)
+
+    return conn.execute(
+        RESUME_TEXT.update().where(RESUME_TEXT.c.id.in_(due.scalar_subquery())).values(
+            status="PROCESSING", claimed_at=now, attempts=RESUME_TEXT.c.attempts + 1
+        ).returning(RESUME_TEXT.c.id, RESUME_TEXT.c.digest, RESUME_TEXT.c.attempts, RESUME_TEXT.c.claimed_at)
+    ).fetchall()
+
+
+def _store(row, text):
+    with db.engine.begin() as conn:
+        stored = conn.execute(
+            RESUME_TEXT.update().where(
+                # Only the worker holding the claim may store
+                RESUME_TEXT.c.id == row.id,
+                RESUME_TEXT.c.claimed_at == row.claimed_at,
+            ).values(status="DONE", text=text, last_error=None, extracted_at=datetime.utcnow())
+        )
+        if stored.rowcount:
+            index_resume(conn, row.id, text)
+
+
+def _fail(row, error):
+    failed = row.attempts >= current_app.config["RESUME_EXTRACT_MAX_ATTEMPTS"]
+    with db.engine.begin() as conn:
+        conn.execute(
+            RESUME_TEXT.update().where(
+                RESUME_TEXT.c.id == row.id,
+                RESUME_TEXT.c.claimed_at == row.claimed_at,
+            ).values(status="FAILED" if failed else "PENDING", last_error=str(error)[:255])
+        )
+
+
+def extract_pending(pool=None):
+    """Extract one batch of queued resumes; returns how many were processed."""
+    config = current_app.config
+    with db.engine.begin() as conn:
+        claimed = _claim(conn, config["RESUME_EXTRACT_BATCH_SIZE"])
+        if not claimed:
+            return 0
+        paths = dict(conn.execute(
+            db.select(ResumeFile.digest, ResumeFile.path).where(
+                ResumeFile.digest.in_([row.digest for row in claimed])
+            )
+        ).fetchall())
+
+    jobs = []
+    for row in claimed:
+        path = resume_file_path(paths[row.digest]) if row.digest in paths else None
+        if path is None or not os.path.isfile(path):
+            _fail(row, "resume file is missing")
+            continue
+        if pool is None:
+            jobs.append((row, None, path))
+        else:
+            jobs.append((row, pool.submit(extract_text, path, config["RESUME_TEXT_MAX_CHARS"]), path))
+
+    for row, future, path in jobs:
+        try:
+            if future is None:
+                text = extract_text(path, config["RESUME_TEXT_MAX_CHARS"])
+            else:
+                text = future.result(timeout=config["RESUME_EXTRACT_TIMEOUT"])
+        except TimeoutError:
+            _fail(row, "extraction timed out")
+        except Exception as e:
+            _fail(row, f"{type(e).__name__}: {e}")
+        else:
+            _store(row, text)
+
+    return len(claimed)
+
+
+def drain(pool=None):
+    """Extract every queued resume; returns the number processed."""
+    total = 0
+    while True:
+        processed = extract_pending(pool)
+        if not processed:
+            return total
+        total += processed
+
+
+def queue_missing(conn):
+    """Queue every stored resume that has no resume_text row yet."""
+    return conn.execute(
+        RESUME_TEXT.insert().from_select(
+            ["digest", "status", "attempts", "created_at"],
+            db.select(
+                ResumeFile.digest, db.literal("PENDING"), db.literal(0),
+                db.literal(datetime.utcnow())
+            ).where(~ResumeFile.digest.in_(db.select(RESUME_TEXT.c.digest)))
+        )
+    ).rowcount
+
+
+# -----------------------------
+# WORKER
+# -----------------------------
+
+class ResumeExtractor:
+    def __init__(self, app):
+        self.app = app
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="resume-extractor", daemon=True
+                )
+                self.thread.start()
+
+    def wake(self):
+        self.start()
+        self.wakeup.set()
+
+    def run(self):
+        with self.app.app_context():
+            poll = self.app.config["RESUME_EXTRACT_POLL_SECONDS"]
+            while True:
+                self.wakeup.clear()
+                try:
+                    drain(_extract_pool())
+                except Exception:
+                    self.app.logger.exception("resume extractor failed")
+                # The poll picks up retries and files queued by other processes
+                self.wakeup.wait(poll)
+
+
+def _extract_pool():
+    return process_pool("resume_extract", current_app.config["RESUME_EXTRACT_PROCESSES"])
+
+
+def _after_commit(session):
+    if not session.info.pop("resumes_queued", False):
+        return
+
+    mode = current_app.config["RESUME_EXTRACTOR"]
+    if mode == "thread":
+        current_app.extensions["resume_extractor"].wake()
+    elif mode == "inline":
+        drain()
+
+
+def _after_rollback(session):
+    session.info.pop("resumes_queued", None)
+
+
+def _start_worker():
+    # Extract whatever an earlier process left queued
+    current_app.extensions["resume_extractor"].start()
+
+
+def init_resume_text(app):
+    app.config.update(resume_text_config())
+    app.extensions["resume_extractor"] = ResumeExtractor(app)
+
+    if app.config["RESUME_EXTRACTOR"] == "thread":
+        app.before_request(_start_worker)
+
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
+
+    @app.cli.command("resumes-extract")
+    def resumes_extract_command():
+        """Queue resumes without extracted text and extract everything queued."""
+        with db.engine.begin() as conn:
+            queued = queue_missing(conn)
+        processed = drain(_extract_pool())
+        failed = ResumeText.query.filter_by(status="FAILED").count()
+        print(f"Queued {queued}, processed {processed} resumes ({failed} failed in total).")
@@ -0,0 +1,377 @@
+import re
+import time
+
+from sqlalchemy import event, inspect
+
+from .models import (
+    db, User, CompanyProfile, StudentProfile, PlacementDrive, Application, ResumeFile, ResumeText
+)
+
+
+# -----------------------------
+# FULL-TEXT SEARCH (SQLITE FTS5)
+# -----------------------------
+# Two FTS5 tables mirror the searchable text, keyed by the row id of the
+# entity they describe:
+#
+#   drive_fts   rowid = placement_drive.id  (job_title, required_skills, company_name)
+#   student_fts rowid = user.id             (full_name, email, skills, qualification)
+#   resume_fts  rowid = resume_text.id      (text)
+#
+# The first two are kept in sync from the same flush as the ORM change, so
+# the index commits or rolls back together with the data; resume_fts is
+# written by the resume extraction worker in the transaction that stores
+# the text. On databases without FTS5 the helpers fall back to ILIKE.
+#
+# Each table is checked on its own, so a missing resume_fts never turns off
+# drive or student search. A table that exists is remembered for the life
+# of the process; a missing one is looked up again after
+# FTS_RECHECK_SECONDS, so workers started before `flask init-db` or
+# `flask search-reindex` pick the index up without a restart.
+
+DRIVE_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS drive_fts USING fts5(
+    job_title, required_skills, company_name,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+STUDENT_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS student_fts USING fts5(
+    full_name, email, skills, qualification,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+RESUME_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(
+    text,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+FTS_TABLES = ("drive_fts", "student_fts", "resume_fts")
+
+# bm25 column weights: a hit in the job title outranks one in the skills
+DRIVE_RANK = "bm25(drive_fts, 10.0, 4.0, 6.0)"
+
+DRIVE_FTS = db.table("drive_fts", db.column("rowid", db.Integer))
+
+FTS_RECHECK_SECONDS = 60
+
+# engine url -> (FTS tables found, monotonic time of the lookup)
+_fts_tables = {}
+
+
+def _engine_key(bind):
+    return str(bind.engine.url)
+
+
+def fts_enabled(table, bind=None):
+    """Whether the FTS5 ``table`` exists on the database behind ``bind``."""
+    bind = bind or db.engine
+    if bind.dialect.name != "sqlite":
+        return False
+
+    key = _engine_key(bind)
+    found, checked_at = _fts_tables.get(key, (frozenset(), None))
+    if table in found:
+        return True
+    if checked_at is not None and time.monotonic() - checked_at < FTS_RECHECK_SECONDS:
+        return False
+
+    with bind.engine.connect() as conn:
+        found = frozenset(conn.exec_driver_sql(
+            f"SELECT name FROM sqlite_master WHERE name IN {FTS_TABLES}"
+        ).scalars())
+    _fts_tables[key] = (found, time.monotonic())
+    return table in found
+
+
+def _forget_fts_tables(bind):
+    _fts_tables.pop(_engine_key(bind), None)
+
+
+def create_resume_index(conn):
+    """Create resume_fts if missing and fill it from the extracted text."""
+    if conn.dialect.name != "sqlite":
+        return False
+    _forget_fts_tables(conn)
+    if fts_enabled("resume_fts", conn):
+        return True
+
+    conn.exec_driver_sql(RESUME_FTS_DDL)
+    _reindex_resumes(conn)
+    _forget_fts_tables(conn)
+    return True
+
+
+def ensure_search_index():
+    """Create the FTS tables that are missing and fill each one it creates."""
+    engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return False
+
+    _forget_fts_tables(engine)
+    builds = {
+        "drive_fts": (DRIVE_FTS_DDL, _reindex_drives),
+        "student_fts": (STUDENT_FTS_DDL, _reindex_students),
+        "resume_fts": (RESUME_FTS_DDL, _reindex_resumes),
+    }
+    missing = [table for table in FTS_TABLES if not fts_enabled(table, engine)]
+    if missing:
+        with engine.begin() as conn:
+            for table in missing:
+                ddl, reindex = builds[table]
+                conn.exec_driver_sql(ddl)
+                reindex(conn)
+        _forget_fts_tables(engine)
+    return True
+
+
+def rebuild_search_index():
+    with db.engine.begin() as conn:
+        _reindex_drives(conn)
+        _reindex_students(conn)
+        _reindex_resumes(conn)
+
+
+# -----------------------------
+# INDEX MAINTENANCE
+# -----------------------------
+
+def _ids_param(ids):
+    return db.bindparam("ids", value=list(ids), expanding=True)
+
+
+def _reindex_drives(conn, column=None, ids=None):
+    """Rewrite drive_fts rows for drives whose ``column`` is in ``ids`` (all if None)."""
+    where = f"WHERE d.{column} IN :ids" if column else ""
+    params = (_ids_param(ids),) if column else ()
+
+    if column:
+        conn.execute(db.text(
+            "DELETE FROM drive_fts WHERE rowid IN "
+            f"(SELECT d.id FROM placement_drive d {where})"
+        ).bindparams(*params))
+    else:
+        conn.exec_driver_sql("DELETE FROM drive_fts")
+
+    conn.execute(db.text(
+        "INSERT INTO drive_fts (rowid, job_title, required_skills, company_name) "
+        "SELECT d.id, d.job_title, coalesce(d.required_skills, ''), c.company_name "
+        f"FROM placement_drive d JOIN company_profile c ON c.id = d.company_id {where}"
+    ).bindparams(*params))
+
+
+def _reindex_students(conn, ids=None):
+    """Rewrite student_fts rows for the given user ids (all students if None)."""
+    where = "AND u.id IN :ids" if ids is not None else ""
+    params = (_ids_param(ids),) if ids is not None else ()
+
+    _delete_rows(conn, "student_fts", ids)
+    conn.execute(db.text(
+        "INSERT INTO student_fts (rowid, full_name, email, skills, qualification) "
+        "SELECT u.id, u.full_name, u.email, coalesce(p.skills, ''), coalesce(p.qualification, '') "
+        "FROM user u LEFT JOIN student_profile p ON p.user_id = u.id "
+        f"WHERE u.role = 'STUDENT' {where}"
+    ).bindparams(*params))
+
+
+def _reindex_resumes(conn):
+    conn.exec_driver_sql("DELETE FROM resume_fts")
+    conn.exec_driver_sql(
+        "INSERT INTO resume_fts (rowid, text) "
+        "SELECT id, text FROM resume_text WHERE status = 'DONE'"
+    )
+
+
+def index_resume(conn, resume_text_id, text):
+    """Add one extracted resume to resume_fts."""
+    if fts_enabled("resume_fts", conn):
+        conn.execute(
+            db.text("INSERT INTO resume_fts (rowid, text) VALUES (:id, :text)"),
+            {"id": resume_text_id, "text": text}
+        )
+
+
+def unindex_resumes(conn, resume_text_ids):
+    if resume_text_ids and fts_enabled("resume_fts", conn):
+        _delete_rows(conn, "resume_fts", resume_text_ids)
+
+
+def sync_students(conn, ids):
+    """Index students written with set-based SQL (the flush hook never sees them)."""
+    if ids and fts_enabled("student_fts", conn):
+        _reindex_students(conn, ids)
+
+
+def _delete_rows(conn, table, ids=None):
+    if ids is None:
+        conn.exec_driver_sql(f"DELETE FROM {table}")
+    else:
+        conn.execute(
+            db.text(f"DELETE FROM {table} WHERE rowid IN :ids").bindparams(_ids_param(ids))
+        )
+
+
+def _changed(obj, *attrs):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _sync_search_index(session, flush_context):
+    conn = session.connection()
+    drives_indexed = fts_enabled("drive_fts", conn)
+    students_indexed = fts_enabled("student_fts", conn)
+    if not drives_indexed and not students_indexed:
+        return
+
+    drive_ids, deleted_drive_ids = set(), set()
+    company_ids = set()
+    user_ids, deleted_user_ids = set(), set()
+
+    for obj in session.new:
+        if isinstance(obj, PlacementDrive):
+            drive_ids.add(obj.id)
+        elif isinstance(obj, User) and obj.role == "STUDENT":
+            user_ids.add(obj.id)
+        elif isinstance(obj, StudentProfile):
+            user_ids.add(obj.user_id)
+
+    for obj in session.dirty:
+        if isinstance(obj, PlacementDrive):
+            if _changed(obj, "job_title", "required_skills", "company_id"):
+                drive_ids.add(obj.id)
+        elif isinstance(obj, CompanyProfile):
+            if _changed(obj, "company_name"):
+                company_ids.add(obj.id)
+        elif isinstance(obj, User) and obj.role == "STUDENT":
+            if _changed(obj, "full_name", "email"):
+                user_ids.add(obj.id)
+        elif isinstance(obj, StudentProfile):
+            if _changed(obj, "skills", "qualification", "user_id"):
+                user_ids.add(obj.user_id)
+
+    for obj in session.deleted:
+        if isinstance(obj, PlacementDrive):
+            deleted_drive_ids.add(obj.id)
+        elif isinstance(obj, User):
+            deleted_user_ids.add(obj.id)
+        elif isinstance(obj, StudentProfile):
+            user_ids.add(obj.user_id)
+
+    if drives_indexed:
+        if deleted_drive_ids:
+            _delete_rows(conn, "drive_fts", deleted_drive_ids)
+        drive_ids -= deleted_drive_ids
+        if drive_ids:
+            _reindex_drives(conn, "id", drive_ids)
+        if company_ids:
+            _reindex_drives(conn, "company_id", company_ids)
+
+    if students_indexed:
+        if deleted_user_ids:
+            _delete_rows(conn, "student_fts", deleted_user_ids)
+        user_ids -= deleted_user_ids
+        if user_ids:
+            _reindex_students(conn, user_ids)
+
+
+def init_search(app):
+    if not event.contains(db.session, "after_flush", _sync_search_index):
+        event.listen(db.session, "after_flush", _sync_search_index)
+
+    @app.cli.command("search-reindex")
+    def search_reindex_command():
+        """Rebuild the full-text search tables from scratch."""
+        if ensure_search_index():
+            rebuild_search_index()
+            print("Search index rebuilt.")
+        else:
+            print("Full-text search is not available on this database.")
+
+
+# -----------------------------
+# QUERIES
+# -----------------------------
+
+def match_expression(term):
+    """Turn user input into an FTS5 query: every word must match, as a prefix."""
+    tokens = re.findall(r"\w+", term.lower())
+    if not tokens:
+        return None
+    return " AND ".join(f'"{token}"*' for token in tokens)
+
+
+def search_drive_ids(term, *criteria):
+    """Best-first drive ids for ``term``, or None when FTS is unavailable.
+
+    ``criteria`` filter the drives in the same query (PlacementDrive is joined
+    with CompanyProfile), so ranking never cuts off rows they would keep.
+    """
+    expression = match_expression(term)
+    if not fts_enabled("drive_fts"):
+        return None
+    if expression is None:
+        return []
+
+    query = db.select(DRIVE_FTS.c.rowid).join(
+        PlacementDrive, PlacementDrive.id == DRIVE_FTS.c.rowid
+    ).join(CompanyProfile).where(
+        db.text("drive_fts MATCH :q").bindparams(q=expression), *criteria
+    ).order_by(db.text(DRIVE_RANK))
+    return list(db.session.scalars(query))
+
+
+def drive_search_filter(term):
+    """ILIKE filter for backends without FTS5 (query must join CompanyProfile)."""
+    return (
+        PlacementDrive.job_title.ilike(f"%{term}%") |
+        PlacementDrive.required_skills.ilike(f"%{term}%") |
+        CompanyProfile.company_name.ilike(f"%{term}%")
+    )
+
+
+def student_search_filter(term):
+    """Filter clause on User matching students by name, email, skills or id."""
+    expression = match_expression(term)
+
+    if fts_enabled("student_fts"):
+        clause = User.id.in_(
+            db.text("SELECT rowid FROM student_fts WHERE student_fts MATCH :q")
+            .bindparams(q=expression or '""')
+            .columns(rowid=db.Integer)
+        )
+    else:
+        clause = (
+            User.full_name.ilike(f"%{term}%") |
+            User.email.ilike(f"%{term}%")
+        )
+
+    # Searching by student id is an exact primary key lookup
+    if term.isdigit():
+        clause = clause | (User.id == int(term))
+    return clause
+
+
+def resume_search_filter(term):
+    """Filter clause on Application: the applicant's resume text matches ``term``."""
+    if fts_enabled("resume_fts"):
+        clause = ResumeText.id.in_(
+            db.text("SELECT rowid FROM resume_fts WHERE resume_fts MATCH :q")
+            .bindparams(q=match_expression(term) or '""')
+            .columns(rowid=db.Integer)
+        )
+    else:
+        clause = ResumeText.text.ilike(f"%{term}%")
+
+    return Application.student_id.in_(
+        db.select(StudentProfile.user_id)
+        .join(ResumeFile, ResumeFile.path == StudentProfile.resume_path)
+        .join(ResumeText, ResumeText.digest == ResumeFile.digest)
+        .where(ResumeText.status == "DONE", clause)
+    )
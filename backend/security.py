@@ -0,0 +1,123 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from functools import lru_cache
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+# -----------------------------
+# PASSWORD HASHING POLICY
+# -----------------------------
+# PASSWORD_HASH_METHOD is the werkzeug method new hashes are created with.
+# Stored hashes made with any other method still verify. They are re-hashed
+# on the next successful login when they use another algorithm or a lower
+# cost (e.g. fewer pbkdf2 iterations), never when their cost is higher: a
+# lowered setting only applies to new hashes and does not weaken old ones.
+#
+# The default is werkzeug's own pbkdf2:sha256 cost, 1,000,000 iterations,
+# which every account created before this setting existed already uses.
+#
+# Verification is CPU-bound, so it runs on a small dedicated thread pool
+# (PASSWORD_HASH_WORKERS). At most PASSWORD_HASH_MAX_PENDING verifications
+# may be running or queued; beyond that logins are refused immediately with
+# HashingBusy instead of piling up and starving every other route.
+
+DEFAULT_HASH_METHOD = "pbkdf2:sha256:1000000"
+
+
+class HashingBusy(Exception):
+    pass
+
+
+def hash_config():
+    return {
+        "PASSWORD_HASH_METHOD": os.getenv("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD),
+        "PASSWORD_HASH_WORKERS": int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))),
+        "PASSWORD_HASH_MAX_PENDING": int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32)),
+        "PASSWORD_HASH_TIMEOUT": float(os.getenv("PASSWORD_HASH_TIMEOUT", 10)),
+    }
+
+
+def hash_password(password, method=None):
+    method = method or current_app.config["PASSWORD_HASH_METHOD"]
+    return generate_password_hash(password, method=method)
+
+
+@lru_cache(maxsize=None)
+def _method_prefix(method):
+    # werkzeug fills in defaults ("scrypt" is stored as "scrypt:32768:8:1"),
+    # so compare against what it actually writes, probed once per method
+    return generate_password_hash("", method=method).split("$", 1)[0]
+
+
+def _algorithm_and_cost(prefix):
+    # "pbkdf2:sha256:1000000" -> (("pbkdf2", "sha256"), (1000000,)),
+    # "scrypt:32768:8:1" -> (("scrypt",), (32768, 8, 1))
+    parts = prefix.split(":")
+    return (
+        tuple(part for part in parts if not part.isdigit()),
+        tuple(int(part) for part in parts if part.isdigit()),
+    )
+
+
+def needs_rehash(stored_hash, method=None):
+    """Whether ``stored_hash`` uses another algorithm or a lower cost than ``method``."""
+    method = method or current_app.config["PASSWORD_HASH_METHOD"]
+    stored, stored_cost = _algorithm_and_cost(stored_hash.split("$", 1)[0])
+    wanted, wanted_cost = _algorithm_and_cost(_method_prefix(method))
+    if stored != wanted or len(stored_cost) != len(wanted_cost):
+        return True
+    return stored_cost != wanted_cost and all(
+        have <= want for have, want in zip(stored_cost, wanted_cost)
+    )
+
+
+_pool_lock = threading.Lock()
+_pool = None
+_slots = None
+
+
+def _hash_pool():
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=current_app.config["PASSWORD_HASH_WORKERS"],
+                thread_name_prefix="password-hash"
+            )
+            _slots = threading.BoundedSemaphore(
+                current_app.config["PASSWORD_HASH_MAX_PENDING"]
+            )
+    return _pool, _slots
+
+
+def _run_bounded(fn, *args):
+    pool, slots = _hash_pool()
+    if not slots.acquire(blocking=False):
+        raise HashingBusy()
+
+    try:
+        future = pool.submit(fn, *args)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+
+    try:
+        return future.result(timeout=current_app.config["PASSWORD_HASH_TIMEOUT"])
+    except TimeoutError:
+        raise HashingBusy()
+
+
+def verify_password(stored_hash, password):
+    """check_password_hash on the bounded hashing pool. May raise HashingBusy."""
+    return _run_bounded(check_password_hash, stored_hash, password)
+
+
+def rehash_password(password):
+    """hash_password on the bounded hashing pool. May raise HashingBusy."""
+    return _run_bounded(
+        generate_password_hash, password, current_app.config["PASSWORD_HASH_METHOD"]
+    )
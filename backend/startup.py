@@ -0,0 +1,102 @@
+import time
+
+import click
+
+from .dashboard import open_drives_snapshot
+from .matching import skill_index
+from .migrations import apply_migrations
+from .models import db, User
+from .search import ensure_search_index
+from .security import hash_password
+from .stats import get_stats
+from .templating import compile_templates
+
+
+# -----------------------------
+# STARTUP
+# -----------------------------
+# One-time bootstrap and worker startup are separate:
+#
+#   flask init-db   create missing tables, apply migrations, seed the admin
+#                   and build the search index; run once per deploy
+#   app.py          builds the app and warms it up; every worker does this,
+#                   so it never reflects the schema or seeds anything
+#
+# warm_up() moves the work a cold worker would otherwise do on its first
+# requests to boot time: loading every template (from the bytecode cache
+# once a worker has compiled them, see templating.py), opening the
+# connection pool and building the per-process caches (admin counters,
+# skill index, open drives).
+
+DEFAULT_ADMIN_EMAIL = "admin@iitm.ac.in"
+DEFAULT_ADMIN_PASSWORD = "admin123"
+
+
+def bootstrap_database(admin_email=DEFAULT_ADMIN_EMAIL, admin_password=DEFAULT_ADMIN_PASSWORD):
+    """Create the schema, apply migrations and seed the admin; returns a summary."""
+    db.create_all()
+    applied = apply_migrations()
+
+    admin_created = False
+    if not User.query.filter_by(role="ADMIN").first():
+        db.session.add(User(
+            full_name="Placement Admin",
+            email=admin_email,
+            password=hash_password(admin_password),
+            role="ADMIN"
+        ))
+        db.session.commit()
+        admin_created = True
+
+    return {
+        "migrations": applied,
+        "admin_created": admin_created,
+        "search_index": ensure_search_index(),
+    }
+
+
+def _elapsed_ms(started):
+    return (time.perf_counter() - started) * 1000
+
+
+def warm_up(app):
+    """Do first-request work now; returns {step: milliseconds}."""
+    timings = {}
+
+    started = time.perf_counter()
+    compile_templates(app.jinja_env)
+    timings["templates"] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+            get_stats()
+            skill_index()
+            open_drives_snapshot()
+        except Exception as e:
+            # An empty database (before `flask init-db`) must not stop the worker
+            app.logger.warning("cache warm-up skipped: %s", str(e).splitlines()[0])
+        finally:
+            db.session.remove()
+    timings["data"] = _elapsed_ms(started)
+
+    return timings
+
+
+def init_startup(app):
+
+    @app.cli.command("init-db")
+    @click.option("--admin-email", envvar="ADMIN_EMAIL", default=DEFAULT_ADMIN_EMAIL, show_default=True)
+    @click.option("--admin-password", envvar="ADMIN_PASSWORD", default=DEFAULT_ADMIN_PASSWORD)
+    def init_db_command(admin_email, admin_password):
+        """Create tables, apply migrations, seed the admin and build the search index."""
+        summary = bootstrap_database(admin_email, admin_password)
+        for migration_id in summary["migrations"]:
+            print(f"Applied {migration_id}")
+        if summary["admin_created"]:
+            print(f"Created admin {admin_email}")
+        if not summary["search_index"]:
+            print("Full-text search is not available on this database.")
+        print("Database ready.")
@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import event, inspect
+
+from .models import db, User, CompanyProfile, PlacementDrive, Application
+
+
+# -----------------------------
+# ADMIN DASHBOARD STATISTICS
+# -----------------------------
+# Counters live in process memory. They are loaded with one GROUP BY per
+# table, then moved incrementally from the ORM changes of every committed
+# transaction, and reconciled against the real tables every
+# STATS_RECONCILE_SECONDS so drift from other workers (or raw SQL) is bounded.
+#
+# Counter keys: "students", "companies", "drives:<STATUS>",
+# "applications:<STATUS>".
+
+_lock = threading.Lock()
+_counts = None
+_reconciled_at = 0.0
+
+DRIVE_DEFAULT_STATUS = "PENDING"
+APPLICATION_DEFAULT_STATUS = "APPLIED"
+
+
+def _load_counts():
+    counts = Counter()
+    counts["students"] = User.query.filter_by(role="STUDENT").count()
+    counts["companies"] = CompanyProfile.query.count()
+
+    for status, total in db.session.query(
+        PlacementDrive.status, db.func.count(PlacementDrive.id)
+    ).group_by(PlacementDrive.status):
+        counts[f"drives:{status}"] = total
+
+    for status, total in db.session.query(
+        Application.status, db.func.count(Application.id)
+    ).group_by(Application.status):
+        counts[f"applications:{status}"] = total
+
+    return counts
+
+
+def reconcile():
+    global _counts, _reconciled_at
+    counts = _load_counts()
+    with _lock:
+        _counts = counts
+        _reconciled_at = time.monotonic()
+
+
+def invalidate():
+    """Force the next read to reload from the database."""
+    global _counts
+    with _lock:
+        _counts = None
+
+
+def adjust(deltas):
+    """Apply counter deltas immediately (see record_deltas for transactional use)."""
+    with _lock:
+        if _counts is None:
+            return
+        for key, delta in deltas.items():
+            _counts[key] += delta
+            if _counts[key] <= 0:
+                del _counts[key]
+
+
+def _breakdown(counts, prefix):
+    return {
+        key.split(":", 1)[1]: total
+        for key, total in counts.items()
+        if key.startswith(prefix)
+    }
+
+
+def get_stats():
+    max_age = current_app.config.get("STATS_RECONCILE_SECONDS", 300)
+    if _counts is None or time.monotonic() - _reconciled_at > max_age:
+        reconcile()
+
+    with _lock:
+        counts = Counter(_counts)
+
+    drives_by_status = _breakdown(counts, "drives:")
+    applications_by_status = _breakdown(counts, "applications:")
+
+    return {
+        "total_students": counts["students"],
+        "total_companies": counts["companies"],
+        "total_drives": sum(drives_by_status.values()),
+        "total_applications": sum(applications_by_status.values()),
+        "drives_by_status": drives_by_status,
+        "applications_by_status": applications_by_status,
+    }
+
+
+# -----------------------------
+# INCREMENTAL UPDATES (SESSION EVENTS)
+# -----------------------------
+
+def _status_key(prefix, obj, default):
+    return f"{prefix}:{obj.status or default}"
+
+
+def _collect_deltas(session, flush_context):
+    deltas = session.info.setdefault("stats_deltas", Counter())
+
+    for obj in session.new:
+        if isinstance(obj, User) and obj.role == "STUDENT":
+            deltas["students"] += 1
+        elif isinstance(obj, CompanyProfile):
+            deltas["companies"] += 1
+        elif isinstance(obj, PlacementDrive):
+            deltas[_status_key("drives", obj, DRIVE_DEFAULT_STATUS)] += 1
+        elif isinstance(obj, Application):
+            deltas[_status_key("applications", obj, APPLICATION_DEFAULT_STATUS)] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, User) and obj.role == "STUDENT":
+            deltas["students"] -= 1
+        elif isinstance(obj, CompanyProfile):
+            deltas["companies"] -= 1
+        elif isinstance(obj, PlacementDrive):
+            deltas[_status_key("drives", obj, DRIVE_DEFAULT_STATUS)] -= 1
+        elif isinstance(obj, Application):
+            deltas[_status_key("applications", obj, APPLICATION_DEFAULT_STATUS)] -= 1
+
+    for obj in session.dirty:
+        if isinstance(obj, PlacementDrive):
+            prefix = "drives"
+        elif isinstance(obj, Application):
+            prefix = "applications"
+        else:
+            continue
+
+        history = inspect(obj).attrs.status.history
+        if not history.has_changes():
+            continue
+        for old in history.deleted:
+            deltas[f"{prefix}:{old}"] -= 1
+        for new in history.added:
+            deltas[f"{prefix}:{new}"] += 1
+
+
+def record_deltas(session, deltas):
+    """Queue deltas for set-based writes; applied when ``session`` commits."""
+    session.info.setdefault("stats_deltas", Counter()).update(deltas)
+
+
+def _apply_deltas(session):
+    deltas = session.info.pop("stats_deltas", None)
+    if deltas:
+        adjust(deltas)
+
+
+def _discard_deltas(session):
+    session.info.pop("stats_deltas", None)
+
+
+def init_stats(app):
+    if not event.contains(db.session, "after_flush", _collect_deltas):
+        event.listen(db.session, "after_flush", _collect_deltas)
+        event.listen(db.session, "after_commit", _apply_deltas)
+        event.listen(db.session, "after_rollback", _discard_deltas)
@@ -0,0 +1,83 @@
+import os
+
+from flask import current_app
+from flask.helpers import get_debug_flag
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from .cache import cached, shared_versions, version
+
+
+# -----------------------------
+# TEMPLATES
+# -----------------------------
+# Three layers keep template work off the request path:
+#
+#   bytecode    compiled templates are written to TEMPLATE_CACHE_DIR
+#               (default instance/jinja_cache), so a new worker loads them
+#               instead of parsing and compiling every template again.
+#               Jinja checks each file against the template source, so an
+#               edited template is simply recompiled.
+#   auto-reload only in development (FLASK_DEBUG=1 or FLASK_ENV=development);
+#               elsewhere a loaded template is never checked for changes.
+#   fragments   {% cache "name", key... %} ... {% endcache %} stores the
+#               rendered block in the cache (backend/cache.py). The key should
+#               carry the data version(s) the block shows, e.g.
+#               cache_version("drives"), so a write makes it miss and an
+#               unchanged block is served from memory. Off in development, so
+#               template edits show up at once (FRAGMENT_CACHE), and with
+#               CACHE_BACKEND=memory, where a write in another worker never
+#               bumps this worker's versions.
+
+def templating_config():
+    development = os.getenv("FLASK_ENV") == "development" or get_debug_flag()
+    return {
+        "DEBUG": development,
+        "TEMPLATES_AUTO_RELOAD": development,
+        "TEMPLATE_CACHE_DIR": os.getenv("TEMPLATE_CACHE_DIR"),
+        "FRAGMENT_CACHE": os.getenv("FRAGMENT_CACHE", "false" if development else "true").lower() == "true",
+    }
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render", [nodes.List(key)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render(self, key, caller):
+        if not current_app.config["FRAGMENT_CACHE"] or not shared_versions():
+            return caller()
+        return Markup(cached(("fragment", *key), lambda: str(caller())))
+
+
+def compile_templates(env):
+    """Load every HTML template, filling the bytecode cache; returns the count."""
+    names = env.list_templates(filter_func=lambda name: name.endswith(".html"))
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def init_templating(app):
+    directory = app.config["TEMPLATE_CACHE_DIR"] or os.path.join(app.instance_path, "jinja_cache")
+    os.makedirs(directory, exist_ok=True)
+
+    env = app.jinja_env
+    env.bytecode_cache = FileSystemBytecodeCache(directory)
+    env.add_extension(FragmentCacheExtension)
+    app.add_template_global(version, "cache_version")
+
+    @app.cli.command("templates-compile")
+    def templates_compile_command():
+        """Compile every template into the bytecode cache."""
+        print(f"Compiled {compile_templates(app.jinja_env)} templates into {directory}.")
+
@@ -0,0 +1,118 @@
+"""Concurrent apply test: thousands of parallel applies against one drive.
+
+    python -m benchmarks.apply_race --students 2000 --clicks 2 --threads 16
+    python -m benchmarks.apply_race --mode batched        # group commit (APPLY_MODE)
+
+Seeds a fresh SQLite database, then every student applies to the hot drive
+``--clicks`` times (double clicks), all requests shuffled and fired from
+``--threads`` threads. Reports latency and throughput, and checks that no
+request failed, that the drive ended up with exactly one application per
+student and that the cached application counters match the table.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from .deadline_day import _percentile, build_app
+from .seed import DEFAULT_VOLUMES
+
+
+def run_race(app, ids, clicks, threads, seed=7):
+    from backend.models import db, Application
+
+    drive_id = ids["hot_drive_id"]
+    with app.app_context():
+        applied_before = db.session.query(Application.student_id).filter_by(drive_id=drive_id).count()
+
+    attempts = [student_id for student_id in ids["student_ids"] for _ in range(clicks)]
+    random.Random(seed).shuffle(attempts)
+
+    clients = threading.local()
+
+    def one(student_id):
+        client = getattr(clients, "client", None)
+        if client is None:
+            client = clients.client = app.test_client()
+        with client.session_transaction() as session:
+            session.clear()
+            session.update({"user_id": student_id, "role": "STUDENT", "name": "bench"})
+
+        started = time.perf_counter()
+        response = client.get(f"/student/drive/{drive_id}/apply")
+        return time.perf_counter() - started, response.status_code
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        samples = list(pool.map(one, attempts))
+    wall = time.perf_counter() - wall_started
+
+    from backend.stats import get_stats, reconcile
+    with app.app_context():
+        applied_after = db.session.query(Application.student_id).filter_by(drive_id=drive_id).count()
+        distinct = db.session.query(Application.student_id).filter_by(
+            drive_id=drive_id
+        ).distinct().count()
+        counted = get_stats()["total_applications"]
+        reconcile()
+        actual = get_stats()["total_applications"]
+
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    return {
+        "requests": len(samples),
+        "status_codes": Counter(sample[1] for sample in samples),
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "throughput_rps": len(samples) / wall,
+        "applied_before": applied_before,
+        "applied_after": applied_after,
+        "duplicates": applied_after - distinct,
+        "expected": len(ids["student_ids"]),
+        "counter_drift": counted - actual,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--clicks", type=int, default=2, help="applies per student")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--mode", choices=("direct", "batched"), default="direct", help="APPLY_MODE")
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), "race.sqlite3")
+    volumes = {**DEFAULT_VOLUMES, "students": args.students}
+    app, ids = build_app(database, volumes)
+    app.config["APPLY_MODE"] = args.mode
+
+    result = run_race(app, ids, args.clicks, args.threads)
+    print(
+        f"{result['requests']} applies ({args.mode}, {args.clicks} per student, {args.threads} threads): "
+        f"p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+        f"p99 {result['p99_ms']:.1f} ms, {result['throughput_rps']:.1f} req/s"
+    )
+    print(f"status codes: {dict(result['status_codes'])}")
+    print(
+        f"applications on the drive: {result['applied_before']} -> {result['applied_after']} "
+        f"(expected {result['expected']}), duplicates {result['duplicates']}, "
+        f"counter drift {result['counter_drift']}"
+    )
+
+    failed = (
+        set(result["status_codes"]) != {302}
+        or result["applied_after"] != result["expected"]
+        or result["duplicates"]
+        or result["counter_drift"]
+    )
+    if failed:
+        raise SystemExit("FAILED")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
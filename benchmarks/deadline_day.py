@@ -0,0 +1,360 @@
+"""Deadline-day load test for every route of the app.
+
+    python -m benchmarks.deadline_day --students 5000 --requests 200 --threads 8
+
+Seeds a fresh SQLite database, then drives the app through the Flask test
+client from several threads and reports p50/p95/p99 latency, throughput and
+SQL statements per request for each route.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from .seed import DEFAULT_VOLUMES, BENCH_PASSWORD, seed_resume, seed_spares
+
+
+# -----------------------------
+# SQL STATEMENT COUNTER
+# -----------------------------
+# The test client runs the request in the calling thread, so a thread-local
+# counter attributes every statement to the request that issued it.
+
+_local = threading.local()
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    _local.statements = getattr(_local, "statements", 0) + 1
+
+
+# -----------------------------
+# SCENARIO
+# -----------------------------
+# (name, role, method, url builder, form builder). Builders receive the
+# request number; role None means an anonymous client. "{drive}" and
+# "{application}" in a url are filled in from the acting company. Routes
+# that use up what they act on (approve, reject, blacklist, close, delete)
+# get one throwaway row per request from ``spares``, so no request is a
+# no-op on a row an earlier one already changed.
+
+EXPORT_KINDS = ("students", "drives", "applications")
+
+# Routes that hash passwords; they get --login-requests requests
+PASSWORD_ROUTES = ("login", "student register", "company register", "import students")
+
+
+def _import_csv(i, rows=5):
+    lines = ["name,email,password,qualification,skills"]
+    lines += [
+        f"Imported {i}-{n},import{i}-{n}@bench.local,{BENCH_PASSWORD},BTech,\"python, sql\""
+        for n in range(rows)
+    ]
+    return io.BytesIO("\n".join(lines).encode())
+
+
+def _drive_form(i, title):
+    return {
+        "job_title": f"{title} {i}",
+        "job_description": "Work on production systems with a small team.",
+        "eligibility_criteria": "CGPA >= 7",
+        "required_skills": "python, sql, flask",
+        "experience_required": "1",
+        "salary_range": "6-12 LPA",
+        "application_deadline": (date.today() + timedelta(days=4)).isoformat(),
+    }
+
+
+def _scenario(ids, companies, spares, resume, rng):
+    students = ids["student_ids"]
+    drives = ids["drive_ids"]
+    hot = ids["hot_drive_id"]
+
+    def student(i):
+        return students[i % len(students)]
+
+    return [
+        ("home", None, "GET", lambda i: "/", None),
+        ("login page", None, "GET", lambda i: "/login", None),
+        ("login", None, "POST", lambda i: "/login",
+         lambda i: {"email": f"student{i % len(students)}@bench.local", "password": BENCH_PASSWORD}),
+        ("logout", "STUDENT", "GET", lambda i: "/logout", None),
+        ("student register page", None, "GET", lambda i: "/student/register", None),
+        ("student register", None, "POST", lambda i: "/student/register",
+         lambda i: {"name": f"New Student {i}", "email": f"new-student{i}@bench.local",
+                    "password": BENCH_PASSWORD, "qualification": "BTech", "skills": "python, sql"}),
+        ("company register page", None, "GET", lambda i: "/company/register", None),
+        ("company register", None, "POST", lambda i: "/company/register",
+         lambda i: {"hr_name": f"New HR {i}", "email": f"new-hr{i}@bench.local",
+                    "password": BENCH_PASSWORD, "company_name": f"New Company {i}",
+                    "hr_contact": f"96{i:08d}", "website": f"https://new{i}.example.com"}),
+
+        ("student dashboard", "STUDENT", "GET", lambda i: "/student", None),
+        ("student search", "STUDENT", "GET",
+         lambda i: f"/student?search={rng.choice(['python', 'engineer', 'sql', 'company 1'])}", None),
+        ("fragment drives", "STUDENT", "GET", lambda i: "/student/fragments/drives", None),
+        ("fragment applications", "STUDENT", "GET", lambda i: "/student/fragments/applications", None),
+        ("fragment notifications", "STUDENT", "GET", lambda i: "/student/fragments/notifications", None),
+        ("apply (hot drive)", "STUDENT", "GET", lambda i: f"/student/drive/{hot}/apply", None),
+        ("student profile", "STUDENT", "GET", lambda i: "/student/profile", None),
+        ("update profile", "STUDENT", "POST", lambda i: "/student/profile",
+         lambda i: {"name": f"Student {i}", "qualification": "BTech",
+                    "skills": ", ".join(rng.sample(["python", "sql", "go", "react", "aws"], 3))}),
+        ("student resume", "STUDENT", "GET", lambda i: f"/student/resume/{resume}", None),
+        ("notification feed", "STUDENT", "GET", lambda i: "/student/notifications", None),
+        ("notification poll", "STUDENT", "GET", lambda i: "/student/notifications/poll", None),
+        ("event stream", "STUDENT", "GET", lambda i: "/student/events", None),
+        ("mark notifications read", "STUDENT", "GET", lambda i: "/student/notifications/read", None),
+
+        ("company dashboard", "COMPANY", "GET", lambda i: "/company", None),
+        ("create drive page", "COMPANY", "GET", lambda i: "/company/drive/create", None),
+        ("create drive", "COMPANY", "POST", lambda i: "/company/drive/create",
+         lambda i: _drive_form(i, "Bench Drive")),
+        ("drive applications", "COMPANY", "GET", lambda i: "/company/drive/{drive}/applications", None),
+        ("view drive", "COMPANY", "GET", lambda i: "/company/drive/{drive}", None),
+        ("edit drive page", "COMPANY", "GET", lambda i: "/company/drive/edit/{drive}", None),
+        ("edit drive", "COMPANY", "POST",
+         lambda i: f"/company/drive/edit/{spares['drives']['edit'][i]}",
+         lambda i: _drive_form(i, "Edited Drive")),
+        ("close drive", "COMPANY", "GET",
+         lambda i: f"/company/drive/{spares['drives']['close'][i]}/close", None),
+        ("delete drive", "COMPANY", "GET",
+         lambda i: f"/company/drive/delete/{spares['drives']['delete'][i]}", None),
+        ("view application", "COMPANY", "GET", lambda i: "/company/application/{application}", None),
+        ("company resume", "COMPANY", "GET",
+         lambda i: "/company/application/{application}/resume/" + resume, None),
+        ("update application status", "COMPANY", "GET",
+         lambda i: "/company/application/{application}/shortlisted", None),
+        ("bulk status", "COMPANY", "POST", lambda i: "/company/drive/{drive}/applications/status",
+         # Alternate so every request changes the rows it selects
+         lambda i: {"status": "SHORTLISTED" if i % 2 else "APPLIED",
+                    "application_ids": companies[i % len(companies)][1]["applications"]}),
+
+        ("admin dashboard", "ADMIN", "GET", lambda i: "/admin", None),
+        ("admin student search", "ADMIN", "GET",
+         lambda i: f"/admin?student_search=student {i % 100}", None),
+        ("admin view student", "ADMIN", "GET", lambda i: f"/admin/student/{student(i)}", None),
+        ("admin resume", "ADMIN", "GET", lambda i: f"/admin/student/{student(i)}/resume/{resume}", None),
+        ("approve company", "ADMIN", "GET",
+         lambda i: f"/admin/company/{spares['companies']['approve'][i]}/approve", None),
+        ("reject company", "ADMIN", "GET",
+         lambda i: f"/admin/company/{spares['companies']['reject'][i]}/reject", None),
+        ("blacklist company", "ADMIN", "POST",
+         lambda i: f"/admin/company/{spares['companies']['blacklist'][i]}/blacklist",
+         lambda i: {"reason": "Load test"}),
+        ("blacklist student", "ADMIN", "GET",
+         lambda i: f"/admin/student/{spares['students'][i]}/blacklist", None),
+        ("approve drive", "ADMIN", "GET", lambda i: f"/admin/drive/{rng.choice(drives)}/approve", None),
+        ("reject drive", "ADMIN", "GET",
+         lambda i: f"/admin/drive/{spares['drives']['reject'][i]}/reject", None),
+        ("admin reports (rebuilt)", "ADMIN", "GET", lambda i: "/admin/reports?refresh=1", None),
+        ("import students page", "ADMIN", "GET", lambda i: "/admin/students/import", None),
+        ("import students", "ADMIN", "POST", lambda i: "/admin/students/import",
+         lambda i: {"file": (_import_csv(i), "students.csv")}),
+        *[
+            (f"export {kind}", "ADMIN", "GET", lambda i, kind=kind: f"/admin/export/{kind}.csv", None)
+            for kind in EXPORT_KINDS
+        ],
+        ("admin metrics", "ADMIN", "GET", lambda i: "/admin/metrics", None),
+        ("prometheus metrics", "ADMIN", "GET", lambda i: "/metrics", None),
+    ]
+
+
+def _percentile(samples, pct):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def _company_targets(app, hr_user_id):
+    """A drive, its applications and the company profile of the given company user."""
+    from backend.models import CompanyProfile, PlacementDrive, Application
+
+    with app.app_context():
+        row = (
+            Application.query.join(PlacementDrive).join(CompanyProfile)
+            .filter(CompanyProfile.user_id == hr_user_id, CompanyProfile.approval_status == "APPROVED")
+            .with_entities(PlacementDrive.id, Application.id, CompanyProfile.id)
+            .first()
+        )
+        if not row:
+            return None
+        applications = [application_id for application_id, in (
+            Application.query.filter_by(drive_id=row[0])
+            .with_entities(Application.id).order_by(Application.id).limit(20)
+        )]
+    return {"drive": row[0], "application": row[1], "applications": applications, "company": row[2]}
+
+
+def run_benchmark(app, ids, requests_per_route, threads, only=None, overrides=None, seed=7):
+    rng = random.Random(seed)
+    from backend.models import db
+    from backend.resume_storage import resume_filename
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _count_statement)
+
+    # Approved companies with at least one application, for the company routes
+    companies = []
+    for hr_id in ids["hr_ids"]:
+        targets = _company_targets(app, hr_id)
+        if targets:
+            companies.append((hr_id, targets))
+
+    # One throwaway row per request for the routes that use them up
+    with app.app_context():
+        counts = [requests_per_route, *(overrides or {}).values()]
+        spares = seed_spares(max(counts), [targets["company"] for _, targets in companies])
+        resume = resume_filename(seed_resume())
+
+    actors = {
+        None: lambda i: (None, {}),
+        "STUDENT": lambda i: (ids["student_ids"][i % len(ids["student_ids"])], {}),
+        "COMPANY": lambda i: companies[i % len(companies)],
+        "ADMIN": lambda i: (ids["admin_id"], {}),
+    }
+
+    results = []
+    try:
+        for name, role, method, url_for_request, form_for_request in _scenario(
+            ids, companies, spares, resume, rng
+        ):
+            if only and only not in name:
+                continue
+            count = (overrides or {}).get(name, requests_per_route)
+            results.append(_run_route(
+                app, name, role, method, url_for_request, form_for_request,
+                actors[role], count, threads
+            ))
+    finally:
+        event.remove(engine, "before_cursor_execute", _count_statement)
+    return results
+
+
+def _run_route(app, name, role, method, url_for_request, form_for_request,
+               actor, requests_per_route, threads):
+    clients = threading.local()
+
+    def one(i):
+        client = getattr(clients, "client", None)
+        if client is None:
+            client = clients.client = app.test_client()
+
+        user_id, targets = actor(i)
+        with client.session_transaction() as session:
+            session.clear()
+            if role:
+                session.update({"user_id": user_id, "role": role, "name": "bench"})
+
+        url = url_for_request(i).format(**targets)
+        data = form_for_request(i) if form_for_request else None
+
+        _local.statements = 0
+        started = time.perf_counter()
+        response = client.open(url, method=method, data=data)
+        if response.mimetype == "text/event-stream":
+            # Open the stream, take the first event and hang up
+            next(response.response)
+        else:
+            response.get_data()
+        elapsed = time.perf_counter() - started
+        response.close()
+        statements = _local.statements
+
+        if response.status_code >= 500:
+            raise RuntimeError(f"{name}: {url} returned {response.status_code}")
+        return elapsed, statements
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        samples = list(pool.map(one, range(requests_per_route)))
+    wall = time.perf_counter() - wall_started
+
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    statements = [sample[1] for sample in samples]
+    return {
+        "route": name,
+        "requests": len(samples),
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "throughput_rps": len(samples) / wall,
+        "sql_avg": statistics.mean(statements),
+        "sql_max": max(statements),
+    }
+
+
+def print_report(results):
+    header = f"{'route':<28}{'reqs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'sql avg':>9}{'sql max':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(
+            f"{row['route']:<28}{row['requests']:>6}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+            f"{row['p99_ms']:>10.1f}{row['throughput_rps']:>10.1f}{row['sql_avg']:>9.1f}{row['sql_max']:>9}"
+        )
+
+
+def build_app(database, volumes):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(database)}"
+    # Keep uploaded resumes next to the throwaway database
+    os.environ["RESUME_STORAGE_DIR"] = os.path.join(os.path.dirname(os.path.abspath(database)), "resumes")
+
+    from backend import create_app
+    from backend.models import db
+    from backend.migrations import apply_migrations
+    from .seed import seed_database
+
+    app = create_app()
+    app.debug = False
+    with app.app_context():
+        db.create_all()
+        apply_migrations()
+        ids = seed_database(volumes)
+    return app, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--login-requests", type=int, default=20,
+                        help="requests for login, register and import (password hashing is slow)")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--route", help="only run routes whose name contains this text")
+    parser.add_argument("--database", help="SQLite file to create (default: a temp file)")
+    parser.add_argument("--json", help="also write the results to this file, for comparing runs")
+    for name, default in DEFAULT_VOLUMES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    args = parser.parse_args()
+
+    database = args.database or os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    if os.path.exists(database):
+        parser.error(f"{database} already exists")
+
+    volumes = {name: getattr(args, name) for name in DEFAULT_VOLUMES}
+    started = time.perf_counter()
+    app, ids = build_app(database, volumes)
+    print(f"Seeded {database} in {time.perf_counter() - started:.1f}s {volumes}")
+
+    results = run_benchmark(
+        app, ids, args.requests, args.threads,
+        only=args.route, overrides={name: args.login_requests for name in PASSWORD_ROUTES}
+    )
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"volumes": volumes, "threads": args.threads, "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
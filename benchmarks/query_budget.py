@@ -0,0 +1,133 @@
+"""SQL budget check: the dashboards stay within their statement limits.
+
+    python -m benchmarks.query_budget --students 500
+
+Seeds a SQLite database and requests every dashboard with TESTING on and a
+per-endpoint SQL_QUERY_LIMITS budget (backend/query_guard.py). Then checks
+that the guard actually fails a request: a budget one below what a page
+issues, and the applications page with its eager loading switched off
+(the N+1 the guard exists to catch), must both raise TooManyQueries.
+Exits non-zero on any failure.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+from .deadline_day import _company_targets, build_app
+from .seed import DEFAULT_VOLUMES
+
+
+# Endpoint budgets: what the page needs with a cold cache, plus a little
+# slack. A template that starts lazy-loading per row blows through them.
+BUDGETS = {
+    "main.student_dashboard": 8,
+    "main.student_fragment": 4,
+    "main.company_dashboard": 4,
+    "main.view_applications": 6,
+    "main.view_application": 4,
+    "main.admin_dashboard": 8,
+    "main.admin_view_student": 4,
+}
+
+SQL_COUNT = re.compile(r'desc="(\d+) queries"')
+
+
+def _pages(ids, targets):
+    student = ids["student_ids"][0]
+    return [
+        ("STUDENT", student, "/student"),
+        ("STUDENT", student, "/student/fragments/drives"),
+        ("STUDENT", student, "/student/fragments/applications"),
+        ("STUDENT", student, "/student/fragments/notifications"),
+        ("COMPANY", targets["hr_id"], "/company"),
+        ("COMPANY", targets["hr_id"], f"/company/drive/{targets['drive']}/applications"),
+        ("COMPANY", targets["hr_id"], f"/company/application/{targets['application']}"),
+        ("ADMIN", ids["admin_id"], "/admin"),
+        ("ADMIN", ids["admin_id"], f"/admin/student/{student}"),
+    ]
+
+
+def _get(app, role, user_id, url):
+    """Status code and SQL statement count of one request."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session.update({"user_id": user_id, "role": role, "name": "bench"})
+    response = client.get(url)
+    match = SQL_COUNT.search(response.headers.get("Server-Timing", ""))
+    return response.status_code, int(match.group(1)) if match else None
+
+
+def _raises_too_many(app, role, user_id, url):
+    from backend.query_guard import TooManyQueries
+
+    try:
+        _get(app, role, user_id, url)
+    except TooManyQueries:
+        return True
+    return False
+
+
+def run_checks(app, ids):
+    """Yield (check, passed, detail) for every check."""
+    from backend import loading
+
+    targets = None
+    for hr_id in ids["hr_ids"]:
+        targets = _company_targets(app, hr_id)
+        if targets:
+            targets["hr_id"] = hr_id
+            break
+    pages = _pages(ids, targets)
+
+    app.config.update(TESTING=True, SQL_QUERY_LIMIT=None, SQL_QUERY_LIMITS=dict(BUDGETS))
+    try:
+        # Every dashboard within its budget (the first request builds the caches)
+        for role, user_id, url in pages:
+            try:
+                status, issued = _get(app, role, user_id, url)
+            except AssertionError as e:
+                yield f"within budget: {url}", False, str(e)
+            else:
+                yield f"within budget: {url}", status == 200, f"{issued} statements, status {status}"
+
+        # One statement less than a page issues must fail it
+        role, user_id, url = pages[0]
+        app.config["SQL_QUERY_LIMITS"] = {}
+        _, issued = _get(app, role, user_id, url)
+        app.config["SQL_QUERY_LIMIT"] = issued - 1
+        yield f"limit {issued - 1} fails {url}", _raises_too_many(app, role, user_id, url), ""
+        app.config.update(SQL_QUERY_LIMIT=None, SQL_QUERY_LIMITS=dict(BUDGETS))
+
+        # An N+1: the applications page without its eager loading
+        role, user_id, url = pages[5]
+        profile = loading.LOAD_PROFILES["company_applications"]
+        loading.LOAD_PROFILES["company_applications"] = ()
+        try:
+            yield f"N+1 fails {url}", _raises_too_many(app, role, user_id, url), "eager loading off"
+        finally:
+            loading.LOAD_PROFILES["company_applications"] = profile
+    finally:
+        app.config.update(TESTING=False, SQL_QUERY_LIMIT=None, SQL_QUERY_LIMITS=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=500)
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), "budget.sqlite3")
+    app, ids = build_app(database, {**DEFAULT_VOLUMES, "students": args.students})
+
+    failures = 0
+    for check, passed, detail in run_checks(app, ids):
+        failures += not passed
+        print(f"[{'OK' if passed else 'FAIL'}] {check}" + (f" ({detail})" if detail else ""))
+
+    if failures:
+        sys.exit(f"{failures} SQL budget checks failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""Seed a placement portal database with realistic deadline-day volumes.
+
+    python -m benchmarks.seed --database /tmp/bench.sqlite3 --students 5000
+"""
+import argparse
+import io
+import os
+import random
+from datetime import datetime, timedelta
+
+from backend.models import (
+    db, User, CompanyProfile, StudentProfile, PlacementDrive, Application, Notification,
+    ResumeFile
+)
+from backend.security import hash_password
+
+
+BENCH_PASSWORD = "bench-password"
+
+# A one-page PDF the built-in text extractor can read
+BENCH_RESUME = (
+    b"%PDF-1.4\n1 0 obj << /Length 60 >> stream\n"
+    b"BT /F1 12 Tf (Python SQL Flask developer, 2 internships) Tj ET\nendstream endobj\n%%EOF\n"
+)
+
+SKILLS = [
+    "python", "java", "c++", "sql", "flask", "django", "react", "node",
+    "aws", "docker", "kubernetes", "ml", "pandas", "excel", "go", "rust",
+]
+QUALIFICATIONS = ["BTech", "BSc", "MTech", "MSc", "MBA", "BCA", "MCA"]
+JOB_TITLES = [
+    "Software Engineer", "Data Analyst", "Backend Developer", "ML Engineer",
+    "Frontend Developer", "DevOps Engineer", "Business Analyst", "SDE Intern",
+]
+APPLICATION_STATUSES = ["APPLIED"] * 6 + ["SHORTLISTED", "SHORTLISTED", "SELECTED", "REJECTED"]
+
+DEFAULT_VOLUMES = {
+    "students": 5000,
+    "companies": 50,
+    "drives": 300,
+    "applications_per_student": 4,
+    "notifications_per_student": 4,
+}
+
+BATCH_SIZE = 2000
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(db.insert(model), rows[start:start + BATCH_SIZE])
+
+
+def _skills(rng, count):
+    return ", ".join(rng.sample(SKILLS, count))
+
+
+def seed_database(volumes=None, seed=42):
+    """Bulk insert a full data set. Must run inside an app context on an empty database.
+
+    Returns the ids the load test needs (students, companies, drives, hot drive).
+    """
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    today = now.date()
+
+    # Hashing is deliberately expensive, so every seeded user shares one hash
+    password = hash_password(BENCH_PASSWORD)
+
+    # Users =================
+    users = [{
+        "full_name": "Placement Admin", "email": "admin@bench.local",
+        "password": password, "role": "ADMIN", "is_active": True, "created_at": now,
+    }]
+    users += [{
+        "full_name": f"HR {i}", "email": f"hr{i}@bench.local",
+        "password": password, "role": "COMPANY", "is_active": True, "created_at": now,
+    } for i in range(volumes["companies"])]
+    users += [{
+        "full_name": f"Student {i}", "email": f"student{i}@bench.local",
+        "password": password, "role": "STUDENT", "is_active": True, "created_at": now,
+    } for i in range(volumes["students"])]
+    _insert(User, users)
+
+    ids_by_email = dict(db.session.query(User.email, User.id))
+    admin_id = ids_by_email["admin@bench.local"]
+    hr_ids = [ids_by_email[f"hr{i}@bench.local"] for i in range(volumes["companies"])]
+    student_ids = [ids_by_email[f"student{i}@bench.local"] for i in range(volumes["students"])]
+
+    # Profiles =================
+    _insert(CompanyProfile, [{
+        "company_name": f"Company {i}", "hr_contact": f"98{i:08d}",
+        "website": f"https://company{i}.example.com",
+        "approval_status": "APPROVED" if i % 10 else "PENDING",
+        "is_blacklisted": False, "user_id": user_id,
+    } for i, user_id in enumerate(hr_ids)])
+    _insert(StudentProfile, [{
+        "qualification": rng.choice(QUALIFICATIONS),
+        "skills": _skills(rng, rng.randint(2, 6)),
+        "resume_path": None, "is_blacklisted": False, "user_id": user_id,
+    } for user_id in student_ids])
+
+    company_ids = [
+        row[0] for row in db.session.query(CompanyProfile.id).order_by(CompanyProfile.id)
+    ]
+
+    # Drives: most open, deadlines clustered in the next few days =================
+    drives = []
+    for i in range(volumes["drives"]):
+        status = rng.choice(["APPROVED"] * 8 + ["PENDING", "CLOSED"])
+        drives.append({
+            "job_title": f"{rng.choice(JOB_TITLES)} {i}",
+            "job_description": "Work on production systems with a small team.",
+            "eligibility_criteria": "CGPA >= 7",
+            "required_skills": _skills(rng, rng.randint(2, 5)),
+            "experience_required": rng.randint(0, 3),
+            "salary_range": f"{rng.randint(4, 12)}-{rng.randint(13, 30)} LPA",
+            "application_deadline": today + timedelta(days=rng.randint(0, 5)),
+            "status": status,
+            "created_at": now - timedelta(days=rng.randint(1, 30)),
+            "company_id": rng.choice(company_ids),
+        })
+    _insert(PlacementDrive, drives)
+
+    drive_ids = [
+        row[0] for row in db.session.query(PlacementDrive.id).order_by(PlacementDrive.id)
+    ]
+
+    # Applications / notifications =================
+    applications = []
+    notifications = []
+    per_student = min(volumes["applications_per_student"], len(drive_ids))
+    for student_id in student_ids:
+        for drive_id in rng.sample(drive_ids, per_student):
+            applications.append({
+                "student_id": student_id, "drive_id": drive_id,
+                "status": rng.choice(APPLICATION_STATUSES),
+                "application_date": now - timedelta(hours=rng.randint(1, 500)),
+            })
+        for n in range(volumes["notifications_per_student"]):
+            notifications.append({
+                "student_id": student_id,
+                "message": f"Your application status changed ({n}).",
+                "is_read": rng.random() < 0.7,
+                "created_at": now - timedelta(hours=rng.randint(1, 500)),
+            })
+    _insert(Application, applications)
+    _insert(Notification, notifications)
+
+    db.session.commit()
+    _refresh_derived_data()
+
+    approved_company_ids = set(company_ids[i] for i in range(len(company_ids)) if i % 10)
+    hot_drive_id = next(
+        drive_id for drive_id, drive in zip(drive_ids, drives)
+        if drive["status"] == "APPROVED" and drive["company_id"] in approved_company_ids
+    )
+
+    return {
+        "admin_id": admin_id,
+        "hr_ids": hr_ids,
+        "student_ids": student_ids,
+        "company_ids": company_ids,
+        "drive_ids": drive_ids,
+        "hot_drive_id": hot_drive_id,
+    }
+
+
+def _refresh_derived_data():
+    # Bulk inserts bypass the ORM events that maintain derived data
+    from backend.search import ensure_search_index, rebuild_search_index
+    from backend.stats import invalidate
+    from backend.notifications import recount_unread
+    from backend.cache import invalidate as invalidate_cache
+    if ensure_search_index():
+        rebuild_search_index()
+    invalidate()
+    invalidate_cache("drives")
+    with db.engine.begin() as conn:
+        recount_unread(conn)
+
+
+SPARE_COMPANY_USES = ("approve", "reject", "blacklist")
+SPARE_DRIVE_USES = ("reject", "close", "delete", "edit")
+
+
+def seed_spares(count, owner_company_ids):
+    """Throwaway rows for routes that use up what they act on, ``count`` per use.
+
+    Returns pending company ids per SPARE_COMPANY_USES, student user ids and
+    approved drive ids per SPARE_DRIVE_USES. Drive ``i`` of each use belongs
+    to ``owner_company_ids[i % len(owner_company_ids)]``.
+    """
+    now = datetime.utcnow()
+    password = hash_password(BENCH_PASSWORD)
+    companies = count * len(SPARE_COMPANY_USES)
+
+    _insert(User, [{
+        "full_name": f"Spare HR {i}", "email": f"spare-hr{i}@bench.local",
+        "password": password, "role": "COMPANY", "is_active": True, "created_at": now,
+    } for i in range(companies)] + [{
+        "full_name": f"Spare Student {i}", "email": f"spare-student{i}@bench.local",
+        "password": password, "role": "STUDENT", "is_active": True, "created_at": now,
+    } for i in range(count)])
+    ids_by_email = dict(
+        db.session.query(User.email, User.id).filter(User.email.like("spare-%"))
+    )
+    hr_ids = [ids_by_email[f"spare-hr{i}@bench.local"] for i in range(companies)]
+    student_ids = [ids_by_email[f"spare-student{i}@bench.local"] for i in range(count)]
+
+    _insert(CompanyProfile, [{
+        "company_name": f"Spare Company {i}", "hr_contact": f"97{i:08d}",
+        "approval_status": "PENDING", "is_blacklisted": False, "user_id": user_id,
+    } for i, user_id in enumerate(hr_ids)])
+    _insert(StudentProfile, [{
+        "qualification": "BTech", "skills": "python, sql",
+        "is_blacklisted": False, "user_id": user_id,
+    } for user_id in student_ids])
+    company_ids = [company_id for company_id, in db.session.query(CompanyProfile.id).filter(
+        CompanyProfile.user_id.in_(hr_ids)
+    ).order_by(CompanyProfile.user_id)]
+
+    last_drive_id = db.session.query(db.func.max(PlacementDrive.id)).scalar() or 0
+    _insert(PlacementDrive, [{
+        "job_title": f"Spare Drive {use} {i}",
+        "job_description": "Throwaway drive for the load test.",
+        "required_skills": "python, sql",
+        "experience_required": 0,
+        "application_deadline": now.date() + timedelta(days=3),
+        "status": "APPROVED",
+        "created_at": now,
+        "company_id": owner_company_ids[i % len(owner_company_ids)],
+    } for use in SPARE_DRIVE_USES for i in range(count)])
+    drive_ids = [drive_id for drive_id, in db.session.query(PlacementDrive.id).filter(
+        PlacementDrive.id > last_drive_id
+    ).order_by(PlacementDrive.id)]
+
+    db.session.commit()
+    _refresh_derived_data()
+
+    return {
+        "companies": {
+            use: company_ids[n * count:(n + 1) * count] for n, use in enumerate(SPARE_COMPANY_USES)
+        },
+        "students": student_ids,
+        "drives": {
+            use: drive_ids[n * count:(n + 1) * count] for n, use in enumerate(SPARE_DRIVE_USES)
+        },
+    }
+
+
+def seed_resume():
+    """Give every student the same stored resume; returns its stored path."""
+    from werkzeug.datastructures import FileStorage
+    from backend.resume_storage import store_resume
+
+    path = store_resume(FileStorage(io.BytesIO(BENCH_RESUME), "resume.pdf"))
+    students = db.session.query(StudentProfile).update(
+        {"resume_path": path}, synchronize_session=False
+    )
+    db.session.query(ResumeFile).filter_by(path=path).update(
+        {"ref_count": students}, synchronize_session=False
+    )
+    db.session.commit()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", required=True, help="path of the SQLite file to create")
+    for name, default in DEFAULT_VOLUMES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        parser.error(f"{args.database} already exists")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.database)}"
+
+    from backend import create_app
+    from backend.migrations import apply_migrations
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        apply_migrations()
+        volumes = {name: getattr(args, name) for name in DEFAULT_VOLUMES}
+        seed_database(volumes)
+
+    print(f"Seeded {args.database}")
+
+
+if __name__ == "__main__":
+    main()
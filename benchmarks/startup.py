@@ -0,0 +1,103 @@
+"""Worker startup budget: import, create_app, warm-up and first requests.
+
+    python -m benchmarks.startup --runs 5 --budget-ms 1500
+
+Seeds a SQLite database, then starts fresh interpreters the way a worker
+boots (app.py without the development bootstrap) and reports the median of
+each step, plus the first and second request to the three dashboards with
+and without warm_up(). Exits non-zero when import + create_app + warm-up
+exceeds --budget-ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from .deadline_day import build_app
+from .seed import DEFAULT_VOLUMES
+
+
+# Runs in a fresh interpreter; prints one JSON object
+WORKER = """
+import json, sys, time
+started = time.perf_counter()
+from backend import create_app
+from backend.startup import warm_up
+imported = time.perf_counter()
+app = create_app()
+app.debug = False
+created = time.perf_counter()
+timings = {"imports": (imported - started) * 1000, "create_app": (created - imported) * 1000}
+if sys.argv[1] == "warm":
+    timings.update(warm_up(app))
+
+client = app.test_client()
+for url, role, user_id in json.loads(sys.argv[2]):
+    with client.session_transaction() as session:
+        session.update({"user_id": user_id, "role": role, "name": "bench"})
+    for attempt in ("first", "second"):
+        request_started = time.perf_counter()
+        client.get(url)
+        timings[f"{url} {attempt}"] = (time.perf_counter() - request_started) * 1000
+print(json.dumps(timings))
+"""
+
+STARTUP_STEPS = ("imports", "create_app", "templates", "data")
+
+
+def _run_worker(database, mode, pages):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}", PYTHONPATH=os.getcwd())
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER, mode, json.dumps(pages)],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(database, pages, runs):
+    results = {}
+    for mode in ("cold", "warm"):
+        samples = [_run_worker(database, mode, pages) for _ in range(runs)]
+        results[mode] = {
+            step: statistics.median(sample[step] for sample in samples) for step in samples[0]
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500,
+                        help="maximum for imports + create_app + warm-up")
+    parser.add_argument("--students", type=int, default=DEFAULT_VOLUMES["students"])
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), "startup.sqlite3")
+    _, ids = build_app(database, {**DEFAULT_VOLUMES, "students": args.students})
+    pages = [
+        ("/admin", "ADMIN", ids["admin_id"]),
+        ("/student", "STUDENT", ids["student_ids"][0]),
+        ("/company", "COMPANY", ids["hr_ids"][1]),
+    ]
+
+    results = measure(database, pages, args.runs)
+    steps = [step for step in results["warm"] if step in STARTUP_STEPS]
+    requests = [step for step in results["warm"] if step not in STARTUP_STEPS]
+
+    print(f"median of {args.runs} runs (ms)")
+    print(f"{'':<22}{'cold':>10}{'warm':>10}")
+    for step in steps + requests:
+        cold = results["cold"].get(step)
+        print(f"{step:<22}{'-' if cold is None else f'{cold:.1f}':>10}{results['warm'][step]:>10.1f}")
+
+    startup = sum(results["warm"][step] for step in steps)
+    print(f"\nstartup with warm-up: {startup:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if startup > args.budget_ms:
+        raise SystemExit("over budget")
+
+
+if __name__ == "__main__":
+    main()